@@ -1,12 +1,20 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import pandas as pd
 import numpy as np
-import joblib
 import os
 from datetime import datetime
 import logging
 from predict import pred
+from model_registry import registry, resolve_model_path
+from coalescer import PredictionCoalescer
+from prediction_cache import PredictionCache
+import payload_formats
+from payload_formats import PayloadError
+from fast_scoring import get_compiled_scorer
+from scenarios import expand_scenarios, score_scenarios, scenario_response
+from model.profiling import profiler
+from model.prediction_intervals import DEFAULT_QUANTILES, interval_method
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -24,60 +32,72 @@ model_info = {
     'last_loaded': None
 }
 
-# For online service, we can load the model from a specified path
-# def load_model(model_path):
-#     """Load the ML model from file"""
-#     global model, model_info
-    
-#     try:
-#         if os.path.exists(model_path):
-#             model = joblib.load(model_path)
-#             model_info['loaded'] = True
-#             model_info['last_loaded'] = datetime.now().isoformat()
-            
-#             # Try to get feature names if available
-#             if hasattr(model, 'feature_names_in_'):
-#                 model_info['features'] = model.feature_names_in_.tolist()
-            
-#             # Determine model type
-#             model_type = str(type(model)).lower()
-#             if 'regressor' in model_type or 'regression' in model_type:
-#                 model_info['model_type'] = 'regression'
-#             elif 'classifier' in model_type or 'classification' in model_type:
-#                 model_info['model_type'] = 'classification'
-#             else:
-#                 model_info['model_type'] = 'unknown'
-            
-#             logger.info(f"Model loaded successfully: {model_type}")
-#             return True
-#         else:
-#             logger.error(f"Model file not found: {model_path}")
-#             return False
-#     except Exception as e:
-#         logger.error(f"Error loading model: {str(e)}")
-#         return False
-
-## For online service
-
-# @app.route('/model/load', methods=['POST'])
-# def load_model_endpoint():
-#     """Load a model from file"""
-#     data = request.get_json()
-#     model_path = data.get('model_path')
-    
-#     if not model_path:
-#         return jsonify({'error': 'model_path is required'}), 400
-    
-#     success = load_model(model_path)
-    
-#     if success:
-#         return jsonify({
-#             'message': 'Model loaded successfully',
-#             'model_info': model_info
-#         })
-#     else:
-#         return jsonify({'error': 'Failed to load model'}), 500
-    
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'best_model.pkl')
+
+# POST /model/load only loads models from here (default: the directory of the startup model)
+MODEL_DIR = os.environ.get('MODEL_DIR') or os.path.dirname(os.path.abspath(os.environ.get('MODEL_PATH', DEFAULT_MODEL_PATH)))
+
+# Payloads up to this many rows try the pandas-free scorer first (0 disables it)
+FAST_PATH_MAX_ROWS = int(os.environ.get('FAST_PATH_MAX_ROWS', '256'))
+
+# Optional micro-batching of concurrent /predict calls (PREDICT_COALESCE=1)
+coalescer = None
+if os.environ.get('PREDICT_COALESCE', '0') == '1':
+    coalescer = PredictionCoalescer(
+        max_wait_ms=float(os.environ.get('COALESCE_MAX_WAIT_MS', '5')),
+        max_batch_rows=int(os.environ.get('COALESCE_MAX_BATCH_ROWS', '1024')),
+        timeout_seconds=float(os.environ.get('COALESCE_TIMEOUT_SECONDS', '30'))
+    )
+
+# Optional cache of per-row predictions for repeated rows (PREDICT_CACHE=1)
+prediction_cache = None
+if os.environ.get('PREDICT_CACHE', '0') == '1':
+    prediction_cache = PredictionCache(
+        max_entries=int(os.environ.get('PREDICT_CACHE_MAX_ENTRIES', '100000')),
+        ttl_seconds=float(os.environ.get('PREDICT_CACHE_TTL_SECONDS', '0')) or None
+    )
+
+
+def load_model(model_path):
+    """Load the ML model from file into the process-wide registry"""
+    global model, model_info
+
+    try:
+        model, model_info = registry.load(model_path)
+        if prediction_cache is not None:
+            prediction_cache.clear()
+        return True
+    except FileNotFoundError as e:
+        logger.error(str(e))
+        return False
+    except Exception as e:
+        logger.error(f"Error loading model: {str(e)}")
+        return False
+
+
+@app.route('/model/load', methods=['POST'])
+def load_model_endpoint():
+    """Load a model from file and hot-swap it in"""
+    data = request.get_json(silent=True) or {}
+    model_path = data.get('model_path')
+
+    if not model_path:
+        return jsonify({'error': 'model_path is required'}), 400
+    model_path = resolve_model_path(model_path, MODEL_DIR)
+    if model_path is None:
+        return jsonify({'error': 'model_path must be inside the model directory (MODEL_DIR)'}), 403
+
+    success = load_model(model_path)
+
+    if success:
+        return jsonify({
+            'message': 'Model loaded successfully',
+            'model_info': model_info
+        })
+    else:
+        return jsonify({'error': 'Failed to load model'}), 500
+
+
 def preprocess_data(data):
     """Preprocess the input data for prediction"""
     df = pd.DataFrame(data)
@@ -99,55 +119,132 @@ def model_info_endpoint():
     return jsonify(model_info)
 
 
-@app.route('/predict', methods=['POST'])
-def predict():
-    """Main prediction endpoint"""
-    try:
+@app.route('/coalescer/stats', methods=['GET'])
+def coalescer_stats_endpoint():
+    """Get throughput and latency counters of the request coalescer"""
+    if coalescer is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **coalescer.stats()})
 
-        request_data = request.get_json()
-        print(f"Request data: {request_data}")
-        
-        if not request_data or 'data' not in request_data:
-            return jsonify({'error': 'No data provided'}), 400
-        
-        input_data = request_data['data']
-        
-        if not input_data:
-            return jsonify({'error': 'Empty data provided'}), 400
-        
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats_endpoint():
+    """Get hit ratio, size and memory use of the prediction cache"""
+    if prediction_cache is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **prediction_cache.stats()})
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Per-stage timing and row counters in the Prometheus text format (PROFILE=1 to collect)"""
+    return Response(profiler.prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+def score_records(current_model, input_data):
+    """Score posted rows through the fast path, the coalescer or pred()"""
+    predictions = None
+    if isinstance(input_data, list) and len(input_data) <= FAST_PATH_MAX_ROWS:
+        scorer = get_compiled_scorer(current_model)
+        if scorer is not None:
+            with profiler.stage('fast_path', rows_in=len(input_data)) as stage:
+                predictions = scorer.predict_records(input_data)
+                stage.rows_out = 0 if predictions is None else len(predictions)
+
+    if predictions is None:
         # Preprocess the data
         df = preprocess_data(input_data)
 
-        predictions = pred(df)
-        print(predictions)
+        if coalescer is not None:
+            # Scored with this request's model snapshot, even if another model is loaded meanwhile
+            predictions = coalescer.predict(df, current_model)
+        else:
+            predictions = pred(df, current_model)
+    return predictions
+
+
+def score_intervals(current_model, input_data, quantiles):
+    """Score posted rows with prediction quantiles; always through pred(), which computes both in one pass"""
+    if interval_method(current_model) is None:
+        raise PayloadError('The loaded model cannot produce intervals; retrain it to store its residual quantiles',
+                           status_code=422)
+    predictions, bands, method = pred(preprocess_data(input_data), current_model, intervals=True, quantiles=quantiles)
+    return predictions, (quantiles, bands, method)
+
+
+@app.route('/predict', methods=['POST'])
+def predict():
+    """Main prediction endpoint (body format chosen by Content-Type, see payload_formats)"""
+    try:
+        intervals, quantiles = payload_formats.interval_options(request.args, DEFAULT_QUANTILES)
+        request_format = payload_formats.request_format(request.mimetype)
+        if request_format == payload_formats.JSON:
+            input_data = payload_formats.json_input(request.get_json(force=True, silent=True))
+        else:
+            input_data = payload_formats.read_body(request.get_data(cache=False), request_format)
         
-       
-        response = {
-            'predictions': predictions.tolist(),
-            # 'model_type': model_info['model_type'],
-            # 'timestamp': datetime.now().isoformat(),
-            # 'data_points': len(input_data)
-        }
+        # Take one snapshot so a concurrent /model/load cannot swap the model mid-request
+        current_model = model
+        if current_model is None:
+            return jsonify({'error': 'Model not loaded'}), 503
+
+        interval_result = None
+        if intervals:
+            predictions, interval_result = score_intervals(current_model, input_data, quantiles)
+        elif prediction_cache is not None and isinstance(input_data, list):
+            predictions = prediction_cache.predict(current_model, input_data, score_records)
+        else:
+            predictions = score_records(current_model, input_data)
         
         logger.info(f"Generated {len(predictions)} predictions")
+
+        response_format = payload_formats.response_format(request.headers.get('Accept'), request_format)
+        if response_format != payload_formats.JSON:
+            return Response(payload_formats.write_predictions(predictions, response_format, interval_result),
+                            mimetype=response_format)
+
+        response = payload_formats.prediction_response(predictions, interval_result)
+        # response['model_type'] = model_info['model_type']
+        # response['timestamp'] = datetime.now().isoformat()
+        # response['data_points'] = len(input_data)
         return jsonify(response)
-        
+
+    except PayloadError as e:
+        return jsonify({'error': str(e)}), e.status_code
+    except TimeoutError as e:
+        logger.error(str(e))
+        return jsonify({'error': str(e)}), 504
     except Exception as e:
         logger.error(f"Error in predict endpoint: {str(e)}")
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
-if __name__ == '__main__':
 
-    ###  Try to load model on startup: Improve later 
-    # model_path = os.environ.get('./', 'best_model.pkl')
-    
-    # if os.path.exists(model_path):
-    #     load_model(model_path)
-    # else:
-    #     logger.warning(f"Model file not found at {model_path}")
-    
+@app.route('/predict/scenarios', methods=['POST'])
+def predict_scenarios():
+    """Score a base record over a grid of varied fields in one batch (see scenarios.py)"""
+    try:
+        df, axes = expand_scenarios(request.get_json(force=True, silent=True))
+
+        current_model = model
+        if current_model is None:
+            return jsonify({'error': 'Model not loaded'}), 503
+
+        predictions = score_scenarios(current_model, df)
+        logger.info(f"Generated {len(predictions)} scenario predictions")
+        return jsonify(scenario_response(predictions, axes))
+
+    except PayloadError as e:
+        return jsonify({'error': str(e)}), e.status_code
+    except Exception as e:
+        logger.error(f"Error in predict scenarios endpoint: {str(e)}")
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+# Load the model once at startup so every request scores against the resident copy
+load_model(os.environ.get('MODEL_PATH', DEFAULT_MODEL_PATH))
+
+
+if __name__ == '__main__':
     # Run the Flask app
     # app.run(debug=True, host='0.0.0.0', port=5000)
     #Use port 5001 if it has conflicts
     app.run(debug=True, host='0.0.0.0', port=5001) 
-
@@ -0,0 +1,281 @@
+"""
+ASGI variant of the prediction API (Starlette), with the same /health,
+/model/info, /model/load, /predict and /predict/scenarios contracts as
+app.py, including the request formats of payload_formats.
+
+Request parsing and response encoding run on the event loop; scoring runs
+in a bounded thread pool, so the loop keeps accepting and answering
+requests (health checks included) while predictions are computed. At most
+ASGI_MAX_PENDING requests may be scoring or waiting for a thread; beyond
+that /predict answers 429 with a Retry-After header instead of queueing
+without bound. A request that has not been scored after
+ASGI_PREDICT_TIMEOUT_SECONDS gets a 504; its thread still finishes the
+work and only then frees its slot.
+
+Usage (from seed_sale_backend/):
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5001
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+import payload_formats
+from payload_formats import PayloadError
+from predict import pred
+from model_registry import registry, resolve_model_path
+from fast_scoring import get_compiled_scorer
+from scenarios import expand_scenarios, score_scenarios, scenario_response
+from model.profiling import profiler
+from model.prediction_intervals import DEFAULT_QUANTILES, interval_method
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'best_model.pkl')
+
+# POST /model/load only loads models from here (default: the directory of the startup model)
+MODEL_DIR = os.environ.get('MODEL_DIR') or os.path.dirname(os.path.abspath(os.environ.get('MODEL_PATH', DEFAULT_MODEL_PATH)))
+
+# Payloads up to this many rows try the pandas-free scorer first (0 disables it)
+FAST_PATH_MAX_ROWS = int(os.environ.get('FAST_PATH_MAX_ROWS', '256'))
+
+# Threads scoring requests, requests scoring or waiting for a thread, and the per-request deadline
+ASGI_WORKER_THREADS = int(os.environ.get('ASGI_WORKER_THREADS', str(os.cpu_count() or 1)))
+ASGI_MAX_PENDING = int(os.environ.get('ASGI_MAX_PENDING', str(8 * ASGI_WORKER_THREADS)))
+ASGI_PREDICT_TIMEOUT_SECONDS = float(os.environ.get('ASGI_PREDICT_TIMEOUT_SECONDS', '10'))
+
+
+class BoundedExecutor:
+    """
+    Thread pool that refuses work instead of queueing it once max_pending
+    calls are running or waiting
+    """
+
+    def __init__(self, max_workers, max_pending):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='predict')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    def try_submit(self, fn, *args):
+        """Submit fn(*args) and return its Future, or None if the pool is full"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                return None
+            self._pending += 1
+        future = self._executor.submit(fn, *args)
+        # The slot is held until the call returns, even if its caller has stopped waiting
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def record_timeout(self):
+        with self._lock:
+            self._timed_out += 1
+
+    def stats(self):
+        with self._lock:
+            return {'pending': self._pending, 'max_pending': self.max_pending,
+                    'rejected': self._rejected, 'timed_out': self._timed_out}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+executor = BoundedExecutor(ASGI_WORKER_THREADS, ASGI_MAX_PENDING)
+
+
+def score_records(current_model, input_data):
+    """Score posted rows through the fast path or pred(); runs in an executor thread"""
+    if isinstance(input_data, list) and len(input_data) <= FAST_PATH_MAX_ROWS:
+        scorer = get_compiled_scorer(current_model)
+        if scorer is not None:
+            with profiler.stage('fast_path', rows_in=len(input_data)) as stage:
+                predictions = scorer.predict_records(input_data)
+                stage.rows_out = 0 if predictions is None else len(predictions)
+            if predictions is not None:
+                return predictions
+    return pred(pd.DataFrame(input_data), current_model)
+
+
+def score_intervals(current_model, input_data, quantiles):
+    """Score posted rows with prediction quantiles through pred(); runs in an executor thread"""
+    predictions, bands, method = pred(pd.DataFrame(input_data), current_model, intervals=True, quantiles=quantiles)
+    return predictions, (quantiles, bands, method)
+
+
+def load_model(model_path):
+    """Load the ML model from file into the process-wide registry"""
+    try:
+        registry.load(model_path)
+        return True
+    except FileNotFoundError as e:
+        logger.error(str(e))
+        return False
+    except Exception as e:
+        logger.error(f"Error loading model: {str(e)}")
+        return False
+
+
+async def health_check(request):
+    """Health check endpoint"""
+    return JSONResponse({
+        'status': 'healthy',
+        'timestamp': datetime.now().isoformat(),
+        'model_loaded': registry.info['loaded']
+    })
+
+
+async def model_info_endpoint(request):
+    """Get model information"""
+    return JSONResponse(registry.info)
+
+
+async def executor_stats_endpoint(request):
+    """Requests scoring or queued, and how many were rejected or timed out"""
+    return JSONResponse(executor.stats())
+
+
+async def metrics_endpoint(request):
+    """Per-stage timing and row counters in the Prometheus text format (PROFILE=1 to collect)"""
+    return PlainTextResponse(profiler.prometheus(), media_type='text/plain; version=0.0.4')
+
+
+async def load_model_endpoint(request):
+    """Load a model from file and hot-swap it in"""
+    try:
+        data = json.loads(await request.body() or b'{}')
+    except ValueError:
+        data = {}
+    model_path = data.get('model_path') if isinstance(data, dict) else None
+
+    if not model_path:
+        return JSONResponse({'error': 'model_path is required'}, status_code=400)
+    model_path = resolve_model_path(model_path, MODEL_DIR)
+    if model_path is None:
+        return JSONResponse({'error': 'model_path must be inside the model directory (MODEL_DIR)'}, status_code=403)
+
+    # Loading blocks for as long as unpickling takes; keep it off the event loop
+    if await asyncio.to_thread(load_model, model_path):
+        return JSONResponse({
+            'message': 'Model loaded successfully',
+            'model_info': registry.info
+        })
+    return JSONResponse({'error': 'Failed to load model'}, status_code=500)
+
+
+async def predict(request):
+    """Main prediction endpoint (body format chosen by Content-Type, see payload_formats)"""
+    try:
+        intervals, quantiles = payload_formats.interval_options(request.query_params, DEFAULT_QUANTILES)
+        request_format = payload_formats.request_format(request.headers.get('content-type'))
+        input_data = payload_formats.read_body(await request.body(), request_format)
+
+        # Take one snapshot so a concurrent /model/load cannot swap the model mid-request
+        current_model = registry.model
+        if current_model is None:
+            return JSONResponse({'error': 'Model not loaded'}, status_code=503)
+
+        if intervals:
+            if interval_method(current_model) is None:
+                raise PayloadError('The loaded model cannot produce intervals; retrain it to store its '
+                                   'residual quantiles', status_code=422)
+            future = executor.try_submit(score_intervals, current_model, input_data, quantiles)
+        else:
+            future = executor.try_submit(score_records, current_model, input_data)
+        if future is None:
+            return JSONResponse({'error': 'Too many requests in flight, retry later'}, status_code=429,
+                                headers={'Retry-After': '1'})
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), ASGI_PREDICT_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            executor.record_timeout()
+            return JSONResponse({'error': f'Prediction timed out after {ASGI_PREDICT_TIMEOUT_SECONDS:g}s'},
+                                status_code=504)
+        predictions, interval_result = result if intervals else (result, None)
+
+        logger.info(f"Generated {len(predictions)} predictions")
+        response_format = payload_formats.response_format(request.headers.get('accept'), request_format)
+        return Response(payload_formats.write_predictions(predictions, response_format, interval_result),
+                        media_type=response_format)
+
+    except PayloadError as e:
+        return JSONResponse({'error': str(e)}, status_code=e.status_code)
+    except Exception as e:
+        logger.error(f"Error in predict endpoint: {str(e)}")
+        return JSONResponse({'error': f'Server error: {str(e)}'}, status_code=500)
+
+
+async def predict_scenarios(request):
+    """Score a base record over a grid of varied fields in one batch (see scenarios.py)"""
+    try:
+        try:
+            request_data = json.loads(await request.body())
+        except ValueError:
+            request_data = None
+        df, axes = expand_scenarios(request_data)
+
+        current_model = registry.model
+        if current_model is None:
+            return JSONResponse({'error': 'Model not loaded'}, status_code=503)
+
+        future = executor.try_submit(score_scenarios, current_model, df)
+        if future is None:
+            return JSONResponse({'error': 'Too many requests in flight, retry later'}, status_code=429,
+                                headers={'Retry-After': '1'})
+        try:
+            predictions = await asyncio.wait_for(asyncio.wrap_future(future), ASGI_PREDICT_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            executor.record_timeout()
+            return JSONResponse({'error': f'Prediction timed out after {ASGI_PREDICT_TIMEOUT_SECONDS:g}s'},
+                                status_code=504)
+
+        logger.info(f"Generated {len(predictions)} scenario predictions")
+        return JSONResponse(scenario_response(predictions, axes))
+
+    except PayloadError as e:
+        return JSONResponse({'error': str(e)}, status_code=e.status_code)
+    except Exception as e:
+        logger.error(f"Error in predict scenarios endpoint: {str(e)}")
+        return JSONResponse({'error': f'Server error: {str(e)}'}, status_code=500)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Load the model once at startup so every request scores against the resident copy
+    await asyncio.to_thread(load_model, os.environ.get('MODEL_PATH', DEFAULT_MODEL_PATH))
+    yield
+    executor.shutdown()
+
+
+app = Starlette(
+    routes=[
+        Route('/health', health_check, methods=['GET']),
+        Route('/model/info', model_info_endpoint, methods=['GET']),
+        Route('/model/load', load_model_endpoint, methods=['POST']),
+        Route('/executor/stats', executor_stats_endpoint, methods=['GET']),
+        Route('/metrics', metrics_endpoint, methods=['GET']),
+        Route('/predict', predict, methods=['POST']),
+        Route('/predict/scenarios', predict_scenarios, methods=['POST']),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan,
+)
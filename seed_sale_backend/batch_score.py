@@ -0,0 +1,191 @@
+"""
+Streaming batch scoring for large CSVs.
+
+Reads the input in chunks, runs each chunk through scoring preprocessing,
+feature engineering and the model, and appends the predictions to a CSV
+or Parquet file as it goes, so memory stays bounded by the chunk size
+rather than the input size.
+
+Usage:
+    python batch_score.py --input grid.csv --output predictions.parquet
+    python batch_score.py --input grid.csv --output predictions.csv --chunksize 200000 --workers 4
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import logging
+
+import pandas as pd
+
+from predict import load_model, prepare_features
+from model.profiling import profiler, predict_in_stages
+
+logger = logging.getLogger(__name__)
+
+PREDICTION_COL = 'PREDICTED_UNITS'
+
+_worker_model = None
+
+
+def score_chunk(chunk, model):
+    """
+    Score one chunk of raw rows
+
+    Returns:
+        The input rows that survived preprocessing, with the prediction
+        appended as PREDICTED_UNITS; empty if preprocessing dropped them all
+    """
+    # Preprocessing drops rows and adds/drops columns in place; work on a shallow copy
+    features = prepare_features(chunk.copy(deep=False), model)
+    scored = chunk.loc[features.index].copy()
+    # The model rejects 0 rows, e.g. a chunk in which every row has a missing value
+    scored[PREDICTION_COL] = predict_in_stages(model, features, profiler) if len(features) else pd.Series(dtype=float)
+    return scored
+
+
+def _init_worker(model_path):
+    global _worker_model
+    _worker_model = load_model(model_path, use_serving_artifact=False)
+
+
+def _score_in_worker(chunk):
+    return score_chunk(chunk, _worker_model)
+
+
+class CsvChunkWriter:
+    def __init__(self, path):
+        self.path = path
+        self.header = True
+
+    def write(self, df):
+        df.to_csv(self.path, mode='w' if self.header else 'a', header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        pass
+
+
+class ParquetChunkWriter:
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Writing Parquet requires pyarrow: pip install pyarrow")
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.writer = None
+
+    def write(self, df):
+        table = self.pa.Table.from_pandas(df, preserve_index=False)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, table.schema)
+        else:
+            # A column can change dtype between chunks (e.g. int -> float when one chunk has NaNs)
+            table = table.cast(self.writer.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def make_writer(path, output_format=None):
+    output_format = output_format or ('parquet' if path.endswith(('.parquet', '.pq')) else 'csv')
+    if output_format == 'parquet':
+        return ParquetChunkWriter(path)
+    return CsvChunkWriter(path)
+
+
+def batch_score(input_path, output_path, model_path='best_model.pkl', chunksize=100000, workers=1,
+                output_format=None):
+    """
+    Score input_path chunk by chunk and write the predictions to output_path
+
+    Args:
+        input_path: CSV with the same raw columns as the training data
+        output_path: Destination .csv or .parquet file
+        model_path: Trained model pickle
+        chunksize: Rows read, scored and written at a time
+        workers: Worker processes scoring chunks in parallel; at most
+            2 * workers chunks are in flight, so memory stays bounded
+        output_format: 'csv' or 'parquet'; inferred from output_path if None
+
+    Returns:
+        Dict with rows read, rows scored, rows dropped by preprocessing,
+        elapsed seconds and rows/sec
+    """
+    start = time.perf_counter()
+    rows_in = rows_out = 0
+    writer = make_writer(output_path, output_format)
+    reader = pd.read_csv(input_path, chunksize=chunksize)
+    empty = None
+
+    def write(scored):
+        nonlocal rows_out, empty
+        # Chunks with no rows left are not written: their all-NaN columns could fix the wrong Parquet schema
+        if len(scored):
+            writer.write(scored)
+            rows_out += len(scored)
+        elif empty is None:
+            empty = scored
+
+    try:
+        if workers <= 1:
+            # Large chunks score faster with the original forest than with the flattened serving copy
+            model = load_model(model_path, use_serving_artifact=False)
+            if getattr(model, 'feature_stats_', None) is None:
+                logger.warning("Model has no feature_stats_; per-state aggregates will be computed per chunk")
+            for chunk in reader:
+                rows_in += len(chunk)
+                write(score_chunk(chunk, model))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(model_path,)) as executor:
+                in_flight = deque()
+                for chunk in reader:
+                    rows_in += len(chunk)
+                    in_flight.append(executor.submit(_score_in_worker, chunk))
+                    # Write in input order and keep the number of buffered chunks bounded
+                    while len(in_flight) >= 2 * workers:
+                        write(in_flight.popleft().result())
+                while in_flight:
+                    write(in_flight.popleft().result())
+        if rows_out == 0 and empty is not None:
+            # Every row was dropped; still leave an output file with the columns
+            writer.write(empty)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'rows_in': rows_in,
+        'rows_scored': rows_out,
+        'rows_dropped': rows_in - rows_out,
+        'seconds': elapsed,
+        'rows_per_sec': rows_in / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', required=True, help='CSV file to score')
+    parser.add_argument('--output', required=True, help='Output .csv or .parquet file')
+    parser.add_argument('--model', default=os.environ.get('MODEL_PATH', 'best_model.pkl'))
+    parser.add_argument('--chunksize', type=int, default=100000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--format', choices=['csv', 'parquet'], help='Output format (default: from extension)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    summary = batch_score(args.input, args.output, model_path=args.model, chunksize=args.chunksize,
+                          workers=args.workers, output_format=args.format)
+    print(f"Scored {summary['rows_scored']:,} of {summary['rows_in']:,} rows in {summary['seconds']:.1f}s "
+          f"({summary['rows_per_sec']:,.0f} rows/sec) -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
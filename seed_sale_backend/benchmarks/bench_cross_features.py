@@ -0,0 +1,65 @@
+"""
+String vs integer-coded cross features.
+
+Times FeatureEngineering.transform and a TargetEncoder fit/transform
+(what every CV fold of Training repeats) on synthetic scale-ups of
+case_study_data.csv, with the crosses built as concatenated strings and
+as integer keys, and checks that the encoded features are identical.
+
+Usage (from seed_sale_backend/):
+    python benchmarks/bench_cross_features.py --rows 100000 1000000 --products 20000
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'model'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from category_encoders import TargetEncoder
+
+from feature_engineering import CROSS_FEATURES, FeatureEngineering
+from synthetic_data import make_synthetic_data
+
+TARGET_COLS = ['PRODUCT', 'STATE', *CROSS_FEATURES]
+
+
+def run(df, cross_codes):
+    fe = FeatureEngineering(cross_codes=cross_codes).fit(df)
+
+    start = time.perf_counter()
+    features = fe.transform(df.copy())
+    transform_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    encoded = TargetEncoder(cols=TARGET_COLS).fit_transform(features[TARGET_COLS], features['UNITS'])
+    encode_seconds = time.perf_counter() - start
+
+    memory_mb = features[list(CROSS_FEATURES)].memory_usage(deep=True).sum() / 1e6
+    return transform_seconds, encode_seconds, memory_mb, encoded.to_numpy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--products', type=int, default=20000)
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    print(f"{'Rows':>10} {'Crosses':>8} {'Transform (s)':>14} {'Encoder (s)':>12} {'Cross MB':>9}  Match")
+    for n_rows in args.rows:
+        df = make_synthetic_data(n_rows, n_products=args.products)
+        results = {name: run(df, cross_codes) for name, cross_codes in (('string', False), ('coded', True))}
+        match = 'yes' if np.array_equal(results['string'][3], results['coded'][3]) else 'NO'
+        for name, (transform_seconds, encode_seconds, memory_mb, _) in results.items():
+            print(f"{n_rows:>10,} {name:>8} {transform_seconds:>14.3f} {encode_seconds:>12.3f} "
+                  f"{memory_mb:>9.1f}  {match}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Read time and memory of DataSourcing configurations.
+
+Compares pandas' default inference (object strings, int64/float64)
+against the typed SCHEMA read with the C and PyArrow parsers, and a
+Parquet cache hit, on the shipped CSVs and on a synthetic scale-up.
+
+Usage (from seed_sale_backend/):
+    python benchmarks/bench_data_sourcing.py --rows 1000000 --products 20000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(BACKEND_DIR, 'model')
+sys.path.insert(0, MODEL_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_sourcing import DataSourcing, _has_pyarrow
+from synthetic_data import make_synthetic_data
+
+
+def configurations(cache_dir):
+    configs = [
+        ('untyped', dict(typed=False, engine='c')),
+        ('typed-c', dict(typed=True, engine='c')),
+    ]
+    if _has_pyarrow():
+        configs.append(('typed-pyarrow', dict(typed=True, engine='pyarrow')))
+        configs.append(('parquet-cache', dict(typed=True, cache_dir=cache_dir)))
+    return configs
+
+
+def time_read(source, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        df = source.read_data_local()
+        best = min(best, time.perf_counter() - start)
+    return best, df
+
+
+def bench_file(path, repeats, cache_dir):
+    print(f"\n{os.path.basename(path)} ({os.path.getsize(path) / 1e6:.1f} MB on disk)")
+    print(f"{'Config':<16} {'Read (s)':>9} {'Memory (MB)':>12}")
+    for name, params in configurations(cache_dir):
+        source = DataSourcing(path, **params)
+        if params.get('cache_dir'):
+            source.read_data_local()  # populate the cache; only hits are timed
+        seconds, df = time_read(source, repeats)
+        memory_mb = df.memory_usage(deep=True).sum() / 1e6
+        print(f"{name:<16} {seconds:>9.3f} {memory_mb:>12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000, help='Rows in the synthetic dataset (0 to skip)')
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--states', type=int)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        paths = [os.path.join(MODEL_DIR, 'case_study_data.csv'),
+                 os.path.join(MODEL_DIR, 'synthetic_test_data.csv')]
+        if args.rows:
+            synthetic_path = os.path.join(work_dir, f'synthetic_{args.rows}.csv')
+            make_synthetic_data(args.rows, n_products=args.products, n_states=args.states).to_csv(
+                synthetic_path, index=False)
+            paths.append(synthetic_path)
+
+        for path in paths:
+            bench_file(path, args.repeats, os.path.join(work_dir, 'cache'))
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == '__main__':
+    main()
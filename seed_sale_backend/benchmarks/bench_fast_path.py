@@ -0,0 +1,67 @@
+"""
+Pandas-free fast path vs pred() per payload size.
+
+Builds JSON-like record payloads by sampling rows of the training data,
+checks that CompiledScorer.predict_records returns the same predictions
+as the regular pred() path (DataFrame -> preprocessing -> feature
+engineering -> Pipeline.predict), then times both.
+
+Usage (from seed_sale_backend/):
+    python benchmarks/bench_fast_path.py --model-path best_model.pkl --rows 1 10 100 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from predict import load_model, pred
+from fast_scoring import get_compiled_scorer
+
+
+def time_call(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return np.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-path', default=os.path.join(BACKEND_DIR, 'best_model.pkl'))
+    parser.add_argument('--data-path', default=os.path.join(BACKEND_DIR, 'model', 'case_study_data.csv'))
+    parser.add_argument('--rows', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    model = load_model(args.model_path)
+    scorer = get_compiled_scorer(model)
+    if scorer is None:
+        sys.exit("This model is not supported by the fast path")
+
+    source = pd.read_csv(args.data_path).dropna()
+    print(f"{'rows':>6} {'pandas ms':>10} {'fast ms':>10} {'speedup':>8}  match")
+    for n_rows in args.rows:
+        records = source.sample(n=n_rows, replace=True, random_state=n_rows).to_dict(orient='records')
+        # JSON payloads carry the integer flags as ints
+        records = [{k: int(v) if isinstance(v, (np.integer, bool)) else v for k, v in r.items()} for r in records]
+
+        expected = pred(pd.DataFrame(records), model)
+        fast = scorer.predict_records(records)
+        match = fast is not None and np.allclose(fast, expected, rtol=0, atol=1e-9)
+
+        pandas_time = time_call(lambda: pred(pd.DataFrame(records), model), args.repeats)
+        fast_time = time_call(lambda: scorer.predict_records(records), args.repeats)
+        print(f"{n_rows:>6} {pandas_time * 1000:>10.3f} {fast_time * 1000:>10.3f} "
+              f"{pandas_time / fast_time:>7.1f}x  {'yes' if match else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Model search time with and without Training's fold encoding cache.
+
+Runs the same search twice: once fitting the TargetEncoder/OrdinalEncoder
+again for every candidate and fold (fold_cache=False), and once over
+folds encoded a single time (fold_cache=True, see EncodedFolds). It
+prints, per model family, the search time of each, the share of it the
+cache removes and the largest difference between the two CV scores of
+the family winner, which should be zero up to float32 rounding.
+
+Usage (from seed_sale_backend/):
+    python benchmarks/bench_fold_cache.py
+    python benchmarks/bench_fold_cache.py --rows 100000 --families GradientBoostingRegressor Lasso Ridge
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import warnings
+
+from sklearn.model_selection import ParameterGrid
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(BACKEND_DIR, 'model')
+sys.path.insert(0, MODEL_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_sourcing import DataSourcing  # noqa: E402
+from data_preprocessing import DataPreprocessing  # noqa: E402
+from feature_engineering import FeatureEngineering  # noqa: E402
+from get_best_model import GetBestModel  # noqa: E402
+from training import Training, SEARCH_STRATEGIES  # noqa: E402
+from synthetic_data import make_synthetic_data, realistic_cardinalities  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=0,
+                        help='Synthetic rows to search on (0: case_study_data.csv itself)')
+    parser.add_argument('--families', nargs='+', default=['GradientBoostingRegressor', 'Lasso', 'Ridge'],
+                        help='Model class names of GetBestModel.get_model_param_list() to search')
+    parser.add_argument('--strategy', default='grid', choices=SEARCH_STRATEGIES)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    if args.rows:
+        n_products, n_states = realistic_cardinalities(args.rows)
+        df = make_synthetic_data(args.rows, n_products=n_products, n_states=n_states)
+    else:
+        df = DataSourcing(file_path=os.path.join(MODEL_DIR, 'case_study_data.csv')).read_data_local()
+    # Preprocessing prints its progress; keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = DataPreprocessing(df).preprocessing_fit()
+        df = FeatureEngineering().feature_engineering(df)
+
+    selector = GetBestModel(df)
+    model_param_list = [(model_class, grid) for model_class, grid in selector.get_model_param_list()
+                        if model_class.__name__ in args.families]
+    X_train, X_test, y_train, y_test = selector.train_test_split_data()
+
+    results = {}
+    for fold_cache in (False, True):
+        training = Training(X_train, y_train, X_test, y_test, selector.get_encoding_col(),
+                            search_strategy=args.strategy, n_jobs=args.n_jobs, fold_cache=fold_cache)
+        for model_class, grid in model_param_list:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                result = training.tune_model_with_gridsearch(model_class, grid)
+                results[model_class, fold_cache] = (time.perf_counter() - start, result)
+        if fold_cache:
+            cached = any(training.uses_fold_cache(grid) for _, grid in model_param_list)
+            encoding = (f"folds encoded once in {training.encoded_folds().seconds:.2f}s "
+                        f"(included in the first cached family)" if cached else "no family uses the fold cache")
+
+    print(f"{len(X_train):,} training rows, {args.strategy} search, {encoding}")
+    print(f"{'Model':<28} {'Candidates':>10} {'Uncached s':>11} {'Cached s':>9} {'Saved':>7} {'|ΔCV R²|':>10}")
+    totals = [0.0, 0.0]
+    for model_class, grid in model_param_list:
+        uncached_seconds, uncached = results[model_class, False]
+        cached_seconds, cached = results[model_class, True]
+        totals[0] += uncached_seconds
+        totals[1] += cached_seconds
+        print(f"{model_class.__name__:<28} {len(ParameterGrid(grid)):>10} {uncached_seconds:>11.1f} {cached_seconds:>9.1f} "
+              f"{1 - cached_seconds / uncached_seconds:>7.0%} {abs(uncached['cv_score'] - cached['cv_score']):>10.2e}")
+    print(f"{'total':<28} {'':>10} {totals[0]:>11.1f} {totals[1]:>9.1f} {1 - totals[1] / totals[0]:>7.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Incremental retrain (ModelPipeline.fit_incremental) against a cold fit.
+
+Splits synthetic sales data by season: the last SALESYEAR is the new
+partition, and 20% of its rows are held out to evaluate both models. The
+cold fit runs the model search over the history plus the new season. The
+incremental run fits the history alone first (not timed), then retrains
+with the new season added, forced into warm start or full search with
+--mode. The report gives both durations, the time saved and each model's
+R² on the held-out rows.
+
+Usage (from seed_sale_backend/):
+    python benchmarks/bench_incremental_training.py --rows 100000 --family rf
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from sklearn.linear_model import Lasso
+from sklearn.metrics import r2_score
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(BACKEND_DIR, 'model')
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, MODEL_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_preprocessing import DataPreprocessing  # noqa: E402
+from feature_engineering import FeatureEngineering  # noqa: E402
+from model_pipeline import ModelPipeline  # noqa: E402
+from simple_nn_regressor import SimpleNNRegressor  # noqa: E402
+from synthetic_data import make_synthetic_data, realistic_cardinalities  # noqa: E402
+
+FAMILIES = {
+    'rf': [(RandomForestRegressor, {'model__n_estimators': [100], 'model__min_samples_leaf': [1, 4]})],
+    'gb': [(GradientBoostingRegressor, {'model__n_estimators': [100], 'model__learning_rate': [0.1]})],
+    'lasso': [(Lasso, {'model__alpha': [0.01, 0.1]})],
+    'nn': [(SimpleNNRegressor, {'model__hidden_dim': [64], 'model__epochs': [10]})],
+}
+
+
+def held_out_r2(model, df_eval):
+    df = DataPreprocessing(df_eval.copy()).preprocessing_score()
+    df = FeatureEngineering(state_stats=model.feature_stats_).transform(df)
+    return r2_score(df['UNITS'], model.predict(df[model.feature_names_in_]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--family', choices=sorted(FAMILIES), default='rf')
+    parser.add_argument('--mode', choices=['warm_start', 'full_search'], default='warm_start',
+                        help='Retrain mode to force, by setting the drift threshold to +inf or -inf')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    n_products, n_states = realistic_cardinalities(args.rows)
+    df = make_synthetic_data(args.rows, n_products=n_products, n_states=n_states, seed=args.seed)
+    new_season = df['SALESYEAR'].max()
+    history = df[df['SALESYEAR'] != new_season]
+    new = df[df['SALESYEAR'] == new_season].sample(frac=1, random_state=args.seed)
+    n_eval = len(new) // 5
+    new_eval, new = new.iloc[:n_eval], new.iloc[n_eval:]
+    model_param_list = FAMILIES[args.family]
+    drift_threshold = float('inf') if args.mode == 'warm_start' else float('-inf')
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        paths = {name: os.path.join(work_dir, f'{name}.csv') for name in ('history', 'new', 'all')}
+        history.to_csv(paths['history'], index=False)
+        new.to_csv(paths['new'], index=False)
+        pd.concat([history, new]).to_csv(paths['all'], index=False)
+
+        # The pipeline prints its progress; keep it out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            cold_model = ModelPipeline(data_path=paths['all'], model_param_list=model_param_list).fit()
+            cold_seconds = time.perf_counter() - start
+
+            pipeline = ModelPipeline(data_path=paths['history'], model_param_list=model_param_list,
+                                     history_dir=os.path.join(work_dir, 'history'))
+            previous_model = pipeline.fit()
+            start = time.perf_counter()
+            incremental_model = pipeline.fit_incremental(paths['new'], previous_model, drift_threshold=drift_threshold)
+            incremental_seconds = time.perf_counter() - start
+
+            cold_r2 = held_out_r2(cold_model, new_eval)
+            previous_r2 = held_out_r2(previous_model, new_eval)
+            incremental_r2 = held_out_r2(incremental_model, new_eval)
+
+    metrics = incremental_model.training_metrics_
+    print(f"{args.family}: {len(history):,} history rows + {len(new):,} new rows of SALESYEAR {new_season}, "
+          f"{len(new_eval):,} held out")
+    print(f"{'Run':<24} {'Seconds':>9} {'Held-out R²':>12}")
+    print(f"{'previous (history only)':<24} {'':>9} {previous_r2:>12.4f}")
+    print(f"{'cold fit':<24} {cold_seconds:>9.1f} {cold_r2:>12.4f}")
+    print(f"{'incremental ' + metrics['retrain_mode']:<24} {incremental_seconds:>9.1f} {incremental_r2:>12.4f}")
+    print(f"time saved {cold_seconds - incremental_seconds:.1f}s ({1 - incremental_seconds / cold_seconds:.0%}), "
+          f"validation drift {metrics['validation_drift']:.4f}")
+
+
+if __name__ == '__main__':
+    main()
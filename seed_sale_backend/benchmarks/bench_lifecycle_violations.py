@@ -0,0 +1,84 @@
+"""
+Vectorized vs per-product loop remove_lifecycle_violations.
+
+The loop is the previous implementation (groupby('PRODUCT').apply with a
+Python loop over the lifecycle codes of each product). Both run on
+synthetic scale-ups of case_study_data.csv and must keep the same rows.
+
+Usage (from seed_sale_backend/):
+    python benchmarks/bench_lifecycle_violations.py --rows 100000 1000000 --products 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'model'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_preprocessing import DataPreprocessing
+from synthetic_data import make_synthetic_data
+
+
+def remove_lifecycle_violations_loop(df):
+    lifecycle_order = ['INTRODUCTION', 'ESTABLISHED', 'EXPANSION', 'PHASEOUT']
+    df['LIFECYCLE'] = pd.Categorical(df['LIFECYCLE'], categories=lifecycle_order, ordered=True)
+
+    df = df.sort_values(by=['PRODUCT', 'SALESYEAR']).reset_index(drop=True)
+
+    def drop_lifecycle_violations(group):
+        max_code = -1
+        mask = []
+        for lc in group['LIFECYCLE'].cat.codes:
+            if lc < max_code:
+                mask.append(False)
+            else:
+                max_code = max(max_code, lc)
+                mask.append(True)
+        return group[mask]
+
+    # Grouping by an array keeps PRODUCT in each group on pandas versions that exclude grouping columns from apply
+    df = df.groupby(df['PRODUCT'].to_numpy(), group_keys=False).apply(drop_lifecycle_violations)
+
+    return df.sort_values(by=['PRODUCT', 'SALESYEAR', 'LIFECYCLE']).reset_index(drop=True)
+
+
+def remove_lifecycle_violations_vectorized(df):
+    preprocessing = DataPreprocessing(df)
+    preprocessing.remove_lifecycle_violations()
+    return preprocessing.df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--skip-loop-above', type=int, default=2000000,
+                        help='Only time the vectorized version for datasets larger than this')
+    args = parser.parse_args()
+
+    print(f"{'Rows':>10} {'Products':>9} {'Kept':>10} {'Loop (s)':>9} {'Vector (s)':>11} {'Speedup':>8}  Match")
+    for n_rows in args.rows:
+        df = make_synthetic_data(n_rows, n_products=args.products)
+
+        start = time.perf_counter()
+        vectorized = remove_lifecycle_violations_vectorized(df.copy())
+        vector_seconds = time.perf_counter() - start
+
+        if n_rows > args.skip_loop_above:
+            loop_seconds, match = float('nan'), '-'
+        else:
+            start = time.perf_counter()
+            loop = remove_lifecycle_violations_loop(df.copy())
+            loop_seconds = time.perf_counter() - start
+            match = 'yes' if loop.equals(vectorized) else 'NO'
+
+        print(f"{n_rows:>10,} {df['PRODUCT'].nunique():>9,} {len(vectorized):>10,} {loop_seconds:>9.2f} "
+              f"{vector_seconds:>11.3f} {loop_seconds / vector_seconds:>7.0f}x  {match}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Load time and per-worker memory of the plain model pickle vs the
+manifest + memory-mapped serving artifact.
+
+Starts --workers processes at once, as gunicorn does, and has each load
+the model either the old way (joblib.load of the whole pickle) or through
+predict.load_model, which memory-maps the flattened-forest serving copy.
+Each worker then scores a warm-up batch, since memory-mapped pages are
+only read in once predictions touch them. Memory is read from
+/proc/self/smaps_rollup while every worker still holds its model: RSS counts shared file pages in full in every worker,
+PSS splits them between the workers mapping them, and Private is what
+each worker alone adds to the host.
+
+Without --model-path, a 300-tree RandomForestRegressor with unbounded
+depth (the largest forest in the training grid) is trained on a
+synthetic scale-up of the case study data and saved to a temporary
+directory.
+
+Usage (from seed_sale_backend/):
+    python benchmarks/bench_model_artifact.py --workers 4
+    python benchmarks/bench_model_artifact.py --model-path best_model.pkl --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'model'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DATA_PATH = os.path.join(BACKEND_DIR, 'model', 'case_study_data.csv')
+MEMORY_FIELDS = ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty')
+
+
+def memory_mb():
+    """Rss, Pss and Private (clean + dirty) of this process in MiB"""
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in MEMORY_FIELDS:
+                values[key] = int(rest.split()[0]) / 1024
+    return {'rss': values['Rss'], 'pss': values['Pss'],
+            'private': values['Private_Clean'] + values['Private_Dirty']}
+
+
+def worker(model_path, mode, warmup_rows, barrier, results):
+    import warnings
+    import joblib
+    import pandas as pd
+    from predict import load_model, pred
+    # Import what the pickles reference up front, so only unpickling is timed
+    import category_encoders, sklearn.compose, sklearn.ensemble, sklearn.pipeline, flat_forest  # noqa: F401
+
+    before = memory_mb()
+    start = time.perf_counter()
+    if mode == 'pickle':
+        model = joblib.load(model_path)
+    else:
+        model = load_model(model_path)
+    seconds = time.perf_counter() - start
+
+    warnings.filterwarnings('ignore')
+    df = pd.read_csv(DATA_PATH).drop(columns=['UNITS']).head(warmup_rows)
+    start = time.perf_counter()
+    pred(df, model)
+    warmup_seconds = time.perf_counter() - start
+
+    # Measure once every worker holds its model, so shared pages are split between them
+    barrier.wait()
+    after = memory_mb()
+    results.put({'seconds': seconds, 'warmup_seconds': warmup_seconds, 'estimator': type(model.steps[-1][1]).__name__,
+                 **{key: after[key] - before[key] for key in after}})
+    barrier.wait()
+
+
+def run(model_path, mode, n_workers, warmup_rows):
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(n_workers)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(model_path, mode, warmup_rows, barrier, results))
+                 for _ in range(n_workers)]
+    for process in processes:
+        process.start()
+    stats = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return stats
+
+
+def train_forest(directory, n_rows, n_estimators):
+    import warnings
+    from sklearn.ensemble import RandomForestRegressor
+    from data_preprocessing import DataPreprocessing
+    from feature_engineering import FeatureEngineering
+    from get_best_model import GetBestModel
+    from training import Training
+    from utils import save_model
+    from synthetic_data import make_synthetic_data
+
+    warnings.filterwarnings('ignore')
+    # Enough products that aggregating by product, state and year keeps most rows
+    df = DataPreprocessing(make_synthetic_data(n_rows, n_products=n_rows // 4)).preprocessing_fit()
+    feature_engineering = FeatureEngineering().fit(df)
+    df = feature_engineering.transform(df)
+
+    get_best_model = GetBestModel(df)
+    X_train, X_test, y_train, y_test = get_best_model.train_test_split_data()
+    training = Training(X_train, y_train, X_test, y_test, get_best_model.get_encoding_col())
+    model = training.build_pipeline(RandomForestRegressor(n_estimators=n_estimators, n_jobs=-1, random_state=42))
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    print(f"Trained {n_estimators} trees on {len(X_train):,} rows in {time.perf_counter() - start:.1f}s")
+    model.feature_stats_ = feature_engineering.state_stats
+
+    model_path = os.path.join(directory, 'forest.pkl')
+    save_model(model, model_path)
+    return model_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-path', help='Model saved by model.utils.save_model (default: train one)')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rows', type=int, default=20000, help='Training rows of the default forest')
+    parser.add_argument('--n-estimators', type=int, default=300)
+    parser.add_argument('--warmup-rows', type=int, default=1000, help='Rows each worker scores before measuring')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        model_path = args.model_path or train_forest(directory, args.rows, args.n_estimators)
+        files = [model_path] + [path for path in (os.path.splitext(model_path)[0] + '.serving.pkl',)
+                                if os.path.exists(path)]
+        for path in files:
+            print(f"{os.path.basename(path)}: {os.path.getsize(path) / 2 ** 20:,.1f} MiB")
+
+        print(f"{'Artifact':<10} {'Estimator':<22} {'Load s':>8} {'Warm-up s':>10} {'RSS MiB':>9} "
+              f"{'PSS MiB':>9} {'Private MiB':>12} {'Host MiB':>9}")
+        for mode in ('pickle', 'serving'):
+            stats = run(model_path, mode, args.workers, args.warmup_rows)
+            mean = {key: sum(s[key] for s in stats) / len(stats)
+                    for key in ('seconds', 'warmup_seconds', 'rss', 'pss', 'private')}
+            # PSS summed over workers is what the model costs the host
+            host = sum(s['pss'] for s in stats)
+            print(f"{mode:<10} {stats[0]['estimator']:<22} {mean['seconds']:>8.2f} {mean['warmup_seconds']:>10.3f} "
+                  f"{mean['rss']:>9.1f} {mean['pss']:>9.1f} {mean['private']:>12.1f} {host:>9.1f}")
+        print(f"{args.workers} workers; per-worker figures are means of the change caused by loading the model")
+
+
+if __name__ == '__main__':
+    main()
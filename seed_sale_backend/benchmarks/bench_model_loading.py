@@ -0,0 +1,69 @@
+"""
+Cold vs warm /predict latency.
+
+Cold reproduces the old behaviour of the /predict route, which ran
+joblib.load on every request before scoring. Warm posts to /predict
+through the Flask test client with the model resident in the registry.
+
+Usage (from seed_sale_backend/):
+    python benchmarks/bench_model_loading.py --model-path best_model.pkl --requests 50
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def summarize(name, timings):
+    timings_ms = np.array(timings) * 1000
+    print(f"{name:<6} n={len(timings_ms):<4} "
+          f"mean={timings_ms.mean():8.2f}ms  "
+          f"p50={np.percentile(timings_ms, 50):8.2f}ms  "
+          f"p95={np.percentile(timings_ms, 95):8.2f}ms")
+    return np.percentile(timings_ms, 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-path', default=os.path.join(BACKEND_DIR, 'best_model.pkl'))
+    parser.add_argument('--data-path', default=os.path.join(BACKEND_DIR, 'model', 'synthetic_test_data.csv'))
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ['MODEL_PATH'] = args.model_path
+    import app as app_module
+    from predict import load_model, pred
+
+    if app_module.model is None:
+        sys.exit(f"Could not load model from {args.model_path}")
+
+    records = pd.read_csv(args.data_path).to_dict(orient='records')
+    client = app_module.app.test_client()
+
+    cold = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        pred(pd.DataFrame(records), load_model(args.model_path))
+        cold.append(time.perf_counter() - start)
+
+    warm = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        response = client.post('/predict', json={'data': records})
+        warm.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.get_json()
+
+    print(f"{len(records)} rows per request, model: {app_module.model_info['estimator']}")
+    cold_p50 = summarize('cold', cold)
+    warm_p50 = summarize('warm', warm)
+    print(f"p50 speedup: {cold_p50 / warm_p50:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
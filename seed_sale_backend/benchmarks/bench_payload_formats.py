@@ -0,0 +1,85 @@
+"""
+/predict payload size and end-to-end latency per request body format.
+
+Posts the same rows as row-oriented JSON, column-oriented JSON, an Arrow
+IPC stream and Parquet through the Flask test client, with predictions
+returned in the request's format, and checks that every format yields the
+predictions of the row-oriented JSON request. Latency covers parsing the
+body, scoring and encoding the response, not the network.
+
+Usage (from seed_sale_backend/):
+    python benchmarks/bench_payload_formats.py --model-path best_model.pkl --rows 1000 10000 50000
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_data import make_synthetic_data  # noqa: E402
+import payload_formats  # noqa: E402
+
+FORMATS = [
+    ('json records', payload_formats.JSON),
+    ('json columns', payload_formats.JSON),
+    ('arrow stream', payload_formats.ARROW_STREAM),
+    ('parquet', payload_formats.PARQUET),
+]
+
+
+def encode(name, df, content_type):
+    if name == 'json records':
+        return json.dumps({'data': df.to_dict(orient='records')}).encode()
+    return payload_formats.encode_frame(df, content_type)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-path', default=os.path.join(BACKEND_DIR, 'best_model.pkl'))
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ['MODEL_PATH'] = args.model_path
+    import logging
+    import app as app_module
+
+    if app_module.model is None:
+        sys.exit(f"Could not load model from {args.model_path}")
+    logging.getLogger('app').setLevel(logging.WARNING)
+    client = app_module.app.test_client()
+
+    print(f"{'Rows':>7} {'Format':<13} {'Request KiB':>12} {'Response KiB':>13} {'Mean ms':>9} {'p50 ms':>9}  Match")
+    for n_rows in args.rows:
+        df = make_synthetic_data(n_rows, seed=n_rows).drop(columns=['UNITS'])
+        expected = None
+        for name, content_type in FORMATS:
+            body = encode(name, df, content_type)
+            timings = []
+            for _ in range(args.repeat):
+                # Scoring preprocessing prints progress; keep it out of the table
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    response = client.post('/predict', data=body, content_type=content_type)
+                    timings.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.get_data(as_text=True)
+
+            predictions = payload_formats.read_predictions(response.get_data(), content_type)
+            if expected is None:
+                expected = predictions
+            timings_ms = np.array(timings) * 1000
+            print(f"{n_rows:>7,} {name:<13} {len(body) / 1024:>12,.1f} {len(response.get_data()) / 1024:>13,.1f} "
+                  f"{timings_ms.mean():>9.1f} {np.percentile(timings_ms, 50):>9.1f}  "
+                  f"{'yes' if np.array_equal(predictions, expected) else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
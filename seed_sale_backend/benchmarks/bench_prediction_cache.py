@@ -0,0 +1,75 @@
+"""
+/predict latency with and without the prediction cache.
+
+Replays a workload in which requests repeat rows: each request draws its
+rows from a pool of distinct product/state/year rows, so the cache
+warms up as the pool gets covered. Responses with the cache on must
+match the uncached ones.
+
+Usage (from seed_sale_backend/):
+    python benchmarks/bench_prediction_cache.py --model-path best_model.pkl --pool 500 --rows 50 --requests 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def replay(client, payloads):
+    timings, responses = [], []
+    for payload in payloads:
+        start = time.perf_counter()
+        response = client.post('/predict', json={'data': payload})
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.get_json()
+        responses.append(response.get_json()['predictions'])
+    return np.array(timings) * 1000, responses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-path', default=os.path.join(BACKEND_DIR, 'best_model.pkl'))
+    parser.add_argument('--data-path', default=os.path.join(BACKEND_DIR, 'model', 'case_study_data.csv'))
+    parser.add_argument('--pool', type=int, default=500, help='Distinct rows requests draw from')
+    parser.add_argument('--rows', type=int, default=50, help='Rows per request')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ['MODEL_PATH'] = args.model_path
+    os.environ['PREDICT_CACHE'] = '1'
+    import app as app_module
+
+    if app_module.model is None:
+        sys.exit(f"Could not load model from {args.model_path}")
+    cache = app_module.prediction_cache
+
+    rows = pd.read_csv(args.data_path).drop(columns=['UNITS']).dropna()
+    pool = rows.sample(min(args.pool, len(rows)), random_state=args.seed).to_dict(orient='records')
+    rng = np.random.default_rng(args.seed)
+    payloads = [[pool[i] for i in rng.integers(0, len(pool), size=args.rows)] for _ in range(args.requests)]
+    client = app_module.app.test_client()
+
+    app_module.prediction_cache = None
+    off_ms, expected = replay(client, payloads)
+
+    app_module.prediction_cache = cache
+    on_ms, responses = replay(client, payloads)
+    stats = cache.stats()
+
+    for name, timings in (('off', off_ms), ('on', on_ms)):
+        print(f"cache {name:<4} mean={timings.mean():8.2f}ms  p50={np.percentile(timings, 50):8.2f}ms  "
+              f"p95={np.percentile(timings, 95):8.2f}ms")
+    print(f"hit ratio {stats['hit_ratio']:.1%}, {stats['entries']} entries, {stats['memory_bytes'] / 1024:.1f} KiB, "
+          f"bypassed requests {stats['bypassed_requests']}")
+    print(f"match {'yes' if responses == expected else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Latency of pred(..., intervals=True) over a point prediction.
+
+Scores synthetic rows with each given model, once as pred(df, model) and
+once with intervals, and prints the median time of each and the added
+latency. Forests compute quantiles of their per-tree predictions
+('trees'); other families add their stored residual quantiles
+('residuals'). Forest models are scored both as the original pickle
+and as the flattened serving artifact.
+
+Usage (from seed_sale_backend/):
+    python benchmarks/bench_prediction_intervals.py --model-paths best_model.pkl --rows 10 1000 50000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from predict import load_model, pred  # noqa: E402
+from model.utils import read_manifest  # noqa: E402
+from synthetic_data import make_synthetic_data  # noqa: E402
+
+
+def median_seconds(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-paths', nargs='+', default=[os.path.join(BACKEND_DIR, 'best_model.pkl')])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10, 1000, 50000])
+    parser.add_argument('--quantiles', type=float, nargs='+', default=[0.1, 0.5, 0.9])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'Model':<28} {'Method':<10} {'Rows':>7} {'Point ms':>10} {'Intervals ms':>13} {'Added':>8}")
+    for model_path in args.model_paths:
+        variants = [(os.path.basename(model_path), load_model(model_path, use_serving_artifact=False))]
+        manifest = read_manifest(model_path)
+        if manifest and manifest.get('serving_file'):
+            variants.append((os.path.basename(model_path) + ' (serving)', load_model(model_path)))
+
+        for name, model in variants:
+            for n_rows in args.rows:
+                df = make_synthetic_data(n_rows, seed=n_rows).drop(columns=['UNITS'])
+                # Scoring preprocessing prints progress; keep it out of the table
+                with contextlib.redirect_stdout(io.StringIO()):
+                    _, _, method = pred(df.copy(), model, intervals=True, quantiles=args.quantiles)
+                    point = median_seconds(lambda: pred(df.copy(), model), args.repeat)
+                    intervals = median_seconds(
+                        lambda: pred(df.copy(), model, intervals=True, quantiles=args.quantiles), args.repeat)
+                print(f"{name:<28} {method:<10} {n_rows:>7,} {point * 1000:>10.1f} {intervals * 1000:>13.1f} "
+                      f"{intervals / point - 1:>8.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Time and peak memory of preprocessing_fit, fused vs step by step.
+
+The step-by-step path runs handle_duplicates, handle_missing_val,
+handle_aggregations and handle_outlier one after the other, as
+preprocessing_fit used to; the fused path is the current
+preprocessing_fit. Peak memory is the tracemalloc peak above the input
+frame. Both outputs must be identical.
+
+Usage (from seed_sale_backend/):
+    python benchmarks/bench_preprocessing.py --scale 10
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(BACKEND_DIR, 'model')
+sys.path.insert(0, MODEL_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_preprocessing import DataPreprocessing
+from data_sourcing import DataSourcing
+from synthetic_data import make_synthetic_data
+
+
+def step_by_step(df):
+    preprocessing = DataPreprocessing(df)
+    preprocessing.handle_duplicates()
+    preprocessing.handle_missing_val()
+    preprocessing.handle_aggregations()
+    preprocessing.handle_outlier()
+    return preprocessing.df
+
+
+def fused(df):
+    return DataPreprocessing(df).preprocessing_fit()
+
+
+def measure(func, df):
+    df = df.copy()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(df)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10, 100],
+                        help='Dataset sizes as multiples of case_study_data.csv')
+    parser.add_argument('--untyped', action='store_true', help='Read without the DataSourcing schema')
+    args = parser.parse_args()
+
+    source = os.path.join(MODEL_DIR, 'case_study_data.csv')
+    n_source = len(pd.read_csv(source))
+
+    print(f"{'Rows':>10} {'Out':>8} {'Steps (s)':>10} {'Fused (s)':>10} {'Steps peak MB':>14} "
+          f"{'Fused peak MB':>14}  Match")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for scale in args.scale:
+            if scale == 1:
+                path = source
+            else:
+                path = os.path.join(work_dir, f'scaled_{scale}.csv')
+                make_synthetic_data(n_source * scale, n_products=100 * scale).to_csv(path, index=False)
+            df = DataSourcing(path, typed=not args.untyped).read_data_local()
+
+            expected, step_seconds, step_peak = measure(step_by_step, df)
+            result, fused_seconds, fused_peak = measure(fused, df)
+            match = 'yes' if expected.equals(result) else 'NO'
+            print(f"{len(df):>10,} {len(result):>8,} {step_seconds:>10.3f} {fused_seconds:>10.3f} "
+                  f"{step_peak:>14.1f} {fused_peak:>14.1f}  {match}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+/predict/scenarios against scoring the same scenarios through /predict.
+
+Expands a grid of states x sales years x products around one record of
+the case study data and scores it three ways through the Flask test
+client: one /predict/scenarios request, one /predict request holding every
+scenario row, and one /predict request per scenario (the frontend's
+current pattern). Reports the wall time of each and checks that all three
+return the same predictions.
+
+Usage (from seed_sale_backend/):
+    python benchmarks/bench_scenarios.py --model-path best_model.pkl --years 5 --products 10 20 50
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-path', default=os.path.join(BACKEND_DIR, 'best_model.pkl'))
+    parser.add_argument('--data-path', default=os.path.join(BACKEND_DIR, 'model', 'case_study_data.csv'))
+    parser.add_argument('--years', type=int, default=5, help='Sales years varied')
+    parser.add_argument('--products', type=int, nargs='+', default=[10, 20, 50], help='Products varied, per run')
+    parser.add_argument('--max-single-requests', type=int, default=2000,
+                        help='Skip the request-per-scenario run above this many scenarios')
+    args = parser.parse_args()
+
+    os.environ['MODEL_PATH'] = args.model_path
+    import logging
+    import app as app_module
+
+    if app_module.model is None:
+        sys.exit(f"Could not load model from {args.model_path}")
+    logging.getLogger('app').setLevel(logging.WARNING)
+    client = app_module.app.test_client()
+
+    data = pd.read_csv(args.data_path).dropna()
+    base = {k: (v.item() if hasattr(v, 'item') else v) for k, v in data.drop(columns=['UNITS']).iloc[0].items()}
+    states = data['STATE'].unique().tolist()
+    first_year = int(data['SALESYEAR'].min())
+
+    # Warm up the model and encoders outside the timings
+    with contextlib.redirect_stdout(io.StringIO()):
+        client.post('/predict/scenarios', json={'base': base, 'vary': {'STATE': states}})
+
+    print(f"{'Scenarios':>9} {'scenarios ms':>13} {'one /predict ms':>16} {'per-row /predict ms':>20}  Match")
+    for n_products in args.products:
+        vary = {
+            'STATE': states,
+            'SALESYEAR': {'start': first_year, 'stop': first_year + args.years},
+            'PRODUCT': data['PRODUCT'].unique()[:n_products].tolist(),
+        }
+        years = list(range(first_year, first_year + args.years))
+        rows = [dict(base, STATE=state, SALESYEAR=year, PRODUCT=product)
+                for state, year, product in itertools.product(states, years, vary['PRODUCT'])]
+
+        # Scoring preprocessing prints progress; keep it out of the table
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            response = client.post('/predict/scenarios', json={'base': base, 'vary': vary})
+            scenario_seconds = time.perf_counter() - start
+            assert response.status_code == 200, response.get_data(as_text=True)
+            body = response.get_json()
+            # The test client sorts JSON keys, so follow the axes order of the response
+            order = [['STATE', 'SALESYEAR', 'PRODUCT'].index(axis['field']) for axis in body['axes']]
+            scenario_predictions = np.transpose(np.array(body['predictions'], dtype=float),
+                                                np.argsort(order)).ravel()
+
+            start = time.perf_counter()
+            batch_predictions = np.array(client.post('/predict', json={'data': rows}).get_json()['predictions'])
+            batch_seconds = time.perf_counter() - start
+
+            single_seconds = None
+            match = np.allclose(scenario_predictions, batch_predictions)
+            if len(rows) <= args.max_single_requests:
+                start = time.perf_counter()
+                single_predictions = [client.post('/predict', json={'data': [row]}).get_json()['predictions'][0]
+                                      for row in rows]
+                single_seconds = time.perf_counter() - start
+                match = match and np.allclose(scenario_predictions, single_predictions)
+
+        single = f"{single_seconds * 1000:>20,.1f}" if single_seconds is not None else f"{'skipped':>20}"
+        print(f"{len(rows):>9,} {scenario_seconds * 1000:>13,.1f} {batch_seconds * 1000:>16,.1f} {single}  "
+              f"{'yes' if match else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Final CV R² and total fit time of each Training search strategy.
+
+Runs the GetBestModel search space over case_study_data.csv once per
+strategy ('grid', 'random', 'halving') and prints, per strategy, the
+winning family, its CV and test R² and the wall-clock time of the search.
+
+Usage (from seed_sale_backend/):
+    python benchmarks/bench_search_strategies.py
+    python benchmarks/bench_search_strategies.py --families GradientBoostingRegressor Lasso Ridge
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(BACKEND_DIR, 'model')
+sys.path.insert(0, MODEL_DIR)
+
+from data_sourcing import DataSourcing
+from data_preprocessing import DataPreprocessing
+from feature_engineering import FeatureEngineering
+from get_best_model import GetBestModel
+from training import Training, SEARCH_STRATEGIES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data-path', default=os.path.join(MODEL_DIR, 'case_study_data.csv'))
+    parser.add_argument('--strategies', nargs='+', default=list(SEARCH_STRATEGIES), choices=SEARCH_STRATEGIES)
+    parser.add_argument('--families', nargs='+', help='Model class names to include (default: all)')
+    parser.add_argument('--n-iter', type=int, default=10, help='Candidates sampled per family by the random strategy')
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    df = DataSourcing(file_path=args.data_path).read_data_local()
+    df = DataPreprocessing(df).preprocessing_fit()
+    df = FeatureEngineering().feature_engineering(df)
+
+    selector = GetBestModel(df)
+    model_param_list = [
+        (model_class, grid) for model_class, grid in selector.get_model_param_list()
+        if not args.families or model_class.__name__ in args.families
+    ]
+    X_train, X_test, y_train, y_test = selector.train_test_split_data()
+
+    rows = []
+    for strategy in args.strategies:
+        training = Training(X_train, y_train, X_test, y_test, selector.get_encoding_col(),
+                            search_strategy=strategy, n_iter=args.n_iter)
+        start = time.perf_counter()
+        best = training.tune_multiple_models_with_gridsearch(model_param_list, single_search=True)
+        rows.append((strategy, best['model_class'].__name__, best['cv_score'], best['test_r2'],
+                     time.perf_counter() - start))
+
+    print()
+    print(f"{'strategy':<10} {'best model':<28} {'CV R²':>8} {'test R²':>8} {'seconds':>9}")
+    for strategy, name, cv_score, test_r2, seconds in rows:
+        print(f"{strategy:<10} {name:<28} {cv_score:>8.4f} {test_r2:>8.4f} {seconds:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
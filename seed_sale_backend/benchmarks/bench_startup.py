@@ -0,0 +1,70 @@
+"""
+Cold start of the serving process: time to import app.py and load a model.
+
+Runs `python -X importtime -c "import app"` in a fresh interpreter with
+MODEL_PATH pointing at each model, and reports the wall time
+of the process, the time spent importing app (which loads the model) and
+the packages that took longest to import, with their cumulative import
+time. Packages import one another (scikit-learn imports scipy, for
+instance), so those times overlap. The first row starts without a model,
+which is the floor every model adds its runtime dependencies to.
+
+Usage (from seed_sale_backend/):
+    python benchmarks/bench_startup.py --model-paths best_model.pkl
+    python benchmarks/bench_startup.py --model-paths rf.pkl nn.pkl --repeat 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(stderr):
+    """{module: cumulative import seconds} from the -X importtime report"""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def start_once(model_path):
+    env = dict(os.environ, MODEL_PATH=model_path or os.path.join(BACKEND_DIR, 'no_model.pkl'))
+    code = "import app; print(app.model is not None)"
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        sys.exit(f"Starting app with {model_path} failed:\n{result.stderr[-2000:]}")
+    return wall, result.stdout.strip().splitlines()[-1] == 'True', import_times(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-paths', nargs='+', default=[os.path.join(BACKEND_DIR, 'best_model.pkl')])
+    parser.add_argument('--repeat', type=int, default=3, help='Processes started per model; medians are reported')
+    parser.add_argument('--top', type=int, default=5, help='Slowest top-level packages shown per model')
+    args = parser.parse_args()
+
+    print(f"{'Model':<24} {'Loaded':>6} {'Wall s':>7} {'import app s':>13}  Slowest packages (cumulative s)")
+    for model_path in [None] + args.model_paths:
+        runs = [start_once(model_path) for _ in range(args.repeat)]
+        wall = float(np.median([run[0] for run in runs]))
+        times = {name: float(np.median([run[2].get(name, 0.0) for run in runs]))
+                 for name in runs[0][2] if '.' not in name}
+        packages = sorted((name for name in times if name != 'app'), key=times.get, reverse=True)[:args.top]
+        name = os.path.basename(model_path) if model_path else '(no model)'
+        print(f"{name:<24} {'yes' if runs[0][1] else 'no':>6} {wall:>7.2f} {times['app']:>13.2f}  "
+              + ', '.join(f"{package} {times[package]:.2f}" for package in packages))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Load generator for a running prediction server.
+
+Posts /predict requests from --concurrency client threads, each on its own
+keep-alive connection, for --duration seconds (or --requests in total),
+and reports throughput and latency percentiles of the successful ones,
+plus failed requests by status (e.g. 429s from asgi_app.py). Payloads are
+drawn from the case study data, --rows rows per request.
+
+Usage (from seed_sale_backend/, with `python serve.py --workers 4` or uvicorn running):
+    python benchmarks/load_generator.py --url http://127.0.0.1:5001 --concurrency 8 --duration 30 --rows 10
+"""
+import argparse
+import http.client
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def client(url, payloads, deadline, remaining, lock, latencies, errors):
+    parsed = urlparse(url)
+    connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=60)
+    path = (parsed.path.rstrip('/') or '') + '/predict'
+    headers = {'Content-Type': 'application/json'}
+    i = 0
+    while time.perf_counter() < deadline:
+        with lock:
+            if remaining[0] == 0:
+                break
+            remaining[0] -= 1
+        body = payloads[i % len(payloads)]
+        i += 1
+
+        start = time.perf_counter()
+        try:
+            connection.request('POST', path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            # The server may close a connection between requests; reconnect on the next one
+            connection.close()
+            status = 'connection error'
+        elapsed = time.perf_counter() - start
+
+        with lock:
+            if status == 200:
+                latencies.append(elapsed)
+            else:
+                errors[status] = errors.get(status, 0) + 1
+    connection.close()
+
+
+def run(url, payloads, concurrency, duration, n_requests):
+    latencies, errors, remaining = [], {}, [n_requests if n_requests else -1]
+    lock = threading.Lock()
+    start = time.perf_counter()
+    deadline = start + duration if duration else float('inf')
+    threads = [threading.Thread(target=client, args=(url, payloads[i::concurrency] or payloads, deadline, remaining,
+                                                     lock, latencies, errors))
+               for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5001')
+    parser.add_argument('--data-path', default=os.path.join(BACKEND_DIR, 'model', 'case_study_data.csv'))
+    parser.add_argument('--concurrency', type=int, default=8, help='Client threads, one connection each')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run (0: until --requests are sent)')
+    parser.add_argument('--requests', type=int, default=0, help='Total requests to send (0: no limit)')
+    parser.add_argument('--rows', type=int, default=10, help='Rows per request')
+    parser.add_argument('--warmup', type=int, default=20, help='Requests sent and discarded before measuring')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if not args.duration and not args.requests:
+        parser.error('set --duration or --requests')
+
+    rows = pd.read_csv(args.data_path).drop(columns=['UNITS']).dropna()
+    rng = np.random.default_rng(args.seed)
+    payloads = []
+    for _ in range(256):
+        sample = rows.iloc[rng.integers(0, len(rows), size=args.rows)]
+        payloads.append(json.dumps({'data': sample.to_dict(orient='records')}).encode())
+
+    if args.warmup:
+        run(args.url, payloads, min(args.concurrency, args.warmup), 0, args.warmup)
+    latencies, errors, elapsed = run(args.url, payloads, args.concurrency, args.duration, args.requests)
+
+    if not latencies:
+        raise SystemExit(f"No successful requests against {args.url}, errors by status: {errors}")
+    latencies_ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    print(f"{len(latencies):,} requests ({args.rows} rows each) in {elapsed:.1f}s from {args.concurrency} clients, "
+          f"{sum(errors.values())} errors{f' {errors}' if errors else ''}")
+    print(f"throughput {len(latencies) / elapsed:,.1f} req/s, {len(latencies) * args.rows / elapsed:,.0f} rows/s")
+    print(f"latency mean={latencies_ms.mean():.2f}ms  p50={p50:.2f}ms  p95={p95:.2f}ms  p99={p99:.2f}ms  "
+          f"max={latencies_ms.max():.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,390 @@
+"""
+Benchmark harness for the training pipeline and the serving hot paths.
+
+`run` times every case at each dataset size and writes the results to a
+JSON file; `compare` matches two such files case by case and flags the
+cases that got slower than a threshold, exiting with status 1 if any did.
+
+Datasets are synthetic scale-ups of case_study_data.csv with product and
+state counts that grow with the row count (synthetic_data.realistic_cardinalities).
+Each case times only its own stage: its input is built from the previous
+stages outside the timer.
+
+Cases:
+    sourcing.read_csv                DataSourcing.read_data_local on the CSV
+    preprocessing.fit / .score       DataPreprocessing.preprocessing_fit / preprocessing_score
+    feature_engineering.fit / .transform
+    training.fit_forest              Fit of a 50-tree RandomForestRegressor pipeline
+                                     (on at most --max-train-rows rows)
+    pipeline.fit / .score            ModelPipeline end to end with a small grid
+                                     (sizes up to --max-pipeline-rows)
+    serving.predict                  POST /predict of --predict-rows rows through the
+                                     Flask test client, or to --url when given
+
+Usage (from seed_sale_backend/):
+    python benchmarks/run_benchmarks.py run --sizes 1000 10000 100000 --output results.json
+    python benchmarks/run_benchmarks.py run --sizes 1000000 10000000 --cases sourcing preprocessing --output big.json
+    python benchmarks/run_benchmarks.py compare baseline.json results.json --threshold 0.1
+"""
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from urllib.parse import urlparse
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(BACKEND_DIR, 'model')
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, MODEL_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd  # noqa: E402
+from sklearn.ensemble import RandomForestRegressor  # noqa: E402
+from sklearn.linear_model import Lasso  # noqa: E402
+
+from data_sourcing import DataSourcing  # noqa: E402
+from data_preprocessing import DataPreprocessing  # noqa: E402
+from feature_engineering import FeatureEngineering  # noqa: E402
+from get_best_model import GetBestModel  # noqa: E402
+from model_pipeline import ModelPipeline  # noqa: E402
+from training import Training  # noqa: E402
+from utils import save_model  # noqa: E402
+from synthetic_data import make_synthetic_data, realistic_cardinalities  # noqa: E402
+
+RESULTS_VERSION = 1
+
+# Small enough to finish in minutes at 10^5 rows, wide enough to exercise the search
+PIPELINE_PARAM_LIST = [
+    (RandomForestRegressor, {'model__n_estimators': [50], 'model__min_samples_leaf': [1, 4]}),
+    (Lasso, {'model__alpha': [0.1]}),
+]
+
+
+class Dataset:
+    """One synthetic dataset and the intermediate results cases build on, computed on first use"""
+
+    def __init__(self, n_rows, work_dir, seed, args):
+        self.n_rows = n_rows
+        self.work_dir = work_dir
+        self.args = args
+        n_products, n_states = realistic_cardinalities(n_rows)
+        raw = make_synthetic_data(n_rows, n_products=n_products, n_states=n_states, seed=seed)
+        self.csv_path = os.path.join(work_dir, f'data_{n_rows}.csv')
+        raw.to_csv(self.csv_path, index=False)
+        self.test_csv_path = os.path.join(work_dir, f'test_{n_rows}.csv')
+        raw.sample(min(n_rows, args.predict_rows), random_state=seed).to_csv(self.test_csv_path, index=False)
+        self.n_products, self.n_states = n_products, n_states
+        self._cache = {}
+
+    def _get(self, key, build):
+        if key not in self._cache:
+            with contextlib.redirect_stdout(io.StringIO()):
+                self._cache[key] = build()
+        return self._cache[key]
+
+    @property
+    def sourced(self):
+        return self._get('sourced', lambda: DataSourcing(file_path=self.csv_path).read_data_local())
+
+    @property
+    def preprocessed(self):
+        return self._get('preprocessed', lambda: DataPreprocessing(self.sourced.copy()).preprocessing_fit())
+
+    @property
+    def feature_engineering(self):
+        return self._get('feature_engineering', lambda: FeatureEngineering().fit(self.preprocessed))
+
+    @property
+    def features(self):
+        return self._get('features', lambda: self.feature_engineering.transform(self.preprocessed.copy()))
+
+    @property
+    def pipeline(self):
+        def build():
+            pipeline = ModelPipeline(data_path=self.csv_path, test_data_path=self.test_csv_path,
+                                     model_param_list=PIPELINE_PARAM_LIST)
+            pipeline.fit()
+            return pipeline
+        return self._get('pipeline', build)
+
+    @property
+    def model_path(self):
+        def build():
+            path = os.path.join(self.work_dir, f'model_{self.n_rows}.pkl')
+            save_model(self.pipeline.best_model, path)
+            return path
+        return self._get('model_path', build)
+
+    @property
+    def predict_rows(self):
+        return self._get('predict_rows', lambda: pd.read_csv(self.test_csv_path).drop(columns=['UNITS']))
+
+
+# Each case takes a Dataset and returns (setup, run): setup() builds run's
+# input outside the timer, or returns None to skip the case at this size
+def case_read_csv(data):
+    return (lambda: data.csv_path), lambda path: DataSourcing(file_path=path).read_data_local()
+
+
+def case_preprocessing_fit(data):
+    return (lambda: data.sourced.copy()), lambda df: DataPreprocessing(df).preprocessing_fit()
+
+
+def case_preprocessing_score(data):
+    return (lambda: data.sourced.drop(columns=['UNITS'])), lambda df: DataPreprocessing(df).preprocessing_score()
+
+
+def case_feature_engineering_fit(data):
+    return (lambda: data.preprocessed), lambda df: FeatureEngineering().fit(df)
+
+
+def case_feature_engineering_transform(data):
+    return (lambda: data.preprocessed.copy()), lambda df: data.feature_engineering.transform(df)
+
+
+def case_fit_forest(data):
+    def setup():
+        df = data.features
+        if len(df) > data.args.max_train_rows:
+            df = df.sample(data.args.max_train_rows, random_state=0)
+        get_best_model = GetBestModel(df)
+        X_train, X_test, y_train, y_test = get_best_model.train_test_split_data()
+        training = Training(X_train, y_train, X_test, y_test, get_best_model.get_encoding_col())
+        forest = RandomForestRegressor(n_estimators=50, n_jobs=-1, random_state=42)
+        return training.build_pipeline(forest), X_train, y_train
+
+    return setup, lambda args: args[0].fit(args[1], args[2])
+
+
+def case_pipeline_fit(data):
+    def setup():
+        if data.n_rows > data.args.max_pipeline_rows:
+            return None
+        return ModelPipeline(data_path=data.csv_path, test_data_path=data.test_csv_path,
+                             model_param_list=PIPELINE_PARAM_LIST)
+
+    return setup, lambda pipeline: pipeline.fit()
+
+
+def case_pipeline_score(data):
+    def setup():
+        return data.pipeline if data.n_rows <= data.args.max_pipeline_rows else None
+
+    return setup, lambda pipeline: pipeline.score()
+
+
+def case_serving_predict(data):
+    def setup():
+        if data.n_rows > data.args.max_pipeline_rows and not data.args.url:
+            return None
+        body = json.dumps({'data': data.predict_rows.to_dict(orient='records')}).encode()
+        if data.args.url:
+            return post_url(data.args.url), body
+        return post_test_client(data.model_path), body
+
+    def run(args):
+        post, body = args
+        status = post(body)
+        if status != 200:
+            raise RuntimeError(f"/predict answered {status}")
+
+    return setup, run
+
+
+def post_test_client(model_path):
+    # app.py loads MODEL_PATH when first imported; point it at this run's model rather than best_model.pkl
+    os.environ['MODEL_PATH'] = model_path
+    import app as app_module
+    if not app_module.load_model(model_path):
+        raise RuntimeError(f"Could not load {model_path}")
+    client = app_module.app.test_client()
+    return lambda body: client.post('/predict', data=body, content_type='application/json').status_code
+
+
+def post_url(url):
+    parsed = urlparse(url)
+    connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=300)
+
+    def post(body):
+        connection.request('POST', parsed.path.rstrip('/') + '/predict', body=body,
+                           headers={'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    return post
+
+
+CASES = [
+    ('sourcing.read_csv', case_read_csv),
+    ('preprocessing.fit', case_preprocessing_fit),
+    ('preprocessing.score', case_preprocessing_score),
+    ('feature_engineering.fit', case_feature_engineering_fit),
+    ('feature_engineering.transform', case_feature_engineering_transform),
+    ('training.fit_forest', case_fit_forest),
+    ('pipeline.fit', case_pipeline_fit),
+    ('pipeline.score', case_pipeline_score),
+    ('serving.predict', case_serving_predict),
+]
+
+
+def measure(setup, run, repeat, warmup, track_memory):
+    seconds, peak_bytes = [], None
+    for i in range(warmup + repeat):
+        arg = setup()
+        if track_memory and i == warmup:
+            tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            run(arg)
+            elapsed = time.perf_counter() - start
+        if track_memory and i == warmup:
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        if i >= warmup:
+            seconds.append(elapsed)
+    return seconds, peak_bytes
+
+
+def environment():
+    import numpy
+    import sklearn
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'git_commit': commit,
+    }
+
+
+def run_benchmarks(args):
+    selected = [(name, case) for name, case in CASES
+                if not args.cases or any(name == c or name.startswith(c + '.') for c in args.cases)]
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for n_rows in args.sizes:
+            data = Dataset(n_rows, work_dir, args.seed, args)
+            print(f"--- {n_rows:,} rows, {data.n_products:,} products, {data.n_states} states ---")
+            for name, case in selected:
+                setup, run = case(data)
+                try:
+                    probe = setup()
+                except Exception as e:
+                    print(f"{name:<30} failed during setup: {e}")
+                    continue
+                if probe is None:
+                    continue
+                seconds, peak_bytes = measure(setup, run, args.repeat, args.warmup, args.memory)
+                median = statistics.median(seconds)
+                result = {
+                    'case': name,
+                    'rows': n_rows,
+                    'seconds': seconds,
+                    'median_seconds': median,
+                    'min_seconds': min(seconds),
+                    'rows_per_sec': n_rows / median if median > 0 else None,
+                    'peak_memory_bytes': peak_bytes,
+                }
+                results.append(result)
+                memory = f"  peak {peak_bytes / 2 ** 20:,.1f} MiB" if peak_bytes is not None else ''
+                print(f"{name:<30} median {median * 1000:>10.1f}ms  min {min(seconds) * 1000:>10.1f}ms{memory}")
+
+    report = {
+        'format_version': RESULTS_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'environment': environment(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('command', 'func', 'output')},
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+def compare_results(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    base_by_key = {(r['case'], r['rows']): r for r in baseline['results']}
+    regressions = 0
+    print(f"{'Case':<30} {'Rows':>10} {'Base ms':>10} {'New ms':>10} {'Change':>8}  ({args.statistic} of repeats)")
+    for result in candidate['results']:
+        base = base_by_key.get((result['case'], result['rows']))
+        if base is None:
+            continue
+        key = f'{args.statistic}_seconds'
+        base_seconds, new_seconds = base[key], result[key]
+        change = new_seconds / base_seconds - 1 if base_seconds > 0 else 0.0
+        # Ignore differences too small to tell from timer noise
+        regressed = change > args.threshold and new_seconds - base_seconds > args.min_seconds
+        improved = change < -args.threshold and base_seconds - new_seconds > args.min_seconds
+        regressions += regressed
+        flag = 'REGRESSION' if regressed else ('faster' if improved else '')
+        print(f"{result['case']:<30} {result['rows']:>10,} {base_seconds * 1000:>10.1f} {new_seconds * 1000:>10.1f} "
+              f"{change:>+8.1%}  {flag}")
+
+    if baseline.get('environment') != candidate.get('environment'):
+        print("Note: the runs were made in different environments:")
+        for key in sorted(set(baseline.get('environment', {})) | set(candidate.get('environment', {}))):
+            before, after = baseline['environment'].get(key), candidate['environment'].get(key)
+            if before != after:
+                print(f"  {key}: {before} -> {after}")
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run the benchmarks and write a results JSON file')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                            help='Dataset sizes in rows (10^3 to 10^7)')
+    run_parser.add_argument('--cases', nargs='+', help='Case names or groups to run, e.g. preprocessing serving.predict')
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--warmup', type=int, default=1, help='Untimed runs before the timed ones')
+    run_parser.add_argument('--memory', action='store_true', help='Record the tracemalloc peak of the first timed run')
+    run_parser.add_argument('--max-train-rows', type=int, default=100000)
+    run_parser.add_argument('--max-pipeline-rows', type=int, default=100000)
+    run_parser.add_argument('--predict-rows', type=int, default=1000, help='Rows per /predict request')
+    run_parser.add_argument('--url', help='Post /predict to this running server instead of the Flask test client')
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--output', default='benchmark_results.json')
+
+    compare_parser = subparsers.add_parser('compare', help='Compare two results files and flag regressions')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--threshold', type=float, default=0.10, help='Relative slowdown flagged (0.10 = 10%%)')
+    compare_parser.add_argument('--statistic', choices=['min', 'median'], default='min',
+                                help='Timing compared; the minimum is the least sensitive to background noise')
+    compare_parser.add_argument('--min-seconds', type=float, default=0.005,
+                                help='Absolute slowdown below which a change is treated as noise')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        run_benchmarks(args)
+    else:
+        sys.exit(compare_results(args))
+
+
+if __name__ == '__main__':
+    main()
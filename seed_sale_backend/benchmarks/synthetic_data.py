@@ -0,0 +1,88 @@
+"""
+Synthetic scale-ups of case_study_data.csv.
+
+Rows are resampled from the real data, so column distributions, missing
+value rates and trait/lifecycle combinations stay realistic. Each real
+product is cloned into several new product ids (and optionally each
+state into several new states), which raises the cardinality the
+encoders and groupbys see while keeping every clone's traits consistent.
+
+Usage (from seed_sale_backend/):
+    python benchmarks/synthetic_data.py --rows 1000000 --products 20000 --output /tmp/sales_1m.csv
+    python benchmarks/synthetic_data.py --rows 10000000 --realistic --output /tmp/sales_10m.csv
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_PATH = os.path.join(BACKEND_DIR, 'model', 'case_study_data.csv')
+
+
+def realistic_cardinalities(n_rows, source_path=SOURCE_PATH):
+    """
+    (n_products, n_states) for an n_rows scale-up that keeps the source's
+    rows per product, with states growing with the square root of the
+    scale up to 50
+    """
+    source = pd.read_csv(source_path, usecols=['PRODUCT', 'STATE'])
+    rows_per_product = len(source) / source['PRODUCT'].nunique()
+    scale = max(1.0, n_rows / len(source))
+    n_products = max(source['PRODUCT'].nunique(), int(n_rows / rows_per_product))
+    n_states = min(50, max(source['STATE'].nunique(), int(round(source['STATE'].nunique() * np.sqrt(scale)))))
+    return n_products, n_states
+
+
+def make_synthetic_data(n_rows, n_products=None, n_states=None, seed=0, source_path=SOURCE_PATH):
+    """
+    Resample the case study data to n_rows rows
+
+    Args:
+        n_rows: Number of rows to generate
+        n_products: Approximate number of distinct products (default: the source's)
+        n_states: Approximate number of distinct states (default: the source's)
+        seed: Random seed
+
+    Returns:
+        DataFrame with the columns of case_study_data.csv
+    """
+    rng = np.random.default_rng(seed)
+    source = pd.read_csv(source_path)
+    df = source.iloc[rng.integers(0, len(source), size=n_rows)].reset_index(drop=True)
+
+    for col, target in (('PRODUCT', n_products), ('STATE', n_states)):
+        n_source = source[col].nunique()
+        clones = int(np.ceil(target / n_source)) if target else 1
+        if clones > 1:
+            clone_id = rng.integers(0, clones, size=n_rows)
+            df[col] = df[col] + np.where(clone_id == 0, '', '_' + clone_id.astype(str).astype(object))
+
+    # Jitter UNITS so resampled rows are not all exact duplicates of each other
+    jitter = rng.lognormal(mean=0.0, sigma=0.1, size=n_rows)
+    df['UNITS'] = np.round(df['UNITS'] * jitter, 1)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, required=True)
+    parser.add_argument('--products', type=int)
+    parser.add_argument('--states', type=int)
+    parser.add_argument('--realistic', action='store_true',
+                        help='Scale products and states with the row count (see realistic_cardinalities)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    if args.realistic:
+        args.products, args.states = realistic_cardinalities(args.rows)
+    df = make_synthetic_data(args.rows, n_products=args.products, n_states=args.states, seed=args.seed)
+    df.to_csv(args.output, index=False)
+    print(f"Wrote {len(df):,} rows, {df['PRODUCT'].nunique():,} products, "
+          f"{df['STATE'].nunique():,} states to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import logging
+
+import numpy as np
+import pandas as pd
+
+from predict import prepare_features
+from model.profiling import profiler, predict_in_stages
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingRequest:
+    def __init__(self, df, model):
+        self.df = df
+        self.model = model
+        self.future = Future()
+        self.submitted_at = time.perf_counter()
+
+
+class PredictionCoalescer:
+    """
+    Micro-batches concurrent /predict calls into one pipeline pass.
+
+    Requests are queued and a single worker thread drains the queue: it
+    waits at most max_wait_ms after the first request of a batch, or until
+    max_batch_rows rows are gathered, then runs preprocessing, feature
+    engineering and model.predict once over the concatenated rows and hands
+    every caller back its own slice of the predictions.
+
+    Every request carries the model it is to be scored with (the caller's
+    snapshot), and only requests with the same model share a batch, so a
+    model swapped in while requests are queued never scores them.
+    """
+
+    def __init__(self, max_wait_ms=5.0, max_batch_rows=1024, latency_window=10000, timeout_seconds=30.0):
+        """
+        Args:
+            max_wait_ms: Longest time a request waits for others to join its batch
+            max_batch_rows: Row budget of a batch; a larger single request runs alone
+            latency_window: Number of recent request latencies kept for percentiles
+            timeout_seconds: Longest predict() waits for its predictions by default
+        """
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_rows = max_batch_rows
+        self.timeout_seconds = timeout_seconds
+
+        self._queue = queue.Queue()
+        self._carry_over = None
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._started_at = time.time()
+        self._requests = 0
+        self._rows = 0
+        self._batches = 0
+        self._errors = 0
+
+    def _ensure_worker(self):
+        # Started lazily so a server that forks workers after import gets a thread per worker
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='prediction-coalescer', daemon=True)
+                self._thread.start()
+
+    def submit(self, df, model):
+        """Queue df for scoring with model and return a Future resolving to its predictions"""
+        self._ensure_worker()
+        pending = _PendingRequest(df, model)
+        self._queue.put(pending)
+        return pending.future
+
+    def predict(self, df, model, timeout=None):
+        """
+        Score df with model as part of the next batch, blocking until its
+        predictions are ready
+
+        Raises:
+            TimeoutError: If they are not ready within timeout seconds
+                (default timeout_seconds)
+        """
+        timeout = self.timeout_seconds if timeout is None else timeout
+        future = self.submit(df, model)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # Not scored yet: drop it from the queue; already running: its result is discarded
+            future.cancel()
+            raise TimeoutError(f"No predictions from the coalescer within {timeout:g}s") from None
+
+    def _next_batch(self):
+        first = self._carry_over if self._carry_over is not None else self._queue.get()
+        self._carry_over = None
+
+        batch = [first]
+        rows = len(first.df)
+        deadline = time.perf_counter() + self.max_wait
+
+        while rows < self.max_batch_rows:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                pending = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if rows + len(pending.df) > self.max_batch_rows:
+                self._carry_over = pending
+                break
+            batch.append(pending)
+            rows += len(pending.df)
+
+        return batch, rows
+
+    def _run(self):
+        while True:
+            batch, _ = self._next_batch()
+            # Requests whose caller timed out before the batch started are dropped
+            batch = [pending for pending in batch if pending.future.set_running_or_notify_cancel()]
+
+            # Only requests with the same model and columns share a frame; the same columns
+            # mean concatenation never introduces NaNs that preprocessing would then drop
+            groups = {}
+            for pending in batch:
+                groups.setdefault((id(pending.model), tuple(pending.df.columns)), []).append(pending)
+
+            for group in groups.values():
+                try:
+                    self._score_batch(group)
+                except Exception as e:
+                    logger.error(f"Error in coalesced batch of {len(group)} requests: {str(e)}")
+                    # Re-run each request alone so one bad payload does not fail its neighbours
+                    for pending in group:
+                        if not pending.future.done():
+                            try:
+                                self._score_batch([pending])
+                            except Exception as e:
+                                # Never leave a caller waiting, whatever failed
+                                pending.future.set_exception(e)
+
+    def _score_batch(self, batch):
+        model = batch[0].model
+        combined = pd.concat([pending.df for pending in batch], ignore_index=True)
+        rows = len(combined)
+
+        try:
+            features = prepare_features(combined, model)
+            predictions = np.atleast_1d(predict_in_stages(model, features, profiler))
+        except Exception as e:
+            if len(batch) > 1:
+                raise
+            self._finish(batch, rows, error=e)
+            return
+
+        # Rows dropped by preprocessing are missing from features.index; split the
+        # surviving positions at each request's boundary in the combined frame
+        boundaries = np.cumsum([len(pending.df) for pending in batch])
+        cuts = np.searchsorted(features.index.to_numpy(), boundaries)
+        for pending, part in zip(batch, np.split(predictions, cuts[:-1])):
+            pending.future.set_result(part)
+
+        self._finish(batch, rows)
+
+    def _finish(self, batch, rows, error=None):
+        now = time.perf_counter()
+        if error is not None:
+            batch[0].future.set_exception(error)
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._rows += rows
+            if error is not None:
+                self._errors += 1
+            self._latencies.extend(now - pending.submitted_at for pending in batch)
+
+    def stats(self):
+        """Throughput and tail-latency counters since the coalescer was created"""
+        with self._stats_lock:
+            latencies_ms = np.array(self._latencies) * 1000
+            uptime = time.time() - self._started_at
+            stats = {
+                'max_wait_ms': self.max_wait * 1000,
+                'max_batch_rows': self.max_batch_rows,
+                'queue_depth': self._queue.qsize(),
+                'requests': self._requests,
+                'rows': self._rows,
+                'batches': self._batches,
+                'errors': self._errors,
+                'avg_requests_per_batch': self._requests / self._batches if self._batches else 0.0,
+                'avg_rows_per_batch': self._rows / self._batches if self._batches else 0.0,
+                'requests_per_sec': self._requests / uptime if uptime else 0.0,
+                'rows_per_sec': self._rows / uptime if uptime else 0.0,
+            }
+
+        for q in (50, 95, 99):
+            stats[f'latency_p{q}_ms'] = float(np.percentile(latencies_ms, q)) if len(latencies_ms) else None
+        return stats
@@ -0,0 +1,223 @@
+import math
+import threading
+import weakref
+import logging
+
+import numpy as np
+import pandas as pd
+
+from model.feature_engineering import CROSS_FEATURES, CROSS_VOCAB_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Raw columns FeatureEngineering.transform reads; a payload without any of them
+# must go through the pandas path so it fails the same way
+REQUIRED_COLUMNS = [
+    'PRODUCT', 'LIFECYCLE', 'STATE', 'RELEASE_YEAR', 'DISEASE_RESISTANCE',
+    'INSECT_RESISTANCE', 'PROTECTION', 'DROUGHT_TOLERANCE', 'BRITTLE_STALK',
+    'PLANT_HEIGHT', 'RELATIVE_MATURITY'
+]
+
+NUMERIC_COLUMNS = [col for col in REQUIRED_COLUMNS if col not in ('PRODUCT', 'LIFECYCLE', 'STATE')]
+
+DEFENSE_COLUMNS = ['DISEASE_RESISTANCE', 'INSECT_RESISTANCE', 'PROTECTION']
+
+
+def _defensive_index(record):
+    return str(sum(record[col] for col in DEFENSE_COLUMNS))
+
+
+# Record-level versions of the columns the encoders consume for models trained
+# with string crosses; the string formats must match FeatureEngineering.transform exactly
+ROW_FEATURES = {
+    'PRODUCT': lambda r: r['PRODUCT'],
+    'STATE': lambda r: r['STATE'],
+    'LIFECYCLE': lambda r: r['LIFECYCLE'],
+    'PRODUCT_STATE': lambda r: str(r['PRODUCT']) + "_" + str(r['STATE']),
+    'PRODUCT_DEFENSE_SCORE': lambda r: str(r['PRODUCT']) + "_DEF_" + _defensive_index(r),
+    'STATE_DEFENSE_SCORE': lambda r: str(r['STATE']) + "_DEF_" + _defensive_index(r),
+}
+
+_VOCAB_VALUES = {
+    'PRODUCT': lambda r: r['PRODUCT'],
+    'STATE': lambda r: r['STATE'],
+    'DEFENSIVE_INDEX': lambda r: sum(r[col] for col in DEFENSE_COLUMNS),
+}
+
+
+def _coded_cross(left, right, vocab):
+    left_positions, right_positions = vocab[left], vocab[right]
+    right_size = len(right_positions)
+    left_value, right_value = _VOCAB_VALUES[left], _VOCAB_VALUES[right]
+
+    def feature(record):
+        i = left_positions.get(left_value(record), -1)
+        j = right_positions.get(right_value(record), -1)
+        return i * right_size + j if i >= 0 and j >= 0 else -1
+    return feature
+
+
+def row_features(feature_stats):
+    """
+    ROW_FEATURES for a model's feature_stats_
+
+    Models whose feature_stats_ hold the cross vocabularies get the
+    integer cross keys of FeatureEngineering.cross_feature instead of
+    the strings.
+    """
+    if not feature_stats or 'PRODUCT' not in feature_stats:
+        return ROW_FEATURES
+
+    vocab = {col: {value: i for i, value in enumerate(feature_stats[col])} for col in CROSS_VOCAB_COLUMNS}
+    features = dict(ROW_FEATURES)
+    for feature, (left, right) in CROSS_FEATURES.items():
+        features[feature] = _coded_cross(left, right, vocab)
+    return features
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _is_scalar(value):
+    return not isinstance(value, (list, dict)) and not _is_missing(value)
+
+
+class CompiledScorer:
+    """
+    Scores dict records without building a DataFrame.
+
+    The fitted encoders of the pipeline are flattened into one dict per
+    encoded column (raw value -> encoded float). Scoring a batch is then a
+    dict lookup per cell into a NumPy matrix followed by a direct call to
+    the final estimator. Batches the lookups cannot reproduce exactly
+    (missing values, unseen ordinal categories, float-typed trait flags)
+    are declined and left to the regular pred() path.
+    """
+
+    def __init__(self, columns, final_estimator, features=ROW_FEATURES):
+        """
+        Args:
+            columns: One (feature, lookup, unknown_value) tuple per column
+                of the preprocessor output, in output order. unknown_value
+                is None when an unseen category must be declined.
+            final_estimator: The fitted last step of the pipeline
+            features: Record-level functions computing each feature, see
+                row_features()
+        """
+        self.columns = columns
+        self.final_estimator = final_estimator
+        self.features = features
+
+    @classmethod
+    def from_pipeline(cls, model):
+        """Compile a fitted training Pipeline, or return None if its steps are not supported"""
+        if not hasattr(model, 'named_steps') or 'preprocessor' not in model.named_steps:
+            return None
+
+        preprocessor = model.named_steps['preprocessor']
+        final_estimator = model.steps[-1][1]
+        if len(model.steps) != 2 or hasattr(final_estimator, 'feature_names_in_'):
+            return None
+
+        features = row_features(getattr(model, 'feature_stats_', None))
+        columns = [None] * sum(
+            indices.stop - indices.start for indices in preprocessor.output_indices_.values()
+        )
+        for name, transformer, cols in preprocessor.transformers_:
+            indices = preprocessor.output_indices_[name]
+            if transformer == 'drop' or indices.stop == indices.start:
+                continue
+            if any(col not in features for col in cols):
+                return None
+
+            kind = type(transformer).__name__
+            if kind == 'TargetEncoder':
+                compiled = cls._compile_target_encoder(transformer, cols)
+            elif kind == 'OrdinalEncoder' and transformer.handle_unknown == 'error':
+                compiled = [
+                    (col, {value: float(code) for code, value in enumerate(categories)}, None)
+                    for col, categories in zip(cols, transformer.categories_)
+                ]
+            else:
+                return None
+
+            columns[indices] = compiled
+
+        return cls(columns, final_estimator, features)
+
+    @staticmethod
+    def _compile_target_encoder(encoder, cols):
+        # Run every known category (and one unseen sentinel) through the fitted
+        # encoder itself, so smoothing and any version-specific handling match
+        categories = {m['col']: [v for v in m['mapping'].index if not _is_missing(v)]
+                      for m in encoder.ordinal_encoder.mapping}
+        longest = max(len(categories[col]) for col in cols) + 1
+
+        frame = {}
+        for col in cols:
+            values = categories[col] + ['\x00unseen']
+            frame[col] = values + [values[0]] * (longest - len(values))
+        encoded = encoder.transform(pd.DataFrame(frame, columns=cols))
+
+        compiled = []
+        for col in cols:
+            n = len(categories[col])
+            lookup = dict(zip(categories[col], encoded[col].iloc[:n].astype(float)))
+            compiled.append((col, lookup, float(encoded[col].iloc[n])))
+        return compiled
+
+    def predict_records(self, records):
+        """
+        Score a list of dict records
+
+        Returns:
+            The predictions as a NumPy array, or None if this batch has to
+            go through the regular pandas path to get identical results
+        """
+        if not all(isinstance(record, dict) for record in records):
+            return None
+        keys = records[0].keys()
+        for record in records:
+            if record.keys() != keys or not all(_is_scalar(v) for v in record.values()):
+                return None
+        if any(col not in keys for col in REQUIRED_COLUMNS):
+            return None
+        if any(not isinstance(record[col], (int, float)) for record in records for col in NUMERIC_COLUMNS):
+            return None
+        # DataFrame would turn float flags into e.g. "_DEF_1.0" keys
+        if any(type(record[col]) is not int for record in records for col in DEFENSE_COLUMNS):
+            return None
+
+        # Column-major like the ColumnTransformer's output, so BLAS sums linear models' terms in the same order
+        X = np.empty((len(records), len(self.columns)), dtype=np.float64, order='F')
+        for j, (feature, lookup, unknown_value) in enumerate(self.columns):
+            row_feature = self.features[feature]
+            for i, record in enumerate(records):
+                encoded = lookup.get(row_feature(record), unknown_value)
+                if encoded is None:
+                    return None
+                X[i, j] = encoded
+
+        return np.atleast_1d(self.final_estimator.predict(X))
+
+
+_compiled = weakref.WeakKeyDictionary()
+_compile_lock = threading.Lock()
+
+
+def get_compiled_scorer(model):
+    """Return the CompiledScorer for model, compiling it on first use (None if unsupported)"""
+    try:
+        return _compiled[model]
+    except KeyError:
+        pass
+
+    with _compile_lock:
+        if model not in _compiled:
+            try:
+                _compiled[model] = CompiledScorer.from_pipeline(model)
+            except Exception as e:
+                logger.warning(f"Fast scoring path unavailable for this model: {str(e)}")
+                _compiled[model] = None
+        return _compiled[model]
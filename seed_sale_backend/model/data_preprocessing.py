@@ -1,9 +1,51 @@
+import time
+
+import numpy as np
 import pandas as pd
 
+# Combined group keys are re-factorized before they could overflow int64
+_MAX_KEY_SIZE = 2 ** 62
+
+
+def _column_codes(series):
+    """Integer codes of a column, ordered like its sorted values, with 0 for NaN"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+    else:
+        codes, _ = pd.factorize(series, sort=True)
+    return codes.astype(np.int64) + 1
+
+
+def _combine_codes(codes_iter, n_rows):
+    """
+    Combine per-column codes into one int64 key per row
+
+    Keys sort like the rows' values sorted column by column, so grouping
+    on the key gives groups in the same order as grouping on the columns.
+    Columns are consumed one at a time so only one column's codes are
+    held in memory at once.
+    """
+    key = np.zeros(n_rows, dtype=np.int64)
+    size = 1
+    for codes in codes_iter:
+        cardinality = int(codes.max()) + 1 if len(codes) else 1
+        if size * cardinality >= _MAX_KEY_SIZE:
+            key, uniques = pd.factorize(key, sort=True)
+            size = len(uniques)
+        key *= cardinality
+        key += codes
+        size *= cardinality
+    return key
+
 
 class DataPreprocessing:
     def __init__(self, df):
         self.df = df
+        self.step_stats = []
+
+    def record_step(self, step, rows, start):
+        """Append the row count after a step and its duration to step_stats"""
+        self.step_stats.append({'step': step, 'rows': int(rows), 'seconds': time.perf_counter() - start})
 
     def handle_duplicates(self):
         self.df.drop_duplicates(inplace=True)
@@ -19,7 +61,7 @@ class DataPreprocessing:
     def handle_aggregations(self):
         target_col = 'UNITS'
         cols = [col for col in self.df.columns if col != target_col]
-        self.df = self.df.groupby(cols)[target_col].sum().reset_index()
+        self.df = self.df.groupby(cols, observed=True)[target_col].sum().reset_index()
 
     def handle_outlier(self):
         Q1 = self.df['UNITS'].quantile(0.25)
@@ -32,33 +74,87 @@ class DataPreprocessing:
         self.df = self.df[(self.df['UNITS'] >= lower_bound) & (self.df['UNITS'] <= upper_bound)]
 
     def remove_lifecycle_violations(self):
+        """
+        Drop rows whose lifecycle stage goes backwards for their product
+
+        Rows are walked per product in SALESYEAR order; a row is kept when
+        its stage is at least the latest stage seen so far, i.e. when its
+        code equals the running maximum of codes within the product.
+        """
         lifecycle_order = ['INTRODUCTION', 'ESTABLISHED', 'EXPANSION', 'PHASEOUT']
         self.df['LIFECYCLE'] = pd.Categorical(self.df['LIFECYCLE'], categories=lifecycle_order, ordered=True)
 
         self.df = self.df.sort_values(by=['PRODUCT', 'SALESYEAR']).reset_index(drop=True)
 
-        def drop_lifecycle_violations(group):
-            max_code = -1
-            mask = []
-            for lc in group['LIFECYCLE'].cat.codes:
-                if lc < max_code:
-                    mask.append(False)  # invalid
-                else:
-                    max_code = max(max_code, lc)
-                    mask.append(True)   # valid
-            return group[mask]
-
-        self.df = self.df.groupby(['PRODUCT'], group_keys=False).apply(drop_lifecycle_violations)
+        codes = self.df['LIFECYCLE'].cat.codes
+        running_max = codes.groupby(self.df['PRODUCT'], observed=True).cummax()
+        self.df = self.df[codes >= running_max]
 
         self.df = self.df.sort_values(by=['PRODUCT', 'SALESYEAR', 'LIFECYCLE']).reset_index(drop=True)
-        
-    def preprocessing_fit(self):
+
+    def fused_preprocessing(self):
+        """
+        handle_duplicates, handle_missing_val, handle_aggregations and
+        handle_outlier in one pass
+
+        Rows are reduced to integer keys built from the column codes
+        (categorical codes where available), and the duplicate, missing
+        value and outlier filters are combined as masks over those keys,
+        so only the final frame is materialized. The result is identical
+        to running the four steps one after the other.
+        """
+        target_col = 'UNITS'
+        cols = [col for col in self.df.columns if col != target_col]
+        rows_in = len(self.df)
+
+        start = time.perf_counter()
+        group_key = _combine_codes((_column_codes(self.df[col]) for col in cols), rows_in)
+        units = self.df[target_col]
+        row_key = _combine_codes([group_key, _column_codes(units)], rows_in)
+        self.record_step('encode', rows_in, start)
+
+        start = time.perf_counter()
+        is_unique = ~pd.Series(row_key).duplicated().to_numpy()
+        rows_after_dedup = int(is_unique.sum())
+        self.record_step('duplicates', rows_after_dedup, start)
+
+        start = time.perf_counter()
+        keep_rows = is_unique & units.notna().to_numpy()
+        for col in cols:
+            keep_rows &= self.df[col].notna().to_numpy()
+        positions = np.flatnonzero(keep_rows)
+        print((1 - len(positions) / rows_after_dedup) * 100 if rows_after_dedup else 0.0)
+        self.record_step('missing', len(positions), start)
+
+        start = time.perf_counter()
+        groups = pd.DataFrame({target_col: units.to_numpy()[positions], 'position': positions}).groupby(
+            group_key[positions], sort=True).agg(**{target_col: (target_col, 'sum'), 'position': ('position', 'first')})
+        self.record_step('aggregation', len(groups), start)
+
+        start = time.perf_counter()
+        Q1, Q3 = groups[target_col].quantile([0.25, 0.75])
+        IQR = Q3 - Q1
+        summed = groups[target_col].to_numpy()
+        keep = (summed >= Q1 - 1.5 * IQR) & (summed <= Q3 + 1.5 * IQR)
+        self.record_step('outliers', int(keep.sum()), start)
+
+        start = time.perf_counter()
+        df = self.df[cols].take(groups['position'].to_numpy()[keep])
+        df[target_col] = summed[keep]
+        # handle_outlier keeps the aggregated frame's row labels
+        df.index = pd.RangeIndex(len(keep))[keep]
+        self.df = df
+        self.record_step('materialize', len(df), start)
+
+    def preprocessing_fit(self, drop_lifecycle_violations=False):
         print("df shape before preprocessing", self.df.shape)
-        self.handle_duplicates()
-        self.handle_missing_val()
-        self.handle_aggregations()
-        self.handle_outlier()
-        # self.remove_lifecycle_violations()
+        self.fused_preprocessing()
+        if drop_lifecycle_violations:
+            start = time.perf_counter()
+            self.remove_lifecycle_violations()
+            self.record_step('lifecycle', len(self.df), start)
+        for stats in self.step_stats:
+            print(f"  {stats['step']:<12} {stats['rows']:>10,} rows {stats['seconds'] * 1000:>9.1f}ms")
         print("df shape after preprocessing", self.df.shape)
         return self.df
 
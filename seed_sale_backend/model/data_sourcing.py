@@ -1,12 +1,93 @@
+import hashlib
+import os
 import pandas as pd
 
+# Column dtypes of the sales data. Integer columns fall back to float64 when
+# a file has missing values in them, since NumPy integers cannot hold NaN.
+# Trait columns stay float64: feature engineering aggregates them into the
+# feature_stats_ shipped with the model, and scoring reads raw JSON/CSV as
+# float64, so narrower floats would shift those statistics.
+SCHEMA = {
+    'PRODUCT': 'category',
+    'SALESYEAR': 'int16',
+    'LIFECYCLE': 'category',
+    'STATE': 'category',
+    'RELEASE_YEAR': 'int16',
+    'DISEASE_RESISTANCE': 'int8',
+    'INSECT_RESISTANCE': 'int8',
+    'PROTECTION': 'int8',
+    'DROUGHT_TOLERANCE': 'float64',
+    'BRITTLE_STALK': 'float64',
+    'PLANT_HEIGHT': 'float64',
+    'RELATIVE_MATURITY': 'int8',
+    'UNITS': 'float64',
+}
+
+# Bump when SCHEMA or the cached layout changes so stale caches are not reused
+CACHE_VERSION = 2
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
 
 class DataSourcing:
-    def __init__(self, file_path='case_study_data.csv'):
+    def __init__(self, file_path='case_study_data.csv', typed=True, engine=None, cache_dir=None):
+        """
+        Args:
+            file_path: CSV file to read
+            typed: Apply SCHEMA (categorical strings, small ints) instead of
+                pandas' default object/int64/float64 inference
+            engine: read_csv parser; None uses 'pyarrow' when installed
+            cache_dir: If set, keep a Parquet copy of the typed frame there,
+                keyed by a hash of the CSV contents, and read that on later
+                runs instead of parsing the CSV again (requires pyarrow)
+        """
         self.file_path = file_path
+        self.typed = typed
+        self.engine = engine
+        self.cache_dir = cache_dir
 
     def read_data_local(self):
-        df = pd.read_csv(self.file_path)
+        if self.cache_dir and _has_pyarrow():
+            cache_path = self.cache_path()
+            if os.path.exists(cache_path):
+                return pd.read_parquet(cache_path)
+
+            df = self.read_csv()
+            os.makedirs(self.cache_dir, exist_ok=True)
+            df.to_parquet(cache_path, index=False)
+            return df
+
+        return self.read_csv()
+
+    def read_csv(self):
+        engine = self.engine or ('pyarrow' if _has_pyarrow() else 'c')
+        if not self.typed:
+            return pd.read_csv(self.file_path, engine=engine)
+
+        header = pd.read_csv(self.file_path, nrows=0).columns
+        dtype = {col: SCHEMA[col] for col in header
+                 if col in SCHEMA and not SCHEMA[col].startswith('int')}
+        df = pd.read_csv(self.file_path, dtype=dtype, engine=engine)
+
+        for col in header:
+            if col in SCHEMA and SCHEMA[col].startswith('int'):
+                df[col] = df[col].astype('float64' if df[col].isna().any() else SCHEMA[col])
         return df
 
-    # Customized read_data method to read from a different source
\ No newline at end of file
+    def cache_path(self):
+        digest = hashlib.sha256()
+        digest.update(f"v{CACHE_VERSION}:{self.typed}".encode())
+        with open(self.file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+
+        name = os.path.splitext(os.path.basename(self.file_path))[0]
+        return os.path.join(self.cache_dir, f"{name}-{digest.hexdigest()[:16]}.parquet")
+
+    # Customized read_data method to read from a different source
@@ -1,8 +1,89 @@
+import numpy as np
+import pandas as pd
+
+# Per-state aggregate features and the column each one averages
+STATE_AGGREGATES = {
+    'STATE_AVG_PLANT_HEIGHT': 'PLANT_HEIGHT',
+    'STATE_AVG_REL_MAT': 'RELATIVE_MATURITY',
+}
+
+# Cross features and the two columns each one combines
+CROSS_FEATURES = {
+    'PRODUCT_STATE': ('PRODUCT', 'STATE'),
+    'PRODUCT_DEFENSE_SCORE': ('PRODUCT', 'DEFENSIVE_INDEX'),
+    'STATE_DEFENSE_SCORE': ('STATE', 'DEFENSIVE_INDEX'),
+}
+
+# Columns whose training values are kept as vocabularies for the coded crosses
+CROSS_VOCAB_COLUMNS = ['PRODUCT', 'STATE', 'DEFENSIVE_INDEX']
+
+
+def cross_code(left_idx, right_idx, right_size):
+    """
+    Integer key of a cross feature from the vocabulary positions of its parts
+
+    Each pair of known values gets its own key; a pair with an unseen part
+    gets -1, which the encoders never see in training and treat as unknown.
+    """
+    return np.where((left_idx >= 0) & (right_idx >= 0), left_idx * right_size + right_idx, -1)
+
+
 class FeatureEngineering:
-    def __init__(self):
-        pass
-    
-    def feature_engineering(self, df):
+    def __init__(self, state_stats=None, cross_codes=True):
+        """
+        Args:
+            state_stats: Lookup table learned by fit(), e.g. the
+                feature_stats_ attribute saved on a trained model. When
+                None, feature_engineering() learns it from the batch.
+            cross_codes: Build the CROSS_FEATURES as integer keys instead of
+                concatenated strings. Only used by fit(); transform() follows
+                whatever state_stats holds, so models trained with string
+                crosses keep getting them.
+        """
+        self.state_stats = state_stats
+        self.cross_codes = cross_codes
+
+    def fit(self, df):
+        """
+        Learn the per-state aggregates from training data
+
+        The table holds, for each aggregate feature, the mean per state in
+        the order of 'STATE', followed by the overall mean as the value for
+        states that were not seen during training.
+
+        With cross_codes, it also holds the sorted training values of
+        PRODUCT and DEFENSIVE_INDEX (STATE is already there), from which
+        transform() derives the integer cross keys.
+        """
+        state_means = df.groupby('STATE', observed=True)[list(STATE_AGGREGATES.values())].mean()
+
+        self.state_stats = {'STATE': state_means.index.tolist()}
+        for feature, col in STATE_AGGREGATES.items():
+            self.state_stats[feature] = state_means[col].tolist() + [float(df[col].mean())]
+
+        if self.cross_codes:
+            self.state_stats['PRODUCT'] = sorted(df['PRODUCT'].dropna().unique().tolist())
+            self.state_stats['DEFENSIVE_INDEX'] = sorted(self.defensive_index(df).dropna().unique().tolist())
+        return self
+
+    @staticmethod
+    def defensive_index(df):
+        return df["DISEASE_RESISTANCE"] + df["INSECT_RESISTANCE"] + df["PROTECTION"]
+
+    def vocabulary_positions(self, df):
+        """Positions of each row's PRODUCT, STATE and DEFENSIVE_INDEX in the training vocabularies (-1 if unseen)"""
+        values = {'PRODUCT': df['PRODUCT'], 'STATE': df['STATE'], 'DEFENSIVE_INDEX': self.defensive_index(df)}
+        return {col: pd.Index(self.state_stats[col]).get_indexer(values[col]) for col in CROSS_VOCAB_COLUMNS}
+
+    def cross_feature(self, positions, feature):
+        """int64 key of a CROSS_FEATURES column"""
+        left, right = CROSS_FEATURES[feature]
+        return cross_code(positions[left], positions[right], len(self.state_stats[right]))
+
+    def transform(self, df):
+        # Models trained before the coded crosses have no PRODUCT vocabulary and get string crosses
+        positions = self.vocabulary_positions(df) if 'PRODUCT' in self.state_stats else None
+
         # Date-based features
         if 'SALESYEAR' in df.columns and 'RELEASE_YEAR' in df.columns:
             df['PRODUCT_AGE'] = df['SALESYEAR'] - df['RELEASE_YEAR']
@@ -11,27 +92,42 @@ class FeatureEngineering:
             df['PLANT_HEIGHT_SQ'] = df['PLANT_HEIGHT'] ** 2
             df['PLANT_HEIGHT_CUBE'] = df['PLANT_HEIGHT'] ** 3
 
-    
+
         if 'PRODUCT' in df.columns and 'STATE' in df.columns:
-            df['PRODUCT_STATE'] = df['PRODUCT'].astype(str) + "_" + df['STATE'].astype(str)
-        
-        df['STATE_AVG_PLANT_HEIGHT'] = df.groupby('STATE')['PLANT_HEIGHT'].transform('mean')
-        df['STATE_AVG_REL_MAT'] = df.groupby('STATE')['RELATIVE_MATURITY'].transform('mean')
-        
+            if positions is None:
+                df['PRODUCT_STATE'] = df['PRODUCT'].astype(str) + "_" + df['STATE'].astype(str)
+            else:
+                df['PRODUCT_STATE'] = self.cross_feature(positions, 'PRODUCT_STATE')
+
+        # Unseen states get index -1, which picks the trailing overall mean
+        state_idx = pd.Index(self.state_stats['STATE']).get_indexer(df['STATE'])
+        for feature in STATE_AGGREGATES:
+            df[feature] = np.asarray(self.state_stats[feature])[state_idx]
+
         df["STRUCTURAL_SCORE"] = (df["BRITTLE_STALK"] + df["PLANT_HEIGHT"]) / 2
 
-  
-        df["DEFENSIVE_INDEX"] = (
-            df["DISEASE_RESISTANCE"] + df["INSECT_RESISTANCE"] + df["PROTECTION"]
-        )
+
+        df["DEFENSIVE_INDEX"] = self.defensive_index(df)
         df["STRESS_INDEX"] = df["DROUGHT_TOLERANCE"] + (6 - df["BRITTLE_STALK"])  # inverse brittle stalk
-        df["PRODUCT_DEFENSE_SCORE"] = df["PRODUCT"].astype(str) + "_DEF_" + df["DEFENSIVE_INDEX"].astype(str)
-     
-     
+        if positions is None:
+            df["PRODUCT_DEFENSE_SCORE"] = df["PRODUCT"].astype(str) + "_DEF_" + df["DEFENSIVE_INDEX"].astype(str)
+        else:
+            df["PRODUCT_DEFENSE_SCORE"] = self.cross_feature(positions, 'PRODUCT_DEFENSE_SCORE')
+
+
         df["MATURITY_TO_HEIGHT_RATIO"] = df["RELATIVE_MATURITY"] / df["PLANT_HEIGHT"]
         df["STALK_STRENGTH_TO_HEIGHT"] = df["BRITTLE_STALK"] / df["PLANT_HEIGHT"]
 
-        df["STATE_DEFENSE_SCORE"] = df["STATE"].astype(str) + "_DEF_" + df["DEFENSIVE_INDEX"].astype(str)
+        if positions is None:
+            df["STATE_DEFENSE_SCORE"] = df["STATE"].astype(str) + "_DEF_" + df["DEFENSIVE_INDEX"].astype(str)
+        else:
+            df["STATE_DEFENSE_SCORE"] = self.cross_feature(positions, 'STATE_DEFENSE_SCORE')
 
         df.drop(columns=['SALESYEAR', 'RELEASEYEAR'], inplace=True, errors='ignore')
         return df
+
+    def feature_engineering(self, df):
+        """Transform df, learning the per-state aggregates from it first if none were given"""
+        if self.state_stats is None:
+            self.fit(df)
+        return self.transform(df)
@@ -0,0 +1,134 @@
+import numpy as np
+from sklearn.base import BaseEstimator, RegressorMixin
+
+# Forest classes whose prediction is the plain mean of their trees' predictions
+FLATTENABLE_FORESTS = ('RandomForestRegressor', 'ExtraTreesRegressor')
+
+
+class FlatForestRegressor(BaseEstimator, RegressorMixin):
+    """
+    A fitted random forest stored as flat, contiguous NumPy arrays.
+
+    scikit-learn trees copy their nodes into memory they own when they are
+    unpickled, so a forest pickle cannot be memory-mapped. Here all trees'
+    nodes live in a handful of plain arrays, which joblib.load(mmap_mode='r')
+    maps straight from the file, so worker processes loading the same
+    artifact share those pages through the OS page cache.
+
+    All trees are walked one level per step for all rows at once; leaves
+    point to themselves, and (tree, row) pairs drop out once they reach
+    one. Predictions are bit-identical to the source forest's predict():
+    X is cast to float32 as scikit-learn does, and tree predictions are
+    accumulated in tree order, then divided by the number of trees.
+    """
+
+    def __init__(self, chunk_elements=2 ** 20):
+        """
+        Args:
+            chunk_elements: Upper bound on trees x rows walked at once, which
+                bounds the memory of predict's temporaries
+        """
+        self.chunk_elements = chunk_elements
+
+    @classmethod
+    def from_forest(cls, forest, chunk_elements=2 ** 20):
+        """Flatten a fitted single-output RandomForestRegressor or ExtraTreesRegressor"""
+        if type(forest).__name__ not in FLATTENABLE_FORESTS:
+            raise ValueError(f"Cannot flatten {type(forest).__name__}")
+        if forest.n_outputs_ != 1:
+            raise ValueError("Only single-output forests can be flattened")
+
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        sizes = np.array([tree.node_count for tree in trees])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        index_dtype = np.int32 if sizes.sum() < 2 ** 31 else np.int64
+
+        left, right, feature, threshold, value, missing_left = [], [], [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            left.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            right.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            value.append(tree.value[:, 0, 0])
+            missing_left.append(getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=np.uint8)))
+
+        flat = cls(chunk_elements=chunk_elements)
+        flat.left_ = np.concatenate(left).astype(index_dtype)
+        flat.right_ = np.concatenate(right).astype(index_dtype)
+        flat.feature_ = np.concatenate(feature).astype(index_dtype)
+        flat.threshold_ = np.concatenate(threshold).astype(np.float64)
+        flat.value_ = np.concatenate(value).astype(np.float64)
+        flat.missing_go_to_left_ = np.concatenate(missing_left).astype(bool)
+        flat.roots_ = offsets.astype(index_dtype)
+        flat.max_depth_ = max(tree.max_depth for tree in trees)
+        flat.n_features_in_ = forest.n_features_in_
+        flat.source_class_ = type(forest).__name__
+        flat.source_params_ = forest.get_params()
+        return flat
+
+    def fit(self, X, y):
+        """
+        Fit a forest and flatten it into this estimator
+
+        The forest is a source_class_ with source_params_ when this
+        estimator was built by from_forest(), so refitting a serving
+        artifact retrains the same kind of forest; otherwise it is a
+        RandomForestRegressor with default parameters.
+        """
+        from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+
+        forest_class = {'RandomForestRegressor': RandomForestRegressor,
+                        'ExtraTreesRegressor': ExtraTreesRegressor}[getattr(self, 'source_class_', 'RandomForestRegressor')]
+        forest = forest_class(**getattr(self, 'source_params_', {})).fit(X, y)
+        flat = self.from_forest(forest, chunk_elements=self.chunk_elements)
+        vars(self).update(vars(flat))
+        return self
+
+    def __sklearn_is_fitted__(self):
+        return hasattr(self, 'roots_')
+
+    @property
+    def n_estimators_(self):
+        return len(self.roots_)
+
+    def apply(self, X):
+        """Leaf index (into the flat arrays) of every row in every tree, shape (n_trees, n_rows)"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has shape {X.shape}, expected (n_rows, {self.n_features_in_})")
+        has_missing = np.isnan(X).any()
+
+        chunk_rows = max(1, self.chunk_elements // self.n_estimators_)
+        leaves = np.empty((self.n_estimators_, len(X)), dtype=self.roots_.dtype)
+        for start in range(0, len(X), chunk_rows):
+            chunk = X[start:start + chunk_rows]
+            # One entry per (tree, row) pair; only pairs that have not reached a leaf are walked further
+            nodes = np.repeat(self.roots_, len(chunk))
+            rows = np.tile(np.arange(len(chunk)), self.n_estimators_)
+            active = np.flatnonzero(self.left_[nodes] != nodes)
+            while active.size:
+                current = nodes[active]
+                x = chunk[rows[active], self.feature_[current]]
+                go_left = x <= self.threshold_[current]
+                if has_missing:
+                    go_left |= np.isnan(x) & self.missing_go_to_left_[current]
+                current = np.where(go_left, self.left_[current], self.right_[current])
+                nodes[active] = current
+                active = active[self.left_[current] != current]
+            leaves[:, start:start + len(chunk)] = nodes.reshape(self.n_estimators_, len(chunk))
+        return leaves
+
+    def predict_per_tree(self, X):
+        """Every tree's prediction, shape (n_trees, n_rows)"""
+        return self.value_[self.apply(X)]
+
+    def predict(self, X):
+        # Accumulate in tree order like the source forest; np.sum may pair terms up differently
+        per_tree = self.predict_per_tree(X)
+        y_hat = np.zeros(per_tree.shape[1], dtype=np.float64)
+        for tree_prediction in per_tree:
+            y_hat += tree_prediction
+        y_hat /= self.n_estimators_
+        return y_hat
@@ -1,13 +1,29 @@
+import copy
+import math
+import numpy as np
+from sklearn.base import clone
 from sklearn.model_selection import train_test_split
+from sklearn.metrics import r2_score, mean_squared_error
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.linear_model import Ridge, Lasso
 from training import Training
+from feature_engineering import CROSS_FEATURES
 from simple_nn_regressor import SimpleNNRegressor
+from prediction_intervals import residual_quantiles
 
 
 class GetBestModel:
-    def __init__(self, df):
+    def __init__(self, df, search_strategy='grid', model_param_list=None):
+        """
+        Args:
+            df: Feature-engineered training data, including UNITS
+            search_strategy: One of training.SEARCH_STRATEGIES
+            model_param_list: (model_class, param_grid) pairs to search
+                instead of get_model_param_list()'s, e.g. a small grid for benchmarks
+        """
         self.df = df
+        self.search_strategy = search_strategy
+        self.model_param_list = model_param_list
     
     def train_test_split_data(self, target_col='UNITS', test_size=0.2, random_state=42):
         X = self.df.drop(columns=[target_col])
@@ -20,7 +36,9 @@ class GetBestModel:
         return X_train, X_test, y_train, y_test
 
     def get_encoding_col(self):
-        cat_cols = self.df.select_dtypes(include=["object", "category"]).columns.tolist()
+        # Cross features are categorical even when FeatureEngineering codes them as integers
+        string_cols = self.df.select_dtypes(include=["object", "category"]).columns
+        cat_cols = [col for col in self.df.columns if col in string_cols or col in CROSS_FEATURES]
 
         # cat_cols += ['RELEASE_YEAR', 'SALESYEAR']
         
@@ -33,8 +51,8 @@ class GetBestModel:
 
         return cat_cols
 
-    def get_best_model(self):
-        model_param_list = [
+    def get_model_param_list(self):
+        return [
             (RandomForestRegressor, {
                 'model__n_estimators': [100, 200, 300],         
                 'model__max_depth': [None, 10, 20, 30],         
@@ -59,6 +77,9 @@ class GetBestModel:
             })
         ]
 
+    def get_best_model(self):
+        model_param_list = self.model_param_list or self.get_model_param_list()
+
         cat_cols = self.get_encoding_col()
        
         X_train, X_test, y_train, y_test = self.train_test_split_data()
@@ -68,10 +89,99 @@ class GetBestModel:
             y_train=y_train,
             X_test=X_test,
             y_test=y_test,
-            cat_cols=cat_cols
+            cat_cols=cat_cols,
+            search_strategy=self.search_strategy
         )
 
         best_result = training.tune_multiple_models_with_gridsearch(
-            model_param_list=model_param_list
+            model_param_list=model_param_list,
+            single_search=True
         )
-        return best_result['best_model']
\ No newline at end of file
+        best_model = best_result['best_model']
+        # Saved in the model's manifest by utils.save_model
+        best_model.training_metrics_ = {
+            'model_class': best_result['model_class'].__name__,
+            'best_params': best_result['best_params'],
+            'cv_score': float(best_result['cv_score']),
+            'test_r2': float(best_result['test_r2']),
+            'test_rmse': float(best_result['test_rmse']),
+            'search_strategy': self.search_strategy,
+        }
+        # Interval fallback for families without per-tree predictions (prediction_intervals)
+        best_model.residual_quantiles_ = residual_quantiles(y_test, best_model.predict(X_test))
+        return best_model
+
+    def warm_start_model(self, previous_model, new_rows, test_size=0.2, random_state=42):
+        """
+        Continue training previous_model on this data instead of searching again
+
+        The previous family and hyperparameters are kept. Forests and
+        boosting keep their fitted trees and grow by the new rows' share of
+        n_estimators (warm_start), SimpleNNRegressor keeps training its
+        network, and the linear models refit (Lasso from its previous
+        coefficients). The fitted encoders are kept, since the kept trees
+        and weights were trained on their encoding; only the estimator is
+        fit. If the rows hold categories the previous OrdinalEncoder has not
+        seen, the whole pipeline is refit from scratch with the previous
+        hyperparameters instead (search_strategy 'refit').
+
+        Args:
+            previous_model: Fitted pipeline from get_best_model() or an earlier warm start
+            new_rows: Boolean mask over self.df of the rows the previous
+                model has not seen. The test rows are drawn from these only,
+                since the previous model may have trained on any of the others.
+        """
+        X = self.df.drop(columns=['UNITS'])
+        y = self.df['UNITS']
+        new_idx = np.flatnonzero(new_rows)
+        new_train_idx, test_idx = train_test_split(new_idx, test_size=test_size, random_state=random_state)
+        train_idx = np.concatenate([np.flatnonzero(~np.asarray(new_rows)), new_train_idx])
+
+        X_train, y_train = X.iloc[train_idx], y.iloc[train_idx]
+        try:
+            Xt_train = previous_model[:-1].transform(X_train)
+        except ValueError as e:
+            print(f"Previous encoders cannot encode the new rows ({e}); refitting the pipeline")
+            Xt_train = None
+
+        params = {}
+        if Xt_train is None:
+            search_strategy = 'refit'
+            best_model = clone(previous_model).fit(X_train, y_train)
+        else:
+            search_strategy = 'warm_start'
+            best_model = copy.deepcopy(previous_model)
+            estimator = best_model.named_steps['model']
+            estimator_params = estimator.get_params()
+            if 'warm_start' in estimator_params:
+                params['model__warm_start'] = True
+            if 'n_estimators' in estimator_params:
+                n_estimators = estimator_params['n_estimators']
+                params['model__n_estimators'] = n_estimators + max(1, math.ceil(n_estimators * len(new_idx) / len(X)))
+            best_model.set_params(**params)
+            estimator.fit(Xt_train, y_train)
+
+            if 'warm_start' in estimator_params:
+                # Only this fit continues; the saved model's parameters stay as they were
+                best_model.set_params(model__warm_start=estimator_params['warm_start'])
+
+        y_pred = best_model.predict(X.iloc[test_idx])
+        test_r2 = r2_score(y.iloc[test_idx], y_pred)
+        test_rmse = np.sqrt(mean_squared_error(y.iloc[test_idx], y_pred))
+        print("Warm-start Test R² Score:", test_r2)
+        print("Warm-start Test RMSE:", test_rmse)
+
+        previous_metrics = getattr(previous_model, 'training_metrics_', {})
+        best_params = dict(previous_metrics.get('best_params', {}))
+        best_params.update({key: value for key, value in params.items() if key != 'model__warm_start'})
+        best_model.training_metrics_ = {
+            'model_class': type(best_model.named_steps['model']).__name__,
+            'best_params': best_params,
+            # No cross-validation runs on a warm start
+            'cv_score': None,
+            'test_r2': float(test_r2),
+            'test_rmse': float(test_rmse),
+            'search_strategy': search_strategy,
+        }
+        best_model.residual_quantiles_ = residual_quantiles(y.iloc[test_idx], y_pred)
+        return best_model
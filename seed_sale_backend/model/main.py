@@ -2,24 +2,37 @@
 Main script to run the ML Pipeline
 """
 
+import json
+import os
+
 from model_pipeline import ModelPipeline
-from utils import save_model
+from profiling import profiler
+from utils import save_model, load_model
 
 
 def main():
     """
     Main function to run the complete ML pipeline
     """
+    # Per-stage timings are cheap next to training; PROFILE_MEMORY=1 adds peak memory
+    profiler.enable(track_memory=os.environ.get('PROFILE_MEMORY', '0') == '1')
+
     print("=" * 50)
     print("Starting ML Pipeline")
     print("=" * 50)
     
-    # Initialize the pipeline
-    pipeline = ModelPipeline()
+    # Initialize the pipeline; HISTORY_DIR keeps the preprocessed training data for incremental retrains
+    pipeline = ModelPipeline(history_dir=os.environ.get('HISTORY_DIR') or None)
     
-    # Train the model
+    # Train the model, or with NEW_DATA_PATH retrain ./best_model.pkl on the new rows only
     print("\n--- Training Phase ---")
-    best_model = pipeline.fit()
+    new_data_path = os.environ.get('NEW_DATA_PATH')
+    if new_data_path:
+        best_model = pipeline.fit_incremental(
+            new_data_path, load_model('./best_model.pkl'),
+            drift_threshold=float(os.environ.get('DRIFT_THRESHOLD', '0.05')))
+    else:
+        best_model = pipeline.fit()
     
     # Save the trained model
     save_model(best_model, './best_model.pkl')
@@ -33,6 +46,9 @@ def main():
     print(f"Final predictions: {predictions}")
     print("=" * 50)
 
+    print("Stage profile:")
+    print(json.dumps(profiler.summary(), indent=2))
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,48 +1,200 @@
+import os
+import time
+
+import pandas as pd
+from sklearn.metrics import r2_score
+
 from data_sourcing import DataSourcing
 from data_preprocessing import DataPreprocessing
 from feature_engineering import FeatureEngineering
 from get_best_model import GetBestModel
+from profiling import profiler, predict_in_stages
 
 
 class ModelPipeline:
-    def __init__(self):
+    def __init__(self, search_strategy='grid', drop_lifecycle_violations=False, data_path='case_study_data.csv',
+                 test_data_path='synthetic_test_data.csv', model_param_list=None, history_dir=None):
+        """
+        Args:
+            history_dir: If set, fit() and fit_incremental() keep the
+                preprocessed training data there, so fit_incremental()
+                only has to preprocess the new rows
+        """
         self.best_model = None
+        self.feature_engineering = FeatureEngineering()
+        self.search_strategy = search_strategy
+        self.drop_lifecycle_violations = drop_lifecycle_violations
+        self.data_path = data_path
+        self.test_data_path = test_data_path
+        self.model_param_list = model_param_list
+        self.history_dir = history_dir
+
+    def history_path(self):
+        return os.path.join(self.history_dir, 'history.pkl')
+
+    def write_history(self, df):
+        os.makedirs(self.history_dir, exist_ok=True)
+        # Replace the file in one step so a failed retrain leaves the previous history intact
+        tmp_path = self.history_path() + '.tmp'
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, self.history_path())
+
+    def merge_history(self, history, df_new):
+        """
+        Preprocessed history plus the preprocessed new rows
+
+        History rows of the SALESYEARs in df_new are dropped, so a season
+        that is delivered again replaces the earlier copy. Lifecycle
+        violations are checked again across both.
+        """
+        history = history[~history['SALESYEAR'].isin(df_new['SALESYEAR'].unique())]
+        df = pd.concat([history, df_new], ignore_index=True)
+        # Categoricals with different categories concatenate to object
+        for col in history.columns:
+            if isinstance(history[col].dtype, pd.CategoricalDtype) and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+        if self.drop_lifecycle_violations:
+            preprocessing = DataPreprocessing(df)
+            preprocessing.remove_lifecycle_violations()
+            df = preprocessing.df
+        return df
+
+    def validation_drift(self, previous_model, df_new):
+        """
+        How far previous_model's R² on the new rows falls below its test R²
+        at training time, or None if the model has no training_metrics_ or
+        feature_stats_ (e.g. saved straight from GetBestModel)
+        """
+        metrics = getattr(previous_model, 'training_metrics_', None)
+        state_stats = getattr(previous_model, 'feature_stats_', None)
+        if not metrics or state_stats is None:
+            return None
+        df_new = FeatureEngineering(state_stats=state_stats).transform(df_new.copy())
+        new_r2 = r2_score(df_new['UNITS'], previous_model.predict(df_new[previous_model.feature_names_in_]))
+        print("Previous model R² on new data:", new_r2, "at training:", metrics['test_r2'])
+        return metrics['test_r2'] - new_r2
 
     def fit(self):
-        df = DataSourcing().read_data_local()
+        start = time.perf_counter()
+        with profiler.stage('train.sourcing') as stage:
+            df = DataSourcing(file_path=self.data_path).read_data_local()
+            stage.rows_out = len(df)
         print("Data sourced successfully.")
         print("=" * 50)
        
-        df = DataPreprocessing(df).preprocessing_fit()
+        with profiler.stage('train.preprocessing', rows_in=len(df)) as stage:
+            df = DataPreprocessing(df).preprocessing_fit(drop_lifecycle_violations=self.drop_lifecycle_violations)
+            stage.rows_out = len(df)
+        if self.history_dir:
+            self.write_history(df)
         print("Data preprocessing completed.")
         print("=" * 50)
     
-        # df = remove_lifecycle_violations(df)  # Assuming remove_lifecycle is defined elsewhere
-        df = FeatureEngineering().feature_engineering(df)
+        with profiler.stage('train.feature_engineering', rows_in=len(df)) as stage:
+            df = self.feature_engineering.fit(df).transform(df)
+            stage.rows_out = len(df)
         print("Feature engineering completed.")
         print("=" * 50)
     
-        self.best_model = GetBestModel(df).get_best_model()
+        with profiler.stage('train.model_search', rows_in=len(df)):
+            self.best_model = GetBestModel(df, search_strategy=self.search_strategy,
+                                           model_param_list=self.model_param_list).get_best_model()
+        # Ship the training-set aggregates with the model so scoring does not recompute them per batch
+        self.best_model.feature_stats_ = self.feature_engineering.state_stats
+        self.best_model.training_metrics_['fit_seconds'] = time.perf_counter() - start
         print("Best model training completed.")
         print("=" * 50)
     
         return self.best_model
+
+    def fit_incremental(self, new_data_path, previous_model, drift_threshold=0.05):
+        """
+        Retrain previous_model with the rows of new_data_path added to the
+        history kept by an earlier fit() or fit_incremental()
+
+        Only the new rows are sourced and preprocessed. If the previous
+        model's R² on them is within drift_threshold of its test R² at
+        training time, it keeps its family and hyperparameters and continues
+        training (GetBestModel.warm_start_model); otherwise, or if the model
+        has no training_metrics_ or feature_stats_, the full search runs
+        again on all rows.
+
+        The retrain's mode, drift and duration are added to the model's
+        training_metrics_ (and so to its manifest).
+        """
+        if not self.history_dir or not os.path.exists(self.history_path()):
+            raise FileNotFoundError("fit_incremental needs the history written by fit() with history_dir set")
+        start = time.perf_counter()
+
+        with profiler.stage('retrain.sourcing') as stage:
+            df_new = DataSourcing(file_path=new_data_path).read_data_local()
+            stage.rows_out = len(df_new)
+
+        with profiler.stage('retrain.preprocessing', rows_in=len(df_new)) as stage:
+            df_new = DataPreprocessing(df_new).preprocessing_fit(drop_lifecycle_violations=self.drop_lifecycle_violations)
+            stage.rows_out = len(df_new)
+        if df_new.empty:
+            raise ValueError(f"No rows of {new_data_path} are left after preprocessing")
+
+        with profiler.stage('retrain.merge', rows_in=len(df_new)) as stage:
+            df = self.merge_history(pd.read_pickle(self.history_path()), df_new)
+            new_rows = df['SALESYEAR'].isin(df_new['SALESYEAR'].unique()).to_numpy()
+            stage.rows_out = len(df)
+
+        with profiler.stage('retrain.drift', rows_in=len(df_new)):
+            drift = self.validation_drift(previous_model, df_new)
+
+        with profiler.stage('retrain.feature_engineering', rows_in=len(df)) as stage:
+            features = self.feature_engineering.fit(df).transform(df.copy())
+            stage.rows_out = len(features)
+
+        search = GetBestModel(features, search_strategy=self.search_strategy, model_param_list=self.model_param_list)
+        retrain_mode = 'full_search' if drift is None or drift > drift_threshold else 'warm_start'
+        with profiler.stage(f'retrain.{retrain_mode}', rows_in=len(features)):
+            if retrain_mode == 'warm_start':
+                self.best_model = search.warm_start_model(previous_model, new_rows)
+            else:
+                self.best_model = search.get_best_model()
+        self.best_model.feature_stats_ = self.feature_engineering.state_stats
+        self.write_history(df)
+
+        fit_seconds = time.perf_counter() - start
+        self.best_model.training_metrics_.update({
+            'fit_seconds': fit_seconds,
+            'retrain_mode': retrain_mode,
+            'validation_drift': drift,
+            'rows_new': int(new_rows.sum()),
+            'rows_total': len(df),
+        })
+        print(f"Retrained ({retrain_mode}, drift {drift if drift is None else f'{drift:.4f}'}) "
+              f"on {int(new_rows.sum()):,} new of {len(df):,} rows in {fit_seconds:.1f}s")
+        previous_seconds = getattr(previous_model, 'training_metrics_', {}).get('fit_seconds')
+        if previous_seconds:
+            print(f"Previous fit took {previous_seconds:.1f}s on {len(df) - int(new_rows.sum()):,} rows")
+        print("=" * 50)
+        return self.best_model
     
     def score(self):
-        df_test = DataSourcing(file_path='synthetic_test_data.csv').read_data_local()
+        with profiler.stage('score.sourcing') as stage:
+            df_test = DataSourcing(file_path=self.test_data_path).read_data_local()
+            stage.rows_out = len(df_test)
         print("Data sourcing for evaluation completed.")
         print("=" * 50)
     
-        df_test = DataPreprocessing(df_test).preprocessing_score()   
+        with profiler.stage('score.preprocessing', rows_in=len(df_test)) as stage:
+            df_test = DataPreprocessing(df_test).preprocessing_score()
+            stage.rows_out = len(df_test)
         print("Data preprocessing for evaluation completed.")
         print("=" * 50)
     
-        df_test = FeatureEngineering().feature_engineering(df_test)
+        with profiler.stage('score.feature_engineering', rows_in=len(df_test)) as stage:
+            df_test = self.feature_engineering.transform(df_test)
+            stage.rows_out = len(df_test)
         print("Feature engineering completed.")
         print("=" * 50)
     
         df_test = df_test[self.best_model.feature_names_in_]
-        pred = self.best_model.predict(df_test)
+        pred = predict_in_stages(self.best_model, df_test, profiler, prefix='score.')
         print("Prediction:", pred)
         print("Prediction completed.")
         return pred
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Prediction quantiles from a trained pipeline, without refitting it or
+running a second model.
+
+Forests ('trees'): the quantiles of the individual trees' predictions,
+from the same pass over the trees that gives the point prediction.
+
+Other families ('residuals'): the point prediction plus the quantiles of
+the model's held-out residuals, which GetBestModel stores on the model as
+residual_quantiles_.
+"""
+import numpy as np
+
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+
+# Residual quantiles kept on the model: every percentile from 0 to 100
+RESIDUAL_LEVELS = np.linspace(0.0, 1.0, 101)
+
+
+def residual_quantiles(y_true, y_pred):
+    """Quantiles of the residuals y_true - y_pred at RESIDUAL_LEVELS, as a plain dict to pickle with the model"""
+    residuals = np.asarray(y_true, dtype=np.float64) - np.asarray(y_pred, dtype=np.float64)
+    return {'levels': RESIDUAL_LEVELS.tolist(), 'values': np.quantile(residuals, RESIDUAL_LEVELS).tolist()}
+
+
+def _final_estimator(model):
+    return model.steps[-1][1] if hasattr(model, 'steps') else model
+
+
+def is_forest(estimator):
+    """Whether estimator's trees can be evaluated one by one: a single-output forest or a FlatForestRegressor"""
+    from flat_forest import FLATTENABLE_FORESTS
+
+    if hasattr(estimator, 'predict_per_tree'):
+        return True
+    return type(estimator).__name__ in FLATTENABLE_FORESTS and getattr(estimator, 'n_outputs_', None) == 1
+
+
+def per_tree_predictions(estimator, X):
+    """Every tree's prediction for the encoded rows X of a forest, shape (n_trees, n_rows)"""
+    if hasattr(estimator, 'predict_per_tree'):
+        return estimator.predict_per_tree(X)
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    return np.stack([tree.predict(X, check_input=False) for tree in estimator.estimators_])
+
+
+def interval_method(model):
+    """'trees' or 'residuals', whichever predict_quantiles will use for model, or None if neither applies"""
+    if is_forest(_final_estimator(model)):
+        return 'trees'
+    if getattr(model, 'residual_quantiles_', None):
+        return 'residuals'
+    return None
+
+
+def predict_quantiles(model, X, quantiles=DEFAULT_QUANTILES):
+    """
+    Point predictions and quantiles for the feature rows X
+
+    For forests the point prediction accumulates the trees in order, like
+    the forest's own predict, so it equals model.predict(X).
+
+    Returns:
+        (predictions of shape (n_rows,), quantiles of shape (n_rows, len(quantiles)), method)
+
+    Raises:
+        ValueError: If model is not a forest and has no residual_quantiles_
+            (models trained before they were stored)
+    """
+    quantiles = np.asarray(quantiles, dtype=np.float64)
+    method = interval_method(model)
+    if method is None:
+        raise ValueError("This model has no prediction intervals; retrain it to store its residual quantiles")
+
+    if method == 'trees':
+        Xt = model[:-1].transform(X) if hasattr(model, 'steps') else X
+        per_tree = per_tree_predictions(_final_estimator(model), Xt)
+        predictions = np.zeros(per_tree.shape[1], dtype=np.float64)
+        for tree_prediction in per_tree:
+            predictions += tree_prediction
+        predictions /= len(per_tree)
+        return predictions, np.quantile(per_tree, quantiles, axis=0).T, method
+
+    predictions = model.predict(X)
+    residuals = model.residual_quantiles_
+    offsets = np.interp(quantiles, residuals['levels'], residuals['values'])
+    return predictions, np.asarray(predictions, dtype=np.float64)[:, None] + offsets[None, :], method
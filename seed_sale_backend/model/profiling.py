@@ -0,0 +1,198 @@
+"""
+Lightweight per-stage instrumentation.
+
+    with profiler.stage('preprocessing', rows_in=len(df)) as stage:
+        df = DataPreprocessing(df).preprocessing_score()
+        stage.rows_out = len(df)
+
+Each stage accumulates call count, wall time and rows in/out, plus the
+peak traced memory when track_memory is on. When the profiler is
+disabled, stage() returns a shared no-op context manager, so leaving the
+instrumentation in hot paths costs a method call and an attribute check.
+
+The process-wide profiler is configured from the environment:
+PROFILE=1 enables it and PROFILE_MEMORY=1 also records peak memory
+(through tracemalloc, which slows allocation-heavy code noticeably).
+"""
+import os
+import threading
+import time
+import tracemalloc
+
+METRIC_PREFIX = 'seed_sale_stage'
+
+
+class _NullStage:
+    rows_out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, profiler, name, rows_in):
+        self.profiler = profiler
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+
+    def __enter__(self):
+        self.tracks_memory = self.profiler.track_memory
+        if self.tracks_memory:
+            self.profiler.memory_enter(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        peak_bytes = None
+        if self.tracks_memory:
+            peak_bytes = self.profiler.memory_exit(self)
+        self.profiler.record(self.name, seconds, self.rows_in, self.rows_out, peak_bytes, failed=exc_type is not None)
+        return False
+
+
+class Profiler:
+    def __init__(self, enabled=False, track_memory=False):
+        self.enabled = False
+        self.track_memory = False
+        self._lock = threading.Lock()
+        self._stages = {}
+        # Stages being timed with track_memory, in any thread, each with its running memory peak
+        self._open_stages = []
+        if enabled:
+            self.enable(track_memory)
+
+    @classmethod
+    def from_env(cls):
+        return cls(enabled=os.environ.get('PROFILE', '0') == '1',
+                   track_memory=os.environ.get('PROFILE_MEMORY', '0') == '1')
+
+    def enable(self, track_memory=False):
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.track_memory = track_memory
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+
+    def _fold_peak(self):
+        # The traced peak since the last reset counts towards every open stage's peak
+        peak = tracemalloc.get_traced_memory()[1]
+        for stage in self._open_stages:
+            stage.memory_peak = max(stage.memory_peak, peak)
+
+    def memory_enter(self, stage):
+        """
+        Start tracking stage's memory peak
+
+        tracemalloc has a single, process-wide peak. It is reset so the new
+        stage measures its own peak, after folding it into the stages
+        already open (an enclosing stage, or one in another thread), so
+        nested and concurrent stages keep their peaks. Concurrent stages
+        still count each other's allocations.
+        """
+        with self._lock:
+            self._fold_peak()
+            tracemalloc.reset_peak()
+            stage.memory_start = stage.memory_peak = tracemalloc.get_traced_memory()[0]
+            self._open_stages.append(stage)
+
+    def memory_exit(self, stage):
+        """Stop tracking stage's memory and return its peak above the memory traced when it started"""
+        with self._lock:
+            self._fold_peak()
+            self._open_stages.remove(stage)
+        return max(0, stage.memory_peak - stage.memory_start)
+
+    def stage(self, name, rows_in=None):
+        """Context manager timing one run of a stage; set .rows_out on it before leaving"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, rows_in)
+
+    def record(self, name, seconds, rows_in=None, rows_out=None, peak_bytes=None, failed=False):
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = {
+                    'calls': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                    'rows_in': 0, 'rows_out': 0, 'peak_memory_bytes': None,
+                }
+            stats['calls'] += 1
+            stats['errors'] += int(failed)
+            stats['seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+            stats['rows_in'] += rows_in or 0
+            stats['rows_out'] += rows_out or 0
+            if peak_bytes is not None:
+                stats['peak_memory_bytes'] = max(stats['peak_memory_bytes'] or 0, peak_bytes)
+
+    def summary(self):
+        """Per-stage totals, plus mean seconds and rows/sec, as a JSON-serializable dict"""
+        with self._lock:
+            stages = {name: dict(stats) for name, stats in self._stages.items()}
+        for stats in stages.values():
+            stats['mean_seconds'] = stats['seconds'] / stats['calls']
+            rows = max(stats['rows_in'], stats['rows_out'])
+            stats['rows_per_sec'] = rows / stats['seconds'] if stats['seconds'] > 0 else 0.0
+        return {'enabled': self.enabled, 'track_memory': self.track_memory, 'stages': stages}
+
+    def prometheus(self):
+        """The stage totals in the Prometheus text exposition format"""
+        metrics = [
+            ('calls_total', 'counter', 'Completed runs of each pipeline stage', 'calls'),
+            ('errors_total', 'counter', 'Runs of each pipeline stage that raised', 'errors'),
+            ('seconds_total', 'counter', 'Wall time spent in each pipeline stage', 'seconds'),
+            ('max_seconds', 'gauge', 'Slowest single run of each pipeline stage', 'max_seconds'),
+            ('rows_in_total', 'counter', 'Rows entering each pipeline stage', 'rows_in'),
+            ('rows_out_total', 'counter', 'Rows leaving each pipeline stage', 'rows_out'),
+            ('peak_memory_bytes', 'gauge', 'Largest traced memory peak of a single run of each stage',
+             'peak_memory_bytes'),
+        ]
+        stages = self.summary()['stages']
+
+        lines = []
+        for suffix, metric_type, help_text, key in metrics:
+            name = f"{METRIC_PREFIX}_{suffix}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for stage, stats in sorted(stages.items()):
+                if stats[key] is not None:
+                    lines.append(f'{name}{{stage="{stage}"}} {stats[key]}')
+        return "\n".join(lines) + "\n"
+
+
+def predict_in_stages(model, X, profiler, prefix=''):
+    """
+    model.predict(X), timing the preprocessor ('encoding') and the final
+    estimator ('predict') of a Pipeline as separate stages, with stage
+    names prefixed by prefix
+    """
+    if not profiler.enabled or not hasattr(model, 'steps') or len(model.steps) < 2:
+        with profiler.stage(prefix + 'predict', rows_in=len(X)) as stage:
+            predictions = model.predict(X)
+            stage.rows_out = len(predictions)
+        return predictions
+
+    with profiler.stage(prefix + 'encoding', rows_in=len(X)) as stage:
+        Xt = model[:-1].transform(X)
+        stage.rows_out = Xt.shape[0]
+    with profiler.stage(prefix + 'predict', rows_in=Xt.shape[0]) as stage:
+        predictions = model.steps[-1][1].predict(Xt)
+        stage.rows_out = len(predictions)
+    return predictions
+
+
+profiler = Profiler.from_env()
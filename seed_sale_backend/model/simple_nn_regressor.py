@@ -1,6 +1,10 @@
+import copy
+import inspect
+import time
 import torch
 import torch.nn as nn
 import torch.optim as optim
+import numpy as np
 import pandas as pd
 from sklearn.base import BaseEstimator, RegressorMixin
 
@@ -20,46 +24,187 @@ class SimpleNN(nn.Module):
         x = self.relu(self.fc2(x))
         x = self.dropout(x)
         x = self.fc3(x)
-        return x.squeeze()
+        # Only drop the output dimension, so a 1-row batch stays shape (1,)
+        return x.squeeze(-1)
 
 
 class SimpleNNRegressor(BaseEstimator, RegressorMixin):
-    def __init__(self, input_dim=10, hidden_dim=64, lr=0.001, epochs=20, batch_size=32):
+    def __init__(self, input_dim=10, hidden_dim=64, lr=0.001, epochs=20, batch_size=32,
+                 early_stopping=False, validation_fraction=0.1, patience=5, n_threads=None,
+                 random_state=None, verbose=False, predict_batch_size=8192, warm_start=False):
+        """
+        Args:
+            early_stopping: Hold out validation_fraction of the training rows
+                and stop once the validation loss has not improved for
+                patience epochs, keeping the best weights
+            n_threads: torch intra-op threads while fit trains, restored
+                afterwards; None leaves torch's setting (by default one per
+                core). Training sets this so parallel grid-search workers do
+                not oversubscribe the cores.
+            random_state: Seed for weight init, shuffling and the validation split
+            verbose: Print epochs run and training throughput after fit
+            predict_batch_size: Rows per forward pass in predict, bounding its memory peak
+            warm_start: Continue training the current network on the next
+                fit instead of initializing a new one, as long as the
+                number of features and hidden_dim are unchanged
+        """
         self.input_dim = input_dim
         self.hidden_dim = hidden_dim
         self.lr = lr
         self.epochs = epochs
         self.batch_size = batch_size
+        self.early_stopping = early_stopping
+        self.validation_fraction = validation_fraction
+        self.patience = patience
+        self.n_threads = n_threads
+        self.random_state = random_state
+        self.verbose = verbose
+        self.predict_batch_size = predict_batch_size
+        self.warm_start = warm_start
         self.model = None
 
+    def __getstate__(self):
+        # A loaded TorchScript module is not picklable; it is re-attached from its own file
+        state = self.__dict__.copy()
+        state.pop('scripted_model_', None)
+        return state
+
+    def __setstate__(self, state):
+        # Models pickled by earlier versions lack the parameters added since; they get their defaults
+        for name, parameter in inspect.signature(SimpleNNRegressor.__init__).parameters.items():
+            if name != 'self':
+                state.setdefault(name, parameter.default)
+        if 'n_features_in_' not in state and state.get('model') is not None:
+            state['n_features_in_'] = state['model'].fc1.in_features
+        super().__setstate__(state)
+
     def _to_tensor(self, data):
         if isinstance(data, pd.DataFrame) or isinstance(data, pd.Series):
-            data = data.values
-        return torch.tensor(data, dtype=torch.float32)
+            data = data.to_numpy(dtype=np.float32, copy=False)
+        # Shares memory with data when it is already a writable C-contiguous float32 array
+        data = np.ascontiguousarray(data, dtype=np.float32)
+        if not data.flags.writeable:
+            # pandas 3 returns read-only views, and torch does not support read-only tensors
+            data = data.copy()
+        return torch.from_numpy(data)
 
-    def fit(self, X, y):
-        X_tensor = self._to_tensor(X)
-        y_tensor = self._to_tensor(y)
+    def _split_validation(self, X_tensor, y_tensor, generator):
+        n_val = max(1, int(len(X_tensor) * self.validation_fraction))
+        perm = torch.randperm(len(X_tensor), generator=generator)
+        val_idx, train_idx = perm[:n_val], perm[n_val:]
+        return X_tensor[train_idx], y_tensor[train_idx], X_tensor[val_idx], y_tensor[val_idx]
 
-        self.model = SimpleNN(X_tensor.shape[1], self.hidden_dim)
+    def _train(self, X_tensor, y_tensor, X_val, y_val, generator):
+        reuse = (self.warm_start and self.model is not None
+                 and (self.model.fc1.in_features, self.model.fc1.out_features) == (X_tensor.shape[1], self.hidden_dim))
+        if not reuse:
+            self.model = SimpleNN(X_tensor.shape[1], self.hidden_dim)
         criterion = nn.MSELoss()
         optimizer = optim.Adam(self.model.parameters(), lr=self.lr)
 
-        dataset = torch.utils.data.TensorDataset(X_tensor, y_tensor)
-        loader = torch.utils.data.DataLoader(dataset, batch_size=self.batch_size, shuffle=True)
+        n_samples = len(X_tensor)
+        best_val_loss = float('inf')
+        best_state = None
+        epochs_without_improvement = 0
 
-        self.model.train()
         for epoch in range(self.epochs):
-            for xb, yb in loader:
+            self.model.train()
+            # One shuffle per epoch, then contiguous slices instead of a DataLoader
+            perm = torch.randperm(n_samples, generator=generator)
+            X_epoch, y_epoch = X_tensor[perm], y_tensor[perm]
+            for batch_start in range(0, n_samples, self.batch_size):
+                xb = X_epoch[batch_start:batch_start + self.batch_size]
+                yb = y_epoch[batch_start:batch_start + self.batch_size]
                 pred = self.model(xb)
                 loss = criterion(pred, yb)
                 optimizer.zero_grad()
                 loss.backward()
                 optimizer.step()
+
+            if self.early_stopping:
+                self.model.eval()
+                with torch.no_grad():
+                    val_loss = criterion(self.model(X_val), y_val).item()
+                if val_loss < best_val_loss:
+                    best_val_loss = val_loss
+                    best_state = copy.deepcopy(self.model.state_dict())
+                    epochs_without_improvement = 0
+                else:
+                    epochs_without_improvement += 1
+                    if epochs_without_improvement >= self.patience:
+                        break
+
+        self.n_epochs_ = epoch + 1 if self.epochs > 0 else 0
+        if self.early_stopping:
+            self.best_val_loss_ = best_val_loss
+        return best_state
+
+    def fit(self, X, y):
+        X_tensor = self._to_tensor(X)
+        y_tensor = self._to_tensor(y)
+
+        generator = torch.Generator()
+        if self.random_state is not None:
+            generator.manual_seed(self.random_state)
+
+        X_val = y_val = None
+        if self.early_stopping:
+            X_tensor, y_tensor, X_val, y_val = self._split_validation(X_tensor, y_tensor, generator)
+
+        start = time.perf_counter()
+        # torch's thread count is process-wide, so it only changes for this fit
+        previous_threads = torch.get_num_threads()
+        if self.n_threads is not None:
+            torch.set_num_threads(self.n_threads)
+        try:
+            # Seed weight init and dropout without touching the caller's global RNG
+            with torch.random.fork_rng(enabled=self.random_state is not None):
+                if self.random_state is not None:
+                    torch.manual_seed(self.random_state)
+                best_state = self._train(X_tensor, y_tensor, X_val, y_val, generator)
+        finally:
+            torch.set_num_threads(previous_threads)
+        elapsed = time.perf_counter() - start
+
+        if best_state is not None:
+            self.model.load_state_dict(best_state)
+
+        self.n_features_in_ = X_tensor.shape[1]
+        self.train_samples_per_sec_ = len(X_tensor) * self.n_epochs_ / elapsed if elapsed > 0 else float('inf')
+        if self.verbose:
+            print(f"SimpleNNRegressor: {self.n_epochs_} epochs, {self.train_samples_per_sec_:,.0f} samples/sec")
         return self
 
     def predict(self, X):
         X_tensor = self._to_tensor(X)
+        module = getattr(self, 'scripted_model_', None)
+        if module is None:
+            module = self.model
         self.model.eval()
+
+        predictions = np.empty(len(X_tensor), dtype=np.float32)
+        with torch.inference_mode():
+            for start in range(0, len(X_tensor), self.predict_batch_size):
+                chunk = X_tensor[start:start + self.predict_batch_size]
+                predictions[start:start + len(chunk)] = module(chunk).numpy()
+        return predictions
+
+    def export_torchscript(self, path):
+        """
+        Save the fitted network as a frozen TorchScript module
+
+        The traced module runs without Python-level nn.Module dispatch;
+        load_torchscript() attaches it to an unpickled regressor.
+        """
+        self.model.eval()
+        example = torch.zeros(1, self.n_features_in_, dtype=torch.float32)
         with torch.no_grad():
-            return self.model(X_tensor).numpy()
\ No newline at end of file
+            frozen = torch.jit.freeze(torch.jit.trace(self.model, example))
+        frozen.save(path)
+        return path
+
+    def load_torchscript(self, path):
+        """Use the TorchScript module saved by export_torchscript() for predict"""
+        self.scripted_model_ = torch.jit.load(path)
+        self.scripted_model_.eval()
+        return self
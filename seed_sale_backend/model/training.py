@@ -1,14 +1,76 @@
 import inspect
+import os
+import tempfile
+import time
+from joblib import Memory, effective_n_jobs
+from sklearn.base import clone
 from sklearn.pipeline import Pipeline
-from sklearn.model_selection import GridSearchCV
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, check_cv
 from sklearn.metrics import r2_score, mean_squared_error
 from sklearn.preprocessing import OrdinalEncoder
 from sklearn.compose import ColumnTransformer
 from category_encoders import TargetEncoder
 import numpy as np
 
+SEARCH_STRATEGIES = ('grid', 'random', 'halving')
+
+# Halving budget per family: the first of these in a family's grid becomes the
+# resource; families with none of them (linear models) are given growing sample fractions
+HALVING_RESOURCES = ['model__n_estimators', 'model__epochs']
+
+
+class EncodedFolds:
+    """
+    The encoded training and validation rows of every CV fold, stacked in
+    one float32 matrix
+
+    Fold k's training rows are encoded by a preprocessor fitted on them
+    alone and its validation rows by that same preprocessor, as a pipeline
+    would within the search; splits holds each fold's (train, validation)
+    row positions in X. Searching a model-only pipeline over (X, y) with
+    cv=splits scores candidates as the full pipeline would, without
+    refitting the encoders per candidate.
+    """
+
+    def __init__(self, preprocessor, X, y, cv):
+        start = time.perf_counter()
+        folds = []
+        for train_idx, val_idx in cv.split(X, y):
+            fold_preprocessor = clone(preprocessor)
+            X_fold_train = fold_preprocessor.fit_transform(X.iloc[train_idx], y.iloc[train_idx])
+            X_fold_val = fold_preprocessor.transform(X.iloc[val_idx])
+            folds.append((X_fold_train, X_fold_val, train_idx, val_idx))
+
+        n_rows = sum(len(train_idx) + len(val_idx) for _, _, train_idx, val_idx in folds)
+        self.X = np.empty((n_rows, folds[0][0].shape[1]), dtype=np.float32)
+        self.y = np.empty(n_rows, dtype=np.asarray(y).dtype)
+        self.splits = []
+        offset = 0
+        y_values = np.asarray(y)
+        for X_fold_train, X_fold_val, train_idx, val_idx in folds:
+            positions = []
+            for block, idx in ((X_fold_train, train_idx), (X_fold_val, val_idx)):
+                self.X[offset:offset + len(idx)] = block
+                self.y[offset:offset + len(idx)] = y_values[idx]
+                positions.append(np.arange(offset, offset + len(idx)))
+                offset += len(idx)
+            self.splits.append(tuple(positions))
+        self.seconds = time.perf_counter() - start
+
+
 class Training:
-    def __init__(self, X_train, y_train, X_test, y_test, cat_cols, scoring='r2', cv=5, random_state=42):
+    def __init__(self, X_train, y_train, X_test, y_test, cat_cols, scoring='r2', cv=5, random_state=42,
+                 n_jobs=-1, cache_dir=None, search_strategy='grid', n_iter=10, halving_factor=3, fold_cache=True):
+        """
+        Args:
+            cache_dir: Where the single search without fold_cache keeps its
+                fitted-preprocessor cache (a temporary directory by default)
+            fold_cache: Encode every CV fold once (EncodedFolds) and search
+                the models over the encoded folds, instead of fitting the
+                encoders again for every candidate and fold. Halving
+                searches on the 'n_samples' resource always run the full
+                pipeline (see uses_fold_cache)
+        """
         self.X_train = X_train
         self.y_train = y_train
         self.X_test = X_test
@@ -17,41 +79,151 @@ class Training:
         self.scoring = scoring
         self.cv = cv
         self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.cache_dir = cache_dir
+        if search_strategy not in SEARCH_STRATEGIES:
+            raise ValueError(f"search_strategy must be one of {SEARCH_STRATEGIES}, got {search_strategy!r}")
+        self.search_strategy = search_strategy
+        self.n_iter = n_iter
+        self.halving_factor = halving_factor
+        self.fold_cache = fold_cache
+        self._encoded_folds = None
 
-    def tune_model_with_gridsearch(self, model_class, param_grid):
+    def threads_per_worker(self):
+        """Cores left to each search worker, so torch thread pools do not oversubscribe the CPU"""
+        return max(1, (os.cpu_count() or 1) // effective_n_jobs(self.n_jobs))
+
+    def build_model(self, model_class):
         model_params = {}
-        if 'random_state' in inspect.signature(model_class).parameters:
+        parameters = inspect.signature(model_class).parameters
+        if 'random_state' in parameters:
             model_params['random_state'] = self.random_state
+        if 'n_threads' in parameters:
+            model_params['n_threads'] = self.threads_per_worker()
 
-        model_instance = model_class(**model_params)
+        return model_class(**model_params)
 
-        preprocessor = ColumnTransformer(transformers=[
+    def build_preprocessor(self):
+        return ColumnTransformer(transformers=[
             ('target_enc', TargetEncoder(cols=self.cat_cols['cat_cols_target']), self.cat_cols['cat_cols_target']),
             ('ordinal_enc', OrdinalEncoder(), self.cat_cols['cat_cols_ordinal'])
         ])
 
-        pipeline = Pipeline([
-            ('preprocessor', preprocessor),
+    def build_pipeline(self, model_instance, memory=None):
+        return Pipeline([
+            ('preprocessor', self.build_preprocessor()),
             ('model', model_instance)
-        ])
-        
-        grid_search = GridSearchCV(
-            estimator=pipeline,
-            param_grid=param_grid,
-            cv=self.cv,
-            scoring=self.scoring,
-            n_jobs=-1,
-            verbose=1
-        )
+        ], memory=memory)
 
-        grid_search.fit(self.X_train, self.y_train)
+    def encoded_folds(self):
+        """The EncodedFolds of the training set, computed on first use and shared by all searches"""
+        if self._encoded_folds is None:
+            cv = check_cv(self.cv, self.y_train, classifier=False)
+            self._encoded_folds = EncodedFolds(self.build_preprocessor(), self.X_train, self.y_train, cv)
+            print(f"Encoded {len(self._encoded_folds.splits)} folds in {self._encoded_folds.seconds:.2f}s "
+                  f"({self._encoded_folds.X.nbytes / 2 ** 20:.1f} MiB)")
+        return self._encoded_folds
 
-        # Best model
-        best_model = grid_search.best_estimator_
+    def halving_resource(self, param_grid):
+        """The halving budget of a family: the first of HALVING_RESOURCES in its grid, else 'n_samples'"""
+        return next((r for r in HALVING_RESOURCES if r in param_grid), 'n_samples')
+
+    def uses_fold_cache(self, param_grid):
+        """
+        Whether the search of a family runs over the encoded folds
+
+        Not for halving on 'n_samples': the stacked folds would make the
+        sample budget count every fold's rows, and the encoders would have
+        seen all of a fold's training rows while the model sees a subsample.
+        """
+        return self.fold_cache and not (self.search_strategy == 'halving'
+                                         and self.halving_resource(param_grid) == 'n_samples')
+
+    def search_inputs(self, model_instance, memory=None, fold_cache=None):
+        """
+        The estimator, X, y and cv to search with: a model-only pipeline
+        over the encoded folds with fold_cache (default self.fold_cache),
+        the full pipeline over the training set otherwise
+        """
+        if self.fold_cache if fold_cache is None else fold_cache:
+            folds = self.encoded_folds()
+            return Pipeline([('model', model_instance)]), folds.X, folds.y, folds.splits
+        return self.build_pipeline(model_instance, memory=memory), self.X_train, self.y_train, self.cv
 
-        y_pred = best_model.predict(self.X_test)
+    def refit_best(self, model_class, best_params):
+        """The full pipeline with best_params, encoders included, fitted on the whole training set"""
+        best_model = self.build_pipeline(self.build_model(model_class))
+        best_model.set_params(**best_params)
+        if 'n_threads' in best_model.named_steps['model'].get_params():
+            # The refit runs alone, and the saved model should not carry the search workers' thread limit
+            best_model.set_params(model__n_threads=None)
+        return best_model.fit(self.X_train, self.y_train)
+
+    def evaluate(self, model):
+        y_pred = model.predict(self.X_test)
         test_r2 = r2_score(self.y_test, y_pred)
         test_rmse = np.sqrt(mean_squared_error(self.y_test, y_pred))
+        return test_r2, test_rmse
+
+    def make_search(self, pipeline, param_grid, cv=None):
+        """
+        Build the hyperparameter search for one model family
+
+        'grid' tries every combination, 'random' samples n_iter of them and
+        'halving' runs successive halving: all candidates start on a small
+        budget and only the best 1/halving_factor move on to a larger one.
+        The budget is n_estimators for forests and boosting, epochs for
+        SimpleNNRegressor and the number of training samples otherwise.
+        """
+        # The winner is refit by refit_best(), since the search may run over encoded folds
+        common = dict(cv=self.cv if cv is None else cv, scoring=self.scoring, n_jobs=self.n_jobs, verbose=1,
+                      refit=False)
+
+        if self.search_strategy == 'random':
+            n_candidates = int(np.prod([len(values) for values in param_grid.values()]))
+            return RandomizedSearchCV(
+                estimator=pipeline,
+                param_distributions=param_grid,
+                n_iter=min(self.n_iter, n_candidates),
+                random_state=self.random_state,
+                **common
+            )
+
+        if self.search_strategy == 'halving':
+            from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+            from sklearn.model_selection import HalvingGridSearchCV
+
+            resource = self.halving_resource(param_grid)
+            halving_params = {'resource': resource, 'factor': self.halving_factor, 'min_resources': 'exhaust'}
+            if resource != 'n_samples':
+                # The resource is driven by the search, so it leaves the grid; its largest value is the full budget
+                halving_params['max_resources'] = max(param_grid[resource])
+                param_grid = {k: v for k, v in param_grid.items() if k != resource}
+            return HalvingGridSearchCV(
+                estimator=pipeline,
+                param_grid=param_grid,
+                random_state=self.random_state,
+                **halving_params,
+                **common
+            )
+
+        return GridSearchCV(estimator=pipeline, param_grid=param_grid, **common)
+
+    def tune_model_with_gridsearch(self, model_class, param_grid):
+        pipeline, X, y, cv = self.search_inputs(self.build_model(model_class),
+                                                fold_cache=self.uses_fold_cache(param_grid))
+        
+        grid_search = self.make_search(pipeline, param_grid, cv=cv)
+
+        start = time.perf_counter()
+        grid_search.fit(X, y)
+        print(f"Searched {len(grid_search.cv_results_['params'])} {model_class.__name__} candidates "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        # Best model
+        best_model = self.refit_best(model_class, grid_search.best_params_)
+
+        test_r2, test_rmse = self.evaluate(best_model)
 
         print("Best Parameters:", grid_search.best_params_)
         print("Best CV R² Score:", grid_search.best_score_)
@@ -67,12 +239,96 @@ class Training:
             "test_rmse": test_rmse
         }
 
-    def tune_multiple_models_with_gridsearch(self, model_param_list):
+    def tune_models_in_single_search(self, model_param_list):
+        """
+        Tune all model families in one GridSearchCV
+
+        Every family's candidates are scheduled together in one worker
+        pool instead of one family at a time, and the pipeline caches its
+        fitted preprocessor, so the TargetEncoder/OrdinalEncoder is fitted
+        once per fold rather than once per candidate and fold. Scores are
+        the same as tuning each family separately, since all families
+        share the same CV splits. With fold_cache the search runs over the
+        encoded folds, so no preprocessor is fitted per candidate at all.
+
+        Returns:
+            One result per family, in the format of tune_model_with_gridsearch,
+            plus the wall-clock time of every candidate under 'candidates'
+        """
+        param_grid = [
+            {'model': [self.build_model(model_class)], **grid}
+            for model_class, grid in model_param_list
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            memory = None if self.fold_cache else Memory(location=self.cache_dir or tmp_dir, verbose=0)
+            pipeline, X, y, cv = self.search_inputs(param_grid[0]['model'][0], memory=memory)
+            grid_search = GridSearchCV(
+                estimator=pipeline,
+                param_grid=param_grid,
+                cv=cv,
+                scoring=self.scoring,
+                n_jobs=self.n_jobs,
+                verbose=1,
+                refit=False
+            )
+            start = time.perf_counter()
+            grid_search.fit(X, y)
+            print(f"Searched {len(grid_search.cv_results_['params'])} candidates in {time.perf_counter() - start:.1f}s")
+
+        cv_results = grid_search.cv_results_
+        n_splits = grid_search.n_splits_
+        candidates = []
+        for i, params in enumerate(cv_results['params']):
+            candidates.append({
+                'model_class': type(params['model']),
+                'params': {k: v for k, v in params.items() if k != 'model'},
+                'cv_score': cv_results['mean_test_score'][i],
+                'seconds': (cv_results['mean_fit_time'][i] + cv_results['mean_score_time'][i]) * n_splits,
+            })
+
+        print(f"{'Model':<28} {'CV R²':>8} {'Seconds':>8}  Parameters")
+        for candidate in sorted(candidates, key=lambda c: c['seconds'], reverse=True):
+            print(f"{candidate['model_class'].__name__:<28} {candidate['cv_score']:>8.4f} "
+                  f"{candidate['seconds']:>8.2f}  {candidate['params']}")
+
         results = []
+        for model_class, _ in model_param_list:
+            family = [c for c in candidates if c['model_class'] is model_class]
+            best = max(family, key=lambda c: c['cv_score'])
+
+            # Refit the family winner on the full training set, without the fold cache
+            best_model = self.refit_best(model_class, best['params'])
+            test_r2, test_rmse = self.evaluate(best_model)
+
+            print(f"--- {model_class.__name__} ---")
+            print("Best Parameters:", best['params'])
+            print("Best CV R² Score:", best['cv_score'])
+            print("Test R² Score:", test_r2)
+            print("Test RMSE:", test_rmse)
+
+            results.append({
+                "model_class": model_class,
+                "best_model": best_model,
+                "best_params": best['params'],
+                "cv_score": best['cv_score'],
+                "test_r2": test_r2,
+                "test_rmse": test_rmse,
+                "candidates": family
+            })
+
+        return results
+
+    def tune_multiple_models_with_gridsearch(self, model_param_list, single_search=False):
+        # The single search is an exhaustive grid; other strategies tune family by family
+        if single_search and self.search_strategy == 'grid':
+            results = self.tune_models_in_single_search(model_param_list)
+        else:
+            results = []
 
-        for model_class, param_grid in model_param_list:
-            result = self.tune_model_with_gridsearch(model_class, param_grid)
-            results.append(result)
+            for model_class, param_grid in model_param_list:
+                result = self.tune_model_with_gridsearch(model_class, param_grid)
+                results.append(result)
 
         best_result = max(results, key=lambda x: x['cv_score'])
         print("=== Best Overall Model ===")
@@ -1,16 +1,225 @@
-import joblib
+import copy
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import platform
+import sys
+import sysconfig
+import types
+from datetime import datetime
 
+MANIFEST_VERSION = 1
 
-def save_model(best_model, filename='best_model.pkl'):
+_STDLIB_DIR = os.path.realpath(sysconfig.get_paths()['stdlib'])
+
+
+def _artifact_path(filename, suffix):
+    return os.path.splitext(filename)[0] + suffix
+
+
+def torchscript_path(filename):
+    """Path of the TorchScript module exported next to a model pickle"""
+    return _artifact_path(filename, '.pt')
+
+
+def manifest_path(filename):
+    """Path of the JSON manifest written next to a model pickle"""
+    return _artifact_path(filename, '.json')
+
+
+def serving_path(filename):
+    """Path of the memory-mappable serving copy written next to a model pickle"""
+    return _artifact_path(filename, '.serving.pkl')
+
+
+def read_manifest(filename):
+    """The manifest of a model pickle as a dict, or None if it has none"""
+    path = manifest_path(filename)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return {'bytes': os.path.getsize(path), 'sha256': digest.hexdigest()}
+
+
+def _library_versions():
+    versions = {'python': platform.python_version()}
+    for module in ('numpy', 'pandas', 'sklearn', 'category_encoders', 'joblib', 'torch'):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            pass
+    return versions
+
+
+class _ModuleRecorder(pickle.Pickler):
+    """Pickles an object to nowhere, recording the modules of the classes and functions it refers to"""
+
+    class _Discard:
+        def write(self, data):
+            return len(data)
+
+    def __init__(self):
+        # Array buffers are handed to buffer_callback instead of being copied into the stream
+        super().__init__(self._Discard(), protocol=5, buffer_callback=lambda buffer: None)
+        self.modules = set()
+
+    def reducer_override(self, obj):
+        if isinstance(obj, (type, types.FunctionType, types.BuiltinFunctionType)) and obj.__module__:
+            self.modules.add(obj.__module__)
+        return NotImplemented
+
+
+def _is_stdlib(package):
+    path = getattr(sys.modules.get(package), '__file__', None)
+    if path is None:
+        return True
+    path = os.path.realpath(path)
+    return path.startswith(_STDLIB_DIR + os.sep) and not any(
+        part in ('site-packages', 'dist-packages') for part in path.split(os.sep))
+
+
+def runtime_dependencies(model):
+    """
+    The packages that unpickling model imports, outside the standard library
+
+    Returns:
+        {top-level package: version}, with a None version for modules of
+        this repository (flat_forest, simple_nn_regressor)
+    """
+    recorder = _ModuleRecorder()
+    recorder.dump(model)
+    packages = sorted({module.split('.')[0] for module in recorder.modules})
+    return {package: getattr(sys.modules.get(package), '__version__', None)
+            for package in packages if not _is_stdlib(package)}
+
+
+def check_runtime_dependencies(dependencies):
+    """
+    Check the runtime_dependencies of an artifact against this environment,
+    without importing them
+
+    Returns:
+        (packages that cannot be imported, {package: (recorded, installed)}
+        for already imported packages whose version differs)
+    """
+    missing = [package for package in dependencies if importlib.util.find_spec(package) is None]
+    mismatched = {}
+    for package, version in dependencies.items():
+        installed = getattr(sys.modules.get(package), '__version__', None)
+        if version and installed and installed != version:
+            mismatched[package] = (version, installed)
+    return missing, mismatched
+
+
+def _dump(value, path, compress):
+    import joblib
+
+    # Write to a new file and rename it into place: serving processes may have the old one memory-mapped
+    temporary_path = path + '.tmp'
+    joblib.dump(value, temporary_path, compress=compress)
+    os.replace(temporary_path, path)
+
+
+def build_serving_model(best_model):
+    """
+    Copy of a pipeline whose forest is replaced by a FlatForestRegressor,
+    or None if its final estimator cannot be flattened
+    """
+    from flat_forest import FLATTENABLE_FORESTS, FlatForestRegressor
+
+    if not hasattr(best_model, 'steps'):
+        return None
+    name, final_estimator = best_model.steps[-1]
+    if type(final_estimator).__name__ not in FLATTENABLE_FORESTS or final_estimator.n_outputs_ != 1:
+        return None
+
+    serving_model = copy.copy(best_model)
+    serving_model.steps = best_model.steps[:-1] + [(name, FlatForestRegressor.from_forest(final_estimator))]
+    return serving_model
+
+
+def write_manifest(best_model, filename, compress, extra_files, dependencies=None):
+    final_estimator = best_model.steps[-1][1] if hasattr(best_model, 'steps') else best_model
+    feature_names = getattr(best_model, 'feature_names_in_', None)
+    manifest = {
+        'format_version': MANIFEST_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'model_file': os.path.basename(filename),
+        'compress': compress,
+        'serving_file': None,
+        'torchscript_file': None,
+        'model_class': type(final_estimator).__name__,
+        'pipeline_steps': [name for name, _ in best_model.steps] if hasattr(best_model, 'steps') else [],
+        'feature_names': list(feature_names) if feature_names is not None else [],
+        'training_metrics': getattr(best_model, 'training_metrics_', None),
+        'versions': _library_versions(),
+        'files': {},
+    }
+    for key, path in [('model_file', filename)] + extra_files:
+        manifest[key] = os.path.basename(path)
+        manifest['files'][os.path.basename(path)] = _file_digest(path)
+    for name, packages in (dependencies or {}).items():
+        manifest['files'][name]['runtime_dependencies'] = packages
+
+    # The manifest is written last and renamed into place, so a reader sees it complete and its files present
+    with open(manifest_path(filename) + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, default=str)
+    os.replace(manifest_path(filename) + '.tmp', manifest_path(filename))
+    return manifest
+
+
+def save_model(best_model, filename='best_model.pkl', compress=0, serving_artifact=True):
     """
     Save the trained model to a pickle file
     
+    If the final estimator can export a frozen TorchScript module
+    (SimpleNNRegressor), it is written next to the pickle as <name>.pt.
+    A random forest is also written as <name>.serving.pkl, with its trees
+    flattened into plain arrays (FlatForestRegressor) that predict.load_model
+    memory-maps. <name>.json records the artifact files, model class,
+    feature names, training metrics and library versions, and for each
+    pickle the packages unpickling it imports (runtime_dependencies).
+
     Args:
         best_model: The trained model to save
         filename: Name of the file to save the model to
+        compress: joblib compression level (0-9). Only uncompressed
+            artifacts can be memory-mapped when loaded.
+        serving_artifact: Write the flattened forest copy when possible
     """
-    joblib.dump(best_model, filename)
+    _dump(best_model, filename, compress)
     print(f"Model saved to {filename}")
+    dependencies = {os.path.basename(filename): runtime_dependencies(best_model)}
+
+    extra_files = []
+    final_estimator = best_model.steps[-1][1] if hasattr(best_model, 'steps') else best_model
+    if hasattr(final_estimator, 'export_torchscript'):
+        final_estimator.export_torchscript(torchscript_path(filename))
+        print(f"TorchScript module saved to {torchscript_path(filename)}")
+        extra_files.append(('torchscript_file', torchscript_path(filename)))
+
+    serving_model = build_serving_model(best_model) if serving_artifact else None
+    if serving_model is not None:
+        _dump(serving_model, serving_path(filename), compress)
+        print(f"Memory-mappable serving model saved to {serving_path(filename)}")
+        extra_files.append(('serving_file', serving_path(filename)))
+        dependencies[os.path.basename(serving_path(filename))] = runtime_dependencies(serving_model)
+    elif os.path.exists(serving_path(filename)):
+        # Do not leave a serving copy of a previous model next to this one
+        os.remove(serving_path(filename))
+
+    write_manifest(best_model, filename, compress, extra_files, dependencies)
+    print(f"Manifest saved to {manifest_path(filename)}")
 
 
 def load_model(filename='best_model.pkl'):
@@ -23,6 +232,8 @@ def load_model(filename='best_model.pkl'):
     Returns:
         The loaded model
     """
+    import joblib
+
     model = joblib.load(filename)
     print(f"Model loaded from {filename}")
     return model
\ No newline at end of file
@@ -0,0 +1,119 @@
+import os
+import threading
+from datetime import datetime
+import logging
+
+from predict import load_model
+from model.utils import read_manifest
+from fast_scoring import get_compiled_scorer
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_model_path(model_path, model_dir):
+    """
+    model_path (relative paths are taken from model_dir) with symlinks
+    resolved, or None if it lies outside model_dir
+
+    Unpickling runs arbitrary code, so models loaded on request must come
+    from a directory only deployments write to.
+    """
+    model_dir = os.path.realpath(model_dir)
+    path = os.path.realpath(os.path.join(model_dir, model_path))
+    return path if os.path.commonpath([path, model_dir]) == model_dir else None
+
+
+def describe_model(model, model_path):
+    """Build the model_info dict reported by /model/info and /health"""
+    # Imported once a model is loaded, when unpickling it has already imported sklearn
+    from sklearn.base import is_classifier, is_regressor
+
+    info = {
+        'loaded': True,
+        'model_type': 'unknown',
+        'features': [],
+        'last_loaded': datetime.now().isoformat(),
+        'model_path': os.path.abspath(model_path),
+        'estimator': type(model).__name__,
+    }
+
+    # Try to get feature names if available
+    if hasattr(model, 'feature_names_in_'):
+        info['features'] = model.feature_names_in_.tolist()
+
+    # Determine model type from the final estimator of a pipeline
+    final_estimator = model.steps[-1][1] if hasattr(model, 'steps') else model
+    info['estimator'] = type(final_estimator).__name__
+    if is_regressor(final_estimator):
+        info['model_type'] = 'regression'
+    elif is_classifier(final_estimator):
+        info['model_type'] = 'classification'
+
+    manifest = read_manifest(model_path)
+    if manifest:
+        info['model_class'] = manifest.get('model_class')
+        info['training_metrics'] = manifest.get('training_metrics')
+
+    return info
+
+
+class ModelRegistry:
+    """
+    Process-wide holder for the serving model.
+
+    The model is deserialized once and kept resident; callers take a
+    snapshot with current() and use it for the whole request. load()
+    swaps the (model, info) pair in a single assignment, so readers never
+    block on a reload and in-flight requests keep scoring with the model
+    they started with. The lock only serializes concurrent loads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entry = (None, {
+            'loaded': False,
+            'model_type': None,
+            'features': [],
+            'last_loaded': None
+        })
+
+    def current(self):
+        """Return the (model, model_info) pair currently being served"""
+        return self._entry
+
+    @property
+    def model(self):
+        return self._entry[0]
+
+    @property
+    def info(self):
+        return self._entry[1]
+
+    def load(self, model_path):
+        """
+        Load a model from file and make it the one being served
+
+        Args:
+            model_path: Path to the joblib pickle of the trained pipeline
+
+        Returns:
+            The (model, model_info) pair now being served
+
+        Raises:
+            FileNotFoundError: If model_path does not exist
+        """
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Model file not found: {model_path}")
+
+        with self._lock:
+            new_model = load_model(model_path)
+            new_info = describe_model(new_model, model_path)
+            # Compile the pandas-free scorer up front instead of on the first request
+            new_info['fast_path'] = get_compiled_scorer(new_model) is not None
+            self._entry = (new_model, new_info)
+
+        logger.info(f"Model loaded successfully: {new_info['estimator']} from {model_path}")
+        return self._entry
+
+
+registry = ModelRegistry()
@@ -0,0 +1,206 @@
+"""
+Request and response body formats of /predict.
+
+The request's Content-Type picks how the body is read:
+
+    application/json                     {"data": [{...}, ...]} (records) or
+                                         {"data": {"COL": [...], ...}} (columns)
+    application/vnd.apache.arrow.stream  Arrow IPC stream of the input table
+    application/vnd.apache.arrow.file    Arrow IPC file of the input table
+    application/vnd.apache.parquet       Parquet file of the input table
+
+Predictions are returned in the format named by the Accept header, or in
+the request's format if Accept does not name one. Binary responses hold a
+single PREDICTED_UNITS column; JSON responses are {"predictions": [...]}.
+Arrow and Parquet require pyarrow.
+
+With ?intervals=true (and optionally &quantiles=0.05,0.95), JSON responses
+add "quantiles", "intervals" (one list of quantile values per row) and
+"interval_method"; binary responses add one PREDICTED_UNITS_Q<percent>
+column per quantile.
+"""
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+JSON = 'application/json'
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+ARROW_FILE = 'application/vnd.apache.arrow.file'
+PARQUET = 'application/vnd.apache.parquet'
+FORMATS = (JSON, ARROW_STREAM, ARROW_FILE, PARQUET)
+
+PREDICTION_COL = 'PREDICTED_UNITS'
+
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+class PayloadError(ValueError):
+    """A request body that cannot be read; status_code is the HTTP status to answer with"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise PayloadError("Arrow and Parquet payloads require pyarrow on the server", status_code=415)
+    return pa
+
+
+def media_type(content_type):
+    """The bare media type of a Content-Type header value, lowercased"""
+    return (content_type or '').split(';')[0].strip().lower()
+
+
+def request_format(content_type):
+    """The format of a request body; raises PayloadError (415) for unsupported types"""
+    fmt = media_type(content_type) or JSON
+    if fmt not in FORMATS:
+        raise PayloadError(f"Unsupported Content-Type {fmt!r}; use one of {', '.join(FORMATS)}", status_code=415)
+    return fmt
+
+
+def response_format(accept, request_fmt):
+    """The first supported format named in an Accept header, else the request's format"""
+    for part in (accept or '').split(','):
+        if media_type(part) in FORMATS:
+            return media_type(part)
+    return request_fmt
+
+
+def interval_options(args, default_quantiles):
+    """
+    (intervals, quantiles) from a request's query parameters
+
+    Raises:
+        PayloadError: If quantiles are not numbers strictly between 0 and 1
+    """
+    intervals = (args.get('intervals') or '').lower() in TRUE_VALUES
+    quantiles = default_quantiles
+    if args.get('quantiles'):
+        try:
+            quantiles = tuple(float(q) for q in args['quantiles'].split(','))
+        except ValueError:
+            quantiles = ()
+        if not quantiles or not all(0 < q < 1 for q in quantiles):
+            raise PayloadError('quantiles must be comma-separated numbers between 0 and 1, e.g. 0.05,0.95')
+    return intervals, quantiles
+
+
+def quantile_column(quantile):
+    """Column of a binary response holding the given quantile, e.g. PREDICTED_UNITS_Q5 for 0.05"""
+    return f"{PREDICTION_COL}_Q{quantile * 100:g}"
+
+
+def json_input(request_data):
+    """
+    The rows of a parsed JSON body: the records list as posted, or a
+    DataFrame when data is column-oriented
+
+    Raises:
+        PayloadError: If there is no data, or the columns differ in length
+    """
+    if not isinstance(request_data, dict) or 'data' not in request_data:
+        raise PayloadError('No data provided')
+    data = request_data['data']
+    if not data:
+        raise PayloadError('Empty data provided')
+    if isinstance(data, dict):
+        try:
+            return pd.DataFrame(data)
+        except ValueError as e:
+            raise PayloadError(f"Invalid column-oriented data: {e}")
+    return data
+
+
+def _read_table(body, fmt):
+    pa = _pyarrow()
+    if fmt == ARROW_STREAM:
+        return pa.ipc.open_stream(body).read_all()
+    if fmt == ARROW_FILE:
+        return pa.ipc.open_file(pa.py_buffer(body)).read_all()
+    return pa.parquet.read_table(pa.BufferReader(body))
+
+
+def _write_table(table, fmt):
+    pa = _pyarrow()
+    sink = io.BytesIO()
+    if fmt == ARROW_STREAM:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    elif fmt == ARROW_FILE:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pa.parquet.write_table(table, sink)
+    return sink.getvalue()
+
+
+def read_body(body, fmt):
+    """
+    The rows of a request body in the given format: a list of records or a
+    DataFrame for JSON (see json_input), a DataFrame otherwise
+
+    Raises:
+        PayloadError: If the body cannot be parsed or holds no rows
+    """
+    if fmt == JSON:
+        try:
+            request_data = json.loads(body)
+        except ValueError:
+            raise PayloadError('No data provided')
+        return json_input(request_data)
+
+    pa = _pyarrow()
+    try:
+        table = _read_table(body, fmt)
+    except pa.ArrowException as e:
+        raise PayloadError(f"Could not read {fmt} body: {e}")
+    if table.num_rows == 0:
+        raise PayloadError('Empty data provided')
+    return table.to_pandas()
+
+
+def prediction_response(predictions, intervals=None):
+    """
+    The JSON response body as a dict; intervals is the
+    (quantiles, bands, method) of an interval request
+    """
+    response = {'predictions': np.asarray(predictions, dtype=np.float64).tolist()}
+    if intervals is not None:
+        quantiles, bands, method = intervals
+        response.update({'quantiles': list(quantiles), 'intervals': np.asarray(bands).tolist(),
+                         'interval_method': method})
+    return response
+
+
+def write_predictions(predictions, fmt, intervals=None):
+    """Predictions (and the intervals of prediction_response) encoded as a response body in the given format"""
+    if fmt == JSON:
+        return json.dumps(prediction_response(predictions, intervals)).encode()
+    columns = {PREDICTION_COL: np.asarray(predictions, dtype=np.float64)}
+    if intervals is not None:
+        quantiles, bands, _ = intervals
+        for j, quantile in enumerate(quantiles):
+            columns[quantile_column(quantile)] = np.asarray(bands)[:, j]
+    return _write_table(_pyarrow().table(columns), fmt)
+
+
+def encode_frame(df, fmt):
+    """A request body holding df in the given format (for clients and benchmarks)"""
+    if fmt == JSON:
+        return json.dumps({'data': df.to_dict(orient='list')}).encode()
+    return _write_table(_pyarrow().Table.from_pandas(df, preserve_index=False), fmt)
+
+
+def read_predictions(body, fmt):
+    """The predictions in a response body (for clients and benchmarks)"""
+    if fmt == JSON:
+        return np.asarray(json.loads(body)['predictions'], dtype=np.float64)
+    return _read_table(body, fmt).column(PREDICTION_COL).to_numpy()
@@ -1,16 +1,99 @@
 
-from model.data_sourcing import DataSourcing
+import os
+import sys
+import logging
 from model.data_preprocessing import DataPreprocessing
 from model.feature_engineering import FeatureEngineering
-import joblib
+from model.utils import torchscript_path, read_manifest, check_runtime_dependencies
+from model.profiling import profiler, predict_in_stages
+from model.prediction_intervals import DEFAULT_QUANTILES, predict_quantiles
 
-def load_model(filename='best_model.pkl'):
+logger = logging.getLogger(__name__)
+
+# Training runs from model/ with flat imports, so pickles refer to classes such as
+# simple_nn_regressor.SimpleNNRegressor; make those modules resolvable here too
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model'))
+
+
+def load_model(filename='best_model.pkl', use_serving_artifact=True, mmap_mode='auto'):
+    """
+    Load a trained model saved by model.utils.save_model
+
+    Args:
+        filename: The model pickle
+        use_serving_artifact: Load the flattened-forest <name>.serving.pkl
+            listed in the manifest instead, if there is one. It predicts
+            small batches faster and its arrays are memory-mapped, so
+            processes serving the same file share them; the original
+            forest is faster on batches of many thousands of rows.
+        mmap_mode: Passed to joblib.load; 'auto' memory-maps ('r') when
+            the manifest says the artifact is uncompressed, and loads
+            pickles without a manifest as before
+
+    Raises:
+        ImportError: If the manifest lists runtime dependencies of the
+            artifact that are not installed
+    """
+    import joblib
+
+    manifest = read_manifest(filename)
+    path = filename
+    if use_serving_artifact and manifest and manifest.get('serving_file'):
+        candidate = os.path.join(os.path.dirname(filename), manifest['serving_file'])
+        if os.path.exists(candidate):
+            path = candidate
+    if mmap_mode == 'auto':
+        mmap_mode = 'r' if manifest and manifest.get('compress') == 0 else None
+
+    # Fail before unpickling anything if a package the artifact needs is missing
+    dependencies = (manifest or {}).get('files', {}).get(os.path.basename(path), {}).get('runtime_dependencies', {})
+    missing, _ = check_runtime_dependencies(dependencies)
+    if missing:
+        raise ImportError(f"{path} needs {', '.join(missing)}, which cannot be imported here")
+
+    loaded_model = joblib.load(path, mmap_mode=mmap_mode)
+    # Unpickling has imported the dependencies, so their versions are known without importing anything else
+    _, mismatched = check_runtime_dependencies(dependencies)
+    for package, (recorded, installed) in mismatched.items():
+        logger.warning(f"{path} was saved with {package} {recorded}; {installed} is installed")
+
+    # Swap in the frozen TorchScript module exported next to the pickle, if any
+    final_estimator = loaded_model.steps[-1][1] if hasattr(loaded_model, 'steps') else loaded_model
+    if hasattr(final_estimator, 'load_torchscript') and os.path.exists(torchscript_path(filename)):
+        final_estimator.load_torchscript(torchscript_path(filename))
 
-    loaded_model = joblib.load(filename)
     return loaded_model
 
 
-def pred(df_test, model=None):
+def prepare_features(df_test, model):
+    """
+    Run scoring preprocessing and feature engineering on raw input rows
+
+    Rows dropped by preprocessing (missing values) are absent from the
+    result; its index identifies the input rows that survived.
+    """
+    with profiler.stage('preprocessing', rows_in=len(df_test)) as stage:
+        df_test = DataPreprocessing(df_test).preprocessing_score()
+        stage.rows_out = len(df_test)
+    logger.debug("Data preprocessing for evaluation completed.")
+
+    with profiler.stage('feature_engineering', rows_in=len(df_test)) as stage:
+        # Models trained before feature_stats_ existed fall back to per-batch aggregates and string crosses
+        df_test = FeatureEngineering(getattr(model, 'feature_stats_', None), cross_codes=False).feature_engineering(df_test)
+        stage.rows_out = len(df_test)
+    logger.debug("Feature engineering completed.")
+
+    return df_test[model.feature_names_in_]
+
+
+def pred(df_test, model=None, intervals=False, quantiles=DEFAULT_QUANTILES):
+    """
+    Predictions for raw input rows
+
+    With intervals=True, returns (predictions, bands, method) instead, where
+    bands[i, j] is the quantiles[j] quantile for row i and method is how
+    they were computed (see model.prediction_intervals.predict_quantiles).
+    """
     if model is None:
         model = load_model()
 
@@ -18,13 +101,13 @@ def pred(df_test, model=None):
     # df_test = DataSourcing(file_path='synthetic_test_data.csv').read_data_local()
     # print("Data sourcing for evaluation completed.")
 
-    df_test = DataPreprocessing(df_test).preprocessing_score()   
-    print("Data preprocessing for evaluation completed.")
-
-    df_test = FeatureEngineering().feature_engineering(df_test)
-    print("Feature engineering completed.")
+    df_test = prepare_features(df_test, model)
+    if intervals:
+        with profiler.stage('predict_intervals', rows_in=len(df_test)) as stage:
+            predictions, bands, method = predict_quantiles(model, df_test, quantiles)
+            stage.rows_out = len(predictions)
+        return predictions, bands, method
 
-    df_test = df_test[model.feature_names_in_]
     # Use the model to predict
-    predictions = model.predict(df_test)  # X_new is your input features as a DataFrame or ndarray
-    return predictions
\ No newline at end of file
+    predictions = predict_in_stages(model, df_test, profiler)  # X_new is your input features as a DataFrame or ndarray
+    return predictions
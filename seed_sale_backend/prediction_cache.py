@@ -0,0 +1,207 @@
+import hashlib
+import math
+import sys
+import threading
+import time
+from collections import OrderedDict
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Marks a cached row that scoring preprocessing drops (it has missing values)
+_DROPPED = None
+
+
+def _canonical_value(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    # 1 and 1.0 score the same, so they share a cache entry
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def is_row_independent(model):
+    """
+    True if the model scores each row independently of the rest of its batch
+
+    That holds for models whose feature_stats_ carry the cross-feature
+    vocabularies: aggregates are looked up from the training table and
+    crosses are integer keys, so neither depends on what else is in the
+    request. Older models compute per-batch aggregates or format string
+    crosses from the batch's column dtypes, and are never cached.
+    """
+    feature_stats = getattr(model, 'feature_stats_', None)
+    return bool(feature_stats) and 'PRODUCT' in feature_stats
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of per-row predictions, with an optional TTL.
+
+    Rows are keyed by a hash of their canonicalized values. predict()
+    splits a request into hits and misses, scores only the distinct
+    misses through the regular scoring function, and merges the results
+    back in request order. Entries belong to one model: they are dropped
+    when a different model is seen or clear() is called on model load.
+    """
+
+    def __init__(self, max_entries=100000, ttl_seconds=None):
+        """
+        Args:
+            max_entries: Rows kept before the least recently used are evicted
+            ttl_seconds: Age after which an entry is no longer served (None: no expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._model = None
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._bypassed = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def row_keys(self, records):
+        """Cache key of each record, or None if the request cannot be served from the cache"""
+        if not records or not all(isinstance(record, dict) for record in records):
+            return None
+        columns = sorted(records[0].keys())
+        prefix = repr(columns).encode()
+
+        keys = []
+        for record in records:
+            # Records with differing keys would get NaN-filled columns in a shared frame
+            if len(record) != len(columns):
+                return None
+            try:
+                values = tuple(_canonical_value(record[col]) for col in columns)
+            except KeyError:
+                return None
+            if any(isinstance(value, (list, dict)) for value in values):
+                return None
+            keys.append(hashlib.blake2b(prefix + repr(values).encode(), digest_size=16).digest())
+        return keys
+
+    def predict(self, model, records, score):
+        """
+        Predictions for records, scoring only rows that are not cached
+
+        Args:
+            model: The model snapshot of this request
+            records: List of dict rows, as posted to /predict
+            score: score(model, records) -> predictions for the rows that
+                survive preprocessing, in order; called with the misses
+
+        Returns:
+            NumPy array of predictions, one per row that survives
+            preprocessing, as score(model, records) would return
+        """
+        keys = self.row_keys(records) if is_row_independent(model) else None
+        if keys is None:
+            with self._lock:
+                self._bypassed += 1
+            return score(model, records)
+
+        now = time.monotonic()
+        cached = {}
+        with self._lock:
+            if self._model is not model:
+                self._reset(model)
+            for key in set(keys):
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                value, expires_at = entry
+                if expires_at is not None and expires_at <= now:
+                    self._remove(key)
+                    self._expirations += 1
+                    continue
+                self._entries.move_to_end(key)
+                cached[key] = value
+
+        # Score each distinct missing row once, even if it repeats within the request
+        miss_positions = {}
+        for i, key in enumerate(keys):
+            if key not in cached and key not in miss_positions:
+                miss_positions[key] = i
+
+        if miss_positions:
+            miss_records = [records[i] for i in miss_positions.values()]
+            miss_values = self._score_misses(model, miss_records, score)
+            scored = dict(zip(miss_positions, miss_values))
+            self._store(model, scored, now)
+            cached.update(scored)
+
+        with self._lock:
+            self._hits += len(keys) - len(miss_positions)
+            self._misses += len(miss_positions)
+
+        return np.array([cached[key] for key in keys if cached[key] is not _DROPPED], dtype=np.float64)
+
+    @staticmethod
+    def _score_misses(model, records, score):
+        # Scoring drops rows with a missing value; line the predictions back up with the rows
+        survives = [all(_canonical_value(value) is not None for value in record.values()) for record in records]
+        predictions = np.atleast_1d(score(model, records))
+        if len(predictions) != sum(survives):
+            raise ValueError(f"Expected {sum(survives)} predictions for {len(records)} rows, got {len(predictions)}")
+
+        values = iter(predictions.tolist())
+        return [next(values) if survived else _DROPPED for survived in survives]
+
+    def _store(self, model, scored, now):
+        expires_at = now + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            # A model load while the misses were being scored makes them stale
+            if self._model is not model:
+                return
+            for key, value in scored.items():
+                if key in self._entries:
+                    self._remove(key)
+                self._entries[key] = (value, expires_at)
+                self._bytes += self._entry_bytes(key, value)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    @staticmethod
+    def _entry_bytes(key, value):
+        # Key, value and the (value, expires_at) tuple; the dict's own table is added in stats()
+        return sys.getsizeof(key) + sys.getsizeof(value) + 56
+
+    def _remove(self, key):
+        value, _ = self._entries.pop(key)
+        self._bytes -= self._entry_bytes(key, value)
+
+    def _reset(self, model):
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._model = model
+
+    def clear(self, model=None):
+        """Drop every entry, e.g. after loading a new model"""
+        with self._lock:
+            self._reset(model)
+
+    def stats(self):
+        """Hit ratio, size and approximate memory use of the cache"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': self._hits / lookups if lookups else 0.0,
+                'bypassed_requests': self._bypassed,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'memory_bytes': self._bytes + sys.getsizeof(self._entries),
+            }
@@ -0,0 +1,130 @@
+"""
+What-if scoring of one record over a grid of varied fields (/predict/scenarios).
+
+A request holds a base record and, under "vary", the values to try for
+some of its fields, as a list or as a {"start", "stop", "step"} range
+(stop excluded, as in numpy.arange):
+
+    {"base": {"PRODUCT": "P1", "STATE": "IA", "SALESYEAR": 2024, ...},
+     "vary": {"STATE": ["IA", "IL", "NE"], "SALESYEAR": {"start": 2024, "stop": 2028}}}
+
+Every combination of the varied values is scored, in one batch, and the
+predictions come back as a matrix with one axis per varied field, in the
+order of "vary":
+
+    {"axes": [{"field": "STATE", "values": [...]}, {"field": "SALESYEAR", "values": [...]}],
+     "shape": [3, 4], "predictions": [[...], [...], [...]]}
+
+Scenarios that preprocessing drops (missing values) are null.
+"""
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from fast_scoring import REQUIRED_COLUMNS
+from payload_formats import PayloadError
+from predict import prepare_features
+from model.profiling import profiler, predict_in_stages
+
+# Largest grid one request may expand to
+SCENARIO_MAX_ROWS = int(os.environ.get('SCENARIO_MAX_ROWS', '100000'))
+
+SCENARIO_FIELDS = REQUIRED_COLUMNS + ['SALESYEAR']
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def axis_values(field, spec, max_rows):
+    """
+    The values of one varied field: a non-empty list of all strings or all
+    numbers, or a start/stop/step range of finite numbers
+    """
+    error = PayloadError(f"vary.{field} must be a list of strings, a list of numbers "
+                         f"or a {{start, stop, step}} range of finite numbers")
+    if isinstance(spec, dict):
+        start, stop, step = spec.get('start'), spec.get('stop'), spec.get('step', 1)
+        if not all(_is_number(value) and math.isfinite(value) for value in (start, stop, step)) or step == 0:
+            raise error
+        # Checked before numpy allocates the range
+        if math.ceil((stop - start) / step) > max_rows:
+            raise PayloadError(f"vary.{field} has more than {max_rows:,} values", status_code=413)
+        values = np.arange(start, stop, step)
+    # np.asarray would turn the numbers of a mixed list into strings
+    elif isinstance(spec, list) and (all(isinstance(value, str) for value in spec)
+                                     or all(_is_number(value) for value in spec)):
+        values = np.asarray(spec)
+    else:
+        raise error
+    if len(values) == 0:
+        raise PayloadError(f"vary.{field} has no values")
+    return values
+
+
+def expand_scenarios(request_data, max_rows=None):
+    """
+    The rows of every scenario of a /predict/scenarios request, and its axes
+
+    The grid is expanded in C order (the last varied field changes
+    fastest), so the predictions reshape to one axis per varied field.
+
+    Returns:
+        (DataFrame with one row per scenario, [(field, values), ...])
+
+    Raises:
+        PayloadError: If the request is malformed, names unknown fields,
+            leaves required fields out of both base and vary, or expands to more than max_rows (default SCENARIO_MAX_ROWS) scenarios
+    """
+    max_rows = SCENARIO_MAX_ROWS if max_rows is None else max_rows
+    if not isinstance(request_data, dict) or not isinstance(request_data.get('base'), dict):
+        raise PayloadError('A base record is required')
+    base, vary = request_data['base'], request_data.get('vary') or {}
+    if any(isinstance(value, (list, dict)) for value in base.values()):
+        raise PayloadError('base must be a single record; put the values to try under vary')
+    if not isinstance(vary, dict):
+        raise PayloadError('vary must map field names to values')
+    unknown = [field for field in vary if field not in SCENARIO_FIELDS]
+    if unknown:
+        raise PayloadError(f"Cannot vary {', '.join(unknown)}; fields are {', '.join(SCENARIO_FIELDS)}")
+    missing = [field for field in SCENARIO_FIELDS if field not in base and field not in vary]
+    if missing:
+        raise PayloadError(f"base or vary must give {', '.join(missing)}")
+
+    axes = [(field, axis_values(field, spec, max_rows)) for field, spec in vary.items()]
+    shape = tuple(len(values) for _, values in axes)
+    n_rows = int(np.prod(shape, dtype=np.int64))
+    if n_rows > max_rows:
+        raise PayloadError(f"{' x '.join(map(str, shape))} = {n_rows:,} scenarios exceeds the limit of {max_rows:,}",
+                           status_code=413)
+
+    columns = {field: value for field, value in base.items() if field not in vary}
+    # Position of every scenario along each axis, without materializing the grid row by row
+    positions = np.indices(shape).reshape(len(shape), n_rows)
+    for (field, values), position in zip(axes, positions):
+        columns[field] = values[position]
+    return pd.DataFrame(columns, index=pd.RangeIndex(n_rows)), axes
+
+
+def score_scenarios(current_model, df):
+    """Predictions for every scenario row, NaN where preprocessing dropped the row"""
+    predictions = np.full(len(df), np.nan)
+    with profiler.stage('scenarios', rows_in=len(df)) as stage:
+        features = prepare_features(df, current_model)
+        if len(features):
+            predictions[features.index.to_numpy()] = predict_in_stages(current_model, features, profiler)
+        stage.rows_out = len(features)
+    return predictions
+
+
+def scenario_response(predictions, axes):
+    """The JSON response of /predict/scenarios"""
+    matrix = predictions.astype(object)
+    matrix[np.isnan(predictions)] = None
+    return {
+        'axes': [{'field': field, 'values': values.tolist()} for field, values in axes],
+        'shape': [len(values) for _, values in axes],
+        'predictions': matrix.reshape([len(values) for _, values in axes]).tolist(),
+    }
@@ -0,0 +1,156 @@
+"""
+Production entry point: gunicorn with the model preloaded in the master.
+
+The master imports app.py, which loads the model, and freezes the garbage
+collector before forking the workers, so the model's pages stay shared
+copy-on-write between them instead of being copied as soon as the cyclic
+GC touches them. A memory-mapped serving artifact (see model.utils.save_model)
+is shared through the page cache on top of that.
+
+Reloading a model: send SIGHUP to the master (kill -HUP <pid>), or run with
+--watch-interval to have it reload whenever the model's files change. The
+master loads the new artifact, forks fresh workers from it and gracefully
+stops the old ones once their in-flight requests finish. If the new
+artifact fails to load, the workers keep serving the previous model.
+POST /model/load only swaps the model of the one worker that receives it.
+
+Usage (from seed_sale_backend/):
+    python serve.py --workers 4 --threads 2
+    python serve.py --bind 0.0.0.0:5001 --model-path best_model.pkl --watch-interval 10
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import threading
+import time
+
+from gunicorn.app.base import BaseApplication
+
+from model.utils import manifest_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'best_model.pkl')
+
+
+def _freeze_heap():
+    # Move everything allocated so far out of the collector's reach, so workers never write to those pages
+    gc.collect()
+    gc.freeze()
+
+
+def artifact_fingerprint(model_path):
+    """
+    (mtime, size) of the file written last when the model is saved: the
+    manifest if there is one, else the pickle; None if neither exists
+    """
+    for path in (manifest_path(model_path), model_path):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            return stat.st_mtime_ns, stat.st_size
+    return None
+
+
+class ArtifactWatcher:
+    """Sends SIGHUP to the master once the model's files have changed and stopped changing"""
+
+    def __init__(self, model_path, interval):
+        self.model_path = model_path
+        self.interval = interval
+        self.loaded = artifact_fingerprint(model_path)
+
+    def start(self):
+        threading.Thread(target=self._run, name='artifact-watcher', daemon=True).start()
+
+    def _run(self):
+        previous = self.loaded
+        while True:
+            time.sleep(self.interval)
+            current = artifact_fingerprint(self.model_path)
+            # Wait for one unchanged poll so a save in progress is not picked up half-written
+            if current is not None and current != self.loaded and current == previous:
+                logger.info(f"Model artifact {self.model_path} changed, reloading")
+                self.loaded = current
+                os.kill(os.getpid(), signal.SIGHUP)
+            previous = current
+
+
+class ModelServer(BaseApplication):
+    def __init__(self, model_path, options, watch_interval=0):
+        """
+        Args:
+            model_path: Model pickle saved by model.utils.save_model
+            options: gunicorn settings (bind, workers, threads, ...)
+            watch_interval: Seconds between checks of the model files (0: reload on SIGHUP only)
+        """
+        self.model_path = model_path
+        self.options = options
+        self.watch_interval = watch_interval
+        self.watcher = None
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+        self.cfg.set('preload_app', True)
+        self.cfg.set('on_reload', self.on_reload)
+        self.cfg.set('when_ready', self.when_ready)
+
+    def load(self):
+        # app.py loads the model from MODEL_PATH when it is imported
+        os.environ['MODEL_PATH'] = self.model_path
+        import app as app_module
+
+        if app_module.model is None:
+            raise RuntimeError(f"Could not load model from {self.model_path}")
+        self.app_module = app_module
+        _freeze_heap()
+        return app_module.app
+
+    def when_ready(self, server):
+        if self.watch_interval:
+            self.watcher = ArtifactWatcher(self.model_path, self.watch_interval)
+            self.watcher.start()
+
+    def on_reload(self, server):
+        # Runs in the master on SIGHUP, before the new workers are forked
+        gc.unfreeze()
+        if self.app_module.load_model(self.model_path):
+            server.log.info(f"Reloaded model {self.model_path}")
+        else:
+            server.log.error(f"Could not reload {self.model_path}; workers keep serving the previous model")
+        _freeze_heap()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bind', default=os.environ.get('SERVE_BIND', '0.0.0.0:5001'))
+    parser.add_argument('--model-path', default=os.environ.get('MODEL_PATH', DEFAULT_MODEL_PATH))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('SERVE_WORKERS', os.cpu_count() or 1)))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('SERVE_THREADS', '1')),
+                        help='Threads per worker; more than 1 uses the gthread worker')
+    parser.add_argument('--timeout', type=int, default=int(os.environ.get('SERVE_TIMEOUT', '30')),
+                        help='Seconds a worker may spend on one request before it is restarted')
+    parser.add_argument('--graceful-timeout', type=int, default=int(os.environ.get('SERVE_GRACEFUL_TIMEOUT', '30')),
+                        help='Seconds old workers get to finish in-flight requests on reload or shutdown')
+    parser.add_argument('--watch-interval', type=float, default=float(os.environ.get('MODEL_WATCH_INTERVAL', '0')),
+                        help='Seconds between checks of the model files for changes (0 disables)')
+    parser.add_argument('--access-log', action='store_true', help='Log every request to stdout')
+    args = parser.parse_args()
+
+    options = {
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'accesslog': '-' if args.access_log else None,
+    }
+    ModelServer(os.path.abspath(args.model_path), options, watch_interval=args.watch_interval).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Shared fixtures: small models trained on case_study_data.csv, saved with
+model.utils.save_model like the real pipeline does.
+
+Run from seed_sale_backend/:
+    python -m pytest tests
+"""
+import contextlib
+import io
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(BACKEND_DIR, 'model')
+DATA_PATH = os.path.join(MODEL_DIR, 'case_study_data.csv')
+
+sys.path.insert(0, BACKEND_DIR)
+# Same order as predict.py: serving modules first, the training modules' flat imports after
+sys.path.append(MODEL_DIR)
+# app.py loads MODEL_PATH when it is imported; tests load their own models
+os.environ.setdefault('MODEL_PATH', os.path.join(BACKEND_DIR, 'tests', 'no_model.pkl'))
+
+
+@pytest.fixture(scope='session')
+def raw_data():
+    """The case study data as sourced, without missing values"""
+    return pd.read_csv(DATA_PATH).dropna().reset_index(drop=True)
+
+
+@pytest.fixture(scope='session')
+def scoring_rows(raw_data):
+    """Raw rows to score, as posted to /predict"""
+    return raw_data.drop(columns=['UNITS']).head(40).reset_index(drop=True)
+
+
+@pytest.fixture(scope='session')
+def training_features(raw_data):
+    """(FeatureEngineering fitted on the training data, feature-engineered training data)"""
+    from data_preprocessing import DataPreprocessing
+    from feature_engineering import FeatureEngineering
+
+    # Preprocessing prints its progress
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = DataPreprocessing(raw_data.copy()).preprocessing_fit()
+        feature_engineering = FeatureEngineering()
+        df = feature_engineering.fit(df).transform(df)
+    return feature_engineering, df
+
+
+def train_pipeline(training_features, estimator):
+    """A full pipeline (encoders and estimator) fitted on the training features, as GetBestModel returns it"""
+    from get_best_model import GetBestModel
+    from training import Training
+
+    feature_engineering, df = training_features
+    X, y = df.drop(columns=['UNITS']), df['UNITS']
+    training = Training(X, y, X, y, GetBestModel(df).get_encoding_col())
+    pipeline = training.build_pipeline(estimator).fit(X, y)
+    pipeline.feature_stats_ = feature_engineering.state_stats
+    pipeline.training_metrics_ = {'model_class': type(estimator).__name__, 'best_params': {},
+                                  'cv_score': None, 'test_r2': 0.0, 'test_rmse': 0.0}
+    return pipeline
+
+
+@pytest.fixture(scope='session')
+def rf_model_path(training_features, tmp_path_factory):
+    """A random forest saved with its manifest and flattened serving artifact"""
+    from sklearn.ensemble import RandomForestRegressor
+    from model.utils import save_model
+
+    pipeline = train_pipeline(training_features, RandomForestRegressor(n_estimators=10, random_state=0))
+    path = str(tmp_path_factory.mktemp('rf') / 'best_model.pkl')
+    with contextlib.redirect_stdout(io.StringIO()):
+        save_model(pipeline, path)
+    return path
+
+
+@pytest.fixture
+def app_module(rf_model_path):
+    """app.py serving the random forest fixture"""
+    import app
+
+    assert app.load_model(rf_model_path)
+    return app
+
+
+@pytest.fixture(scope='session')
+def ridge_model(training_features):
+    """A second, different fitted pipeline, for tests that swap models"""
+    from sklearn.linear_model import Ridge
+
+    return train_pipeline(training_features, Ridge(alpha=1.0))
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def expected(rf_model_path, scoring_rows):
+    from predict import load_model, pred
+
+    return pred(scoring_rows.copy(), load_model(rf_model_path, use_serving_artifact=False))
+
+
+def test_health_reports_the_loaded_model(client):
+    assert client.get('/health').get_json()['model_loaded'] is True
+
+
+@pytest.mark.parametrize('layout', ['records', 'list'])
+def test_predict_serves_the_default_artifact(client, app_module, scoring_rows, expected, layout):
+    # The registry loads the flattened serving artifact by default
+    assert type(app_module.model.steps[-1][1]).__name__ == 'FlatForestRegressor'
+
+    response = client.post('/predict', json={'data': scoring_rows.to_dict(layout)})
+    assert response.status_code == 200, response.get_json()
+    np.testing.assert_allclose(response.get_json()['predictions'], expected)
+
+
+def test_predict_above_the_fast_path_limit(client, app_module, scoring_rows, expected, monkeypatch):
+    monkeypatch.setattr(app_module, 'FAST_PATH_MAX_ROWS', 0)
+    response = client.post('/predict', json={'data': scoring_rows.to_dict('records')})
+    assert response.status_code == 200, response.get_json()
+    np.testing.assert_allclose(response.get_json()['predictions'], expected)
+
+
+def test_predict_without_data_is_a_client_error(client):
+    assert client.post('/predict', json={}).status_code == 400
+
+
+def test_predict_through_the_coalescer(client, app_module, scoring_rows, expected, monkeypatch):
+    from coalescer import PredictionCoalescer
+
+    monkeypatch.setattr(app_module, 'FAST_PATH_MAX_ROWS', 0)
+    monkeypatch.setattr(app_module, 'coalescer', PredictionCoalescer(max_wait_ms=1))
+    response = client.post('/predict', json={'data': scoring_rows.to_dict('records')})
+    assert response.status_code == 200, response.get_json()
+    np.testing.assert_allclose(response.get_json()['predictions'], expected)
+
+
+def test_coalescer_timeout_is_a_gateway_timeout(client, app_module, scoring_rows, monkeypatch):
+    from coalescer import PredictionCoalescer
+
+    coalescer = PredictionCoalescer(timeout_seconds=0.05)
+    monkeypatch.setattr(coalescer, '_ensure_worker', lambda: None)
+    monkeypatch.setattr(app_module, 'FAST_PATH_MAX_ROWS', 0)
+    monkeypatch.setattr(app_module, 'coalescer', coalescer)
+    assert client.post('/predict', json={'data': scoring_rows.to_dict('records')}).status_code == 504
+
+
+def test_model_load_reads_only_from_the_model_directory(client, app_module, rf_model_path, tmp_path, monkeypatch):
+    import os
+
+    monkeypatch.setattr(app_module, 'MODEL_DIR', os.path.dirname(rf_model_path))
+    response = client.post('/model/load', json={'model_path': os.path.basename(rf_model_path)})
+    assert response.status_code == 200, response.get_json()
+
+    outside = tmp_path / 'elsewhere.pkl'
+    outside.write_bytes(b'')
+    for path in (str(outside), os.path.join('..', 'elsewhere.pkl'), '/etc/passwd'):
+        assert client.post('/model/load', json={'model_path': path}).status_code == 403
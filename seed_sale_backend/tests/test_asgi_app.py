@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+import pytest
+
+# Starlette's TestClient runs on httpx
+pytest.importorskip('httpx')
+from starlette.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture
+def asgi_module(rf_model_path, monkeypatch):
+    import asgi_app
+
+    monkeypatch.setattr(asgi_app, 'MODEL_DIR', os.path.dirname(rf_model_path))
+    return asgi_app
+
+
+@pytest.fixture
+def client(asgi_module):
+    # The lifespan loads MODEL_PATH, which the tests leave pointing at no model
+    with TestClient(asgi_module.app) as client:
+        yield client
+
+
+def test_serves_a_model_loaded_through_the_endpoint(client, rf_model_path, scoring_rows):
+    from predict import load_model, pred
+
+    response = client.post('/model/load', json={'model_path': os.path.basename(rf_model_path)})
+    assert response.status_code == 200, response.json()
+    assert client.get('/health').json()['model_loaded'] is True
+
+    response = client.post('/predict', json={'data': scoring_rows.to_dict('records')})
+    assert response.status_code == 200, response.json()
+    expected = pred(scoring_rows.copy(), load_model(rf_model_path, use_serving_artifact=False))
+    np.testing.assert_allclose(response.json()['predictions'], expected)
+
+
+def test_rejects_models_outside_the_model_directory(client):
+    assert client.post('/model/load', json={'model_path': '/etc/passwd'}).status_code == 403
+
+
+def test_predict_without_data_is_a_client_error(client, asgi_module, rf_model_path):
+    assert asgi_module.load_model(rf_model_path)
+    assert client.post('/predict', json={}).status_code == 400
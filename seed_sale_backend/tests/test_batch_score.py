@@ -0,0 +1,29 @@
+import pandas as pd
+
+from batch_score import PREDICTION_COL, batch_score
+
+
+def test_chunks_dropped_entirely_are_skipped_and_counted(rf_model_path, scoring_rows, tmp_path):
+    rows = scoring_rows.copy()
+    # With chunksize=20 the second chunk has a missing value in every row
+    rows.loc[20:39, 'LIFECYCLE'] = None
+    input_path = tmp_path / 'input.csv'
+    rows.to_csv(input_path, index=False)
+
+    summary = batch_score(str(input_path), str(tmp_path / 'out.csv'), model_path=rf_model_path, chunksize=20)
+
+    assert (summary['rows_in'], summary['rows_scored'], summary['rows_dropped']) == (40, 20, 20)
+    scored = pd.read_csv(tmp_path / 'out.csv')
+    assert len(scored) == 20 and scored[PREDICTION_COL].notna().all()
+
+
+def test_input_with_every_row_dropped_writes_an_empty_output(rf_model_path, scoring_rows, tmp_path):
+    rows = scoring_rows.copy()
+    rows['LIFECYCLE'] = None
+    input_path = tmp_path / 'input.csv'
+    rows.to_csv(input_path, index=False)
+
+    summary = batch_score(str(input_path), str(tmp_path / 'out.csv'), model_path=rf_model_path, chunksize=20)
+
+    assert (summary['rows_scored'], summary['rows_dropped']) == (0, 40)
+    assert PREDICTION_COL in pd.read_csv(tmp_path / 'out.csv').columns
@@ -0,0 +1,67 @@
+import contextlib
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from coalescer import PredictionCoalescer
+from predict import load_model, pred
+
+
+@pytest.fixture(scope='module')
+def rf_model(rf_model_path):
+    return load_model(rf_model_path)
+
+
+def score_alone(df, model):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return pred(df.copy(), model)
+
+
+def test_concurrent_requests_share_a_batch(rf_model, scoring_rows):
+    coalescer = PredictionCoalescer(max_wait_ms=200, max_batch_rows=1000)
+    parts = [scoring_rows.iloc[start:start + 10].reset_index(drop=True) for start in range(0, 40, 10)]
+
+    with ThreadPoolExecutor(len(parts)) as pool:
+        results = list(pool.map(lambda df: coalescer.predict(df, rf_model), parts))
+
+    for df, result in zip(parts, results):
+        np.testing.assert_allclose(result, score_alone(df, rf_model))
+    stats = coalescer.stats()
+    assert stats['requests'] == len(parts)
+    assert stats['batches'] < len(parts)
+
+
+def test_requests_are_scored_with_their_own_model(rf_model, ridge_model, scoring_rows):
+    coalescer = PredictionCoalescer(max_wait_ms=200, max_batch_rows=1000)
+    df = scoring_rows.head(10)
+
+    # Queued back to back, so both land in the same batching window
+    futures = [coalescer.submit(df.copy(), model) for model in (rf_model, ridge_model, rf_model)]
+    results = [future.result(timeout=30) for future in futures]
+
+    np.testing.assert_allclose(results[0], score_alone(df, rf_model))
+    np.testing.assert_allclose(results[1], score_alone(df, ridge_model))
+    np.testing.assert_allclose(results[2], results[0])
+    assert not np.allclose(results[0], results[1])
+
+
+def test_a_bad_request_does_not_fail_its_neighbours(rf_model, scoring_rows):
+    coalescer = PredictionCoalescer(max_wait_ms=200, max_batch_rows=1000)
+    good = scoring_rows.head(5)
+    bad = good.assign(PLANT_HEIGHT='tall')
+
+    futures = [coalescer.submit(good.copy(), rf_model), coalescer.submit(bad, rf_model)]
+    np.testing.assert_allclose(futures[0].result(timeout=30), score_alone(good, rf_model))
+    with pytest.raises(Exception):
+        futures[1].result(timeout=30)
+
+
+def test_predict_times_out_when_no_worker_scores(rf_model, scoring_rows, monkeypatch):
+    coalescer = PredictionCoalescer(timeout_seconds=0.05)
+    # A worker thread that has died and was not restarted
+    monkeypatch.setattr(coalescer, '_ensure_worker', lambda: None)
+
+    with pytest.raises(TimeoutError):
+        coalescer.predict(scoring_rows.head(1), rf_model)
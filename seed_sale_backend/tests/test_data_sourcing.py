@@ -0,0 +1,55 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import DATA_PATH
+from data_preprocessing import DataPreprocessing
+from data_sourcing import SCHEMA, DataSourcing
+from feature_engineering import FeatureEngineering
+
+
+def features(df):
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = DataPreprocessing(df).preprocessing_fit()
+        feature_engineering = FeatureEngineering()
+        df = feature_engineering.fit(df).transform(df)
+    return feature_engineering.state_stats, df
+
+
+@pytest.fixture(scope='module')
+def typed_and_untyped():
+    return features(DataSourcing(DATA_PATH).read_csv()), features(DataSourcing(DATA_PATH, typed=False).read_csv())
+
+
+def test_typed_read_keeps_numeric_values():
+    typed, untyped = DataSourcing(DATA_PATH).read_csv(), DataSourcing(DATA_PATH, typed=False).read_csv()
+    for col, dtype in SCHEMA.items():
+        if dtype != 'category':
+            assert typed[col].dtype.kind == 'f' or typed[col].dtype == dtype
+            np.testing.assert_array_equal(typed[col].to_numpy(dtype=np.float64), untyped[col].to_numpy(dtype=np.float64))
+
+
+def test_typed_read_leaves_feature_stats_unchanged(typed_and_untyped):
+    (typed_stats, _), (untyped_stats, _) = typed_and_untyped
+    assert typed_stats == untyped_stats
+
+
+def test_typed_read_leaves_predictions_unchanged(typed_and_untyped):
+    from sklearn.linear_model import Ridge
+    from conftest import train_pipeline
+
+    (typed_stats, typed_df), (untyped_stats, untyped_df) = typed_and_untyped
+    typed_model = train_pipeline((FeatureEngineering(typed_stats), typed_df), Ridge())
+    untyped_model = train_pipeline((FeatureEngineering(untyped_stats), untyped_df), Ridge())
+    X = untyped_df.drop(columns=['UNITS'])[untyped_model.feature_names_in_]
+    np.testing.assert_allclose(typed_model.predict(X), untyped_model.predict(X), rtol=1e-9)
+
+
+def test_cache_round_trips_the_typed_frame(tmp_path):
+    pytest.importorskip('pyarrow')
+    first = DataSourcing(DATA_PATH, cache_dir=str(tmp_path)).read_data_local()
+    cached = DataSourcing(DATA_PATH, cache_dir=str(tmp_path)).read_data_local()
+    pd.testing.assert_frame_equal(first, cached)
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fast_scoring import CompiledScorer, get_compiled_scorer
+from predict import load_model, pred
+
+
+@pytest.fixture(params=['random_forest', 'ridge'])
+def model(request, rf_model_path, ridge_model):
+    return load_model(rf_model_path) if request.param == 'random_forest' else ridge_model
+
+
+def test_compiled_scorer_matches_pred(model, scoring_rows):
+    scorer = get_compiled_scorer(model)
+    assert scorer is not None
+
+    records = scoring_rows.to_dict(orient='records')
+    np.testing.assert_array_equal(scorer.predict_records(records), pred(scoring_rows.copy(), model))
+    # A single record scores like the same row in a batch
+    np.testing.assert_array_equal(scorer.predict_records(records[:1]), pred(scoring_rows.head(1).copy(), model))
+
+
+def test_scorer_is_compiled_once_per_model(model):
+    assert get_compiled_scorer(model) is get_compiled_scorer(model)
+
+
+@pytest.mark.parametrize('change', [
+    lambda record: record.update(PLANT_HEIGHT=None),
+    lambda record: record.update(PROTECTION=float(record['PROTECTION'])),
+    lambda record: record.pop('STATE'),
+    lambda record: record.update(RELEASE_YEAR='2019'),
+    lambda record: record.update(STATE=['IA']),
+])
+def test_declines_batches_pandas_must_score(model, scoring_rows, change):
+    records = scoring_rows.head(3).to_dict(orient='records')
+    change(records[1])
+    assert get_compiled_scorer(model).predict_records(records) is None
+
+
+def test_unsupported_models_are_not_compiled():
+    assert CompiledScorer.from_pipeline(object()) is None
+    assert get_compiled_scorer(pd.DataFrame) is None
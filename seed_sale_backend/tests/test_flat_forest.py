@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+from sklearn.utils.validation import check_is_fitted
+
+from flat_forest import FlatForestRegressor
+
+
+@pytest.fixture(scope='module')
+def regression_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 6))
+    X[rng.random(X.shape) < 0.05] = np.nan
+    y = np.nan_to_num(X[:, 0]) * 2 + rng.normal(size=300)
+    return X, y
+
+
+@pytest.mark.parametrize('forest_class', [RandomForestRegressor, ExtraTreesRegressor])
+def test_from_forest_predicts_like_the_forest(regression_data, forest_class):
+    X, y = regression_data
+    forest = forest_class(n_estimators=15, random_state=0).fit(X, y)
+    flat = FlatForestRegressor.from_forest(forest, chunk_elements=64)
+
+    np.testing.assert_array_equal(flat.predict(X), forest.predict(X))
+    per_tree = flat.predict_per_tree(X)
+    assert per_tree.shape == (15, len(X))
+    np.testing.assert_array_equal(per_tree[3], forest.estimators_[3].predict(X.astype(np.float32)))
+
+
+def test_fit_retrains_the_source_forest(regression_data):
+    X, y = regression_data
+    forest = RandomForestRegressor(n_estimators=5, max_depth=3, random_state=1).fit(X, y)
+    flat = FlatForestRegressor.from_forest(forest)
+
+    refit = flat.fit(X, y)
+    assert refit is flat
+    check_is_fitted(flat)
+    np.testing.assert_array_equal(flat.predict(X), forest.predict(X))
+    # An estimator not built from a forest fits a default random forest
+    check_is_fitted(FlatForestRegressor().fit(X, y))
+
+
+def test_serving_artifact_scores_through_the_pipeline(rf_model_path, scoring_rows):
+    from predict import load_model, prepare_features
+
+    original = load_model(rf_model_path, use_serving_artifact=False)
+    serving = load_model(rf_model_path)
+    assert type(serving.steps[-1][1]) is FlatForestRegressor
+
+    features = prepare_features(scoring_rows.copy(), original)
+    # Pipeline.predict, not just the estimator: it checks that every step is a fitted estimator
+    np.testing.assert_array_equal(serving.predict(features), original.predict(features))
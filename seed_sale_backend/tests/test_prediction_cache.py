@@ -0,0 +1,97 @@
+import numpy as np
+
+from prediction_cache import PredictionCache
+
+
+class RowIndependentModel:
+    feature_stats_ = {'PRODUCT': ['P1', 'P2']}
+
+
+class CountingScorer:
+    """Scores a row as its X, dropping rows with a missing value, and records the rows it was asked for"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, model, records):
+        self.calls.append(records)
+        return np.array([record['X'] for record in records if record['X'] is not None], dtype=np.float64)
+
+
+def test_scores_only_distinct_misses():
+    cache, score, model = PredictionCache(), CountingScorer(), RowIndependentModel()
+
+    first = cache.predict(model, [{'X': 1.0}, {'X': 2.0}, {'X': 1.0}], score)
+    second = cache.predict(model, [{'X': 2}, {'X': 3.0}], score)
+
+    np.testing.assert_array_equal(first, [1.0, 2.0, 1.0])
+    np.testing.assert_array_equal(second, [2.0, 3.0])
+    # 2 and 2.0 share an entry
+    assert score.calls == [[{'X': 1.0}, {'X': 2.0}], [{'X': 3.0}]]
+    assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 3
+
+
+def test_dropped_rows_stay_dropped_when_cached():
+    cache, score, model = PredictionCache(), CountingScorer(), RowIndependentModel()
+
+    for _ in range(2):
+        predictions = cache.predict(model, [{'X': None}, {'X': 4.0}], score)
+        np.testing.assert_array_equal(predictions, [4.0])
+    assert len(score.calls) == 1
+
+
+def test_evicts_least_recently_used():
+    cache, score, model = PredictionCache(max_entries=2), CountingScorer(), RowIndependentModel()
+
+    cache.predict(model, [{'X': 1.0}, {'X': 2.0}], score)
+    cache.predict(model, [{'X': 1.0}], score)
+    cache.predict(model, [{'X': 3.0}], score)
+    cache.predict(model, [{'X': 1.0}, {'X': 2.0}], score)
+
+    assert score.calls[-1] == [{'X': 2.0}]
+    assert cache.stats()['evictions'] == 2
+
+
+def test_expired_entries_are_scored_again(monkeypatch):
+    import prediction_cache
+
+    now = [100.0]
+    monkeypatch.setattr(prediction_cache.time, 'monotonic', lambda: now[0])
+    cache, score, model = PredictionCache(ttl_seconds=10), CountingScorer(), RowIndependentModel()
+
+    cache.predict(model, [{'X': 1.0}], score)
+    now[0] += 11
+    cache.predict(model, [{'X': 1.0}], score)
+
+    assert len(score.calls) == 2 and cache.stats()['expirations'] == 1
+
+
+def test_entries_belong_to_one_model():
+    cache, score = PredictionCache(), CountingScorer()
+
+    cache.predict(RowIndependentModel(), [{'X': 1.0}], score)
+    cache.predict(RowIndependentModel(), [{'X': 1.0}], score)
+
+    assert len(score.calls) == 2
+
+
+def test_bypasses_models_and_requests_it_cannot_cache():
+    cache, score = PredictionCache(), CountingScorer()
+
+    cache.predict(object(), [{'X': 1.0}], score)
+    cache.predict(RowIndependentModel(), [{'X': 1.0}, {'X': 2.0, 'Y': 0}], score)
+
+    assert cache.stats()['bypassed_requests'] == 2 and cache.stats()['entries'] == 0
+
+
+def test_cached_predictions_match_uncached_scoring(app_module, rf_model_path, scoring_rows):
+    from predict import load_model
+
+    model = load_model(rf_model_path)
+    records = scoring_rows.to_dict(orient='records')
+    expected = app_module.score_records(model, records)
+    cache = PredictionCache()
+
+    np.testing.assert_array_equal(cache.predict(model, records, app_module.score_records), expected)
+    np.testing.assert_array_equal(cache.predict(model, records[::-1], app_module.score_records), expected[::-1])
+    assert cache.stats()['hits'] == len(records)
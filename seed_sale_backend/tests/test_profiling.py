@@ -0,0 +1,61 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from model.profiling import Profiler
+
+MIB = 2 ** 20
+
+
+@pytest.fixture
+def profiler():
+    profiler = Profiler(enabled=True, track_memory=True)
+    yield profiler
+    profiler.disable()
+    tracemalloc.stop()
+
+
+def peaks(profiler):
+    return {name: stats['peak_memory_bytes'] for name, stats in profiler.summary()['stages'].items()}
+
+
+def test_stage_counts_calls_and_rows():
+    profiler = Profiler(enabled=True)
+    for rows in (10, 20):
+        with profiler.stage('encoding', rows_in=rows) as stage:
+            stage.rows_out = rows - 1
+    stats = profiler.summary()['stages']['encoding']
+    assert (stats['calls'], stats['rows_in'], stats['rows_out']) == (2, 30, 28)
+    assert 'seed_sale_stage_calls_total{stage="encoding"} 2' in profiler.prometheus()
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    with profiler.stage('predict', rows_in=5) as stage:
+        stage.rows_out = 5
+    assert profiler.summary()['stages'] == {}
+
+
+def test_nested_stage_keeps_the_enclosing_peak(profiler):
+    with profiler.stage('outer'):
+        block = np.ones(16 * MIB, dtype=np.uint8)
+        del block
+        # Entering the inner stage must not wipe the outer stage's 16 MiB peak
+        with profiler.stage('inner'):
+            small = np.ones(MIB, dtype=np.uint8)
+            del small
+
+    result = peaks(profiler)
+    assert result['outer'] >= 16 * MIB
+    assert MIB <= result['inner'] < 16 * MIB
+
+
+def test_enclosing_peak_includes_the_nested_stage(profiler):
+    with profiler.stage('outer'):
+        with profiler.stage('inner'):
+            block = np.ones(8 * MIB, dtype=np.uint8)
+            del block
+
+    result = peaks(profiler)
+    assert result['outer'] >= result['inner'] >= 8 * MIB
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from payload_formats import PayloadError
+from scenarios import axis_values, expand_scenarios
+
+
+def test_expands_every_combination_in_c_order(scoring_rows):
+    base = scoring_rows.iloc[0].to_dict()
+    df, axes = expand_scenarios({'base': base, 'vary': {'STATE': ['IA', 'IL'],
+                                                        'SALESYEAR': {'start': 2020, 'stop': 2023}}})
+
+    assert [field for field, _ in axes] == ['STATE', 'SALESYEAR']
+    assert df['STATE'].tolist() == ['IA'] * 3 + ['IL'] * 3
+    assert df['SALESYEAR'].tolist() == [2020, 2021, 2022] * 2
+    assert (df['PRODUCT'] == base['PRODUCT']).all()
+
+
+@pytest.mark.parametrize('spec', [
+    ['IA', 2024],
+    [2024, 'IA', 2025],
+    [True, 1],
+    [],
+    {'start': 0, 'stop': float('inf')},
+    {'start': 0, 'stop': 10, 'step': 0},
+    {'start': '2020', 'stop': 2023},
+    'IA',
+])
+def test_rejects_malformed_axes(spec):
+    with pytest.raises(PayloadError) as excinfo:
+        axis_values('STATE', spec, max_rows=1000)
+    assert excinfo.value.status_code == 400
+
+
+def test_numeric_lists_stay_numeric():
+    assert axis_values('SALESYEAR', [2024, 2025.5], max_rows=1000).dtype == np.float64
+
+
+def test_rejects_grids_above_the_limit(scoring_rows):
+    with pytest.raises(PayloadError) as excinfo:
+        expand_scenarios({'base': scoring_rows.iloc[0].to_dict(),
+                          'vary': {'SALESYEAR': {'start': 0, 'stop': 100}}}, max_rows=10)
+    assert excinfo.value.status_code == 413
+
+
+def test_rejects_required_fields_missing_from_base_and_vary(scoring_rows):
+    base = scoring_rows.iloc[0].drop('STATE').to_dict()
+    with pytest.raises(PayloadError, match='STATE'):
+        expand_scenarios({'base': base})
+
+
+def test_endpoint_scores_the_grid_and_answers_400_for_mixed_lists(app_module, scoring_rows):
+    client = app_module.app.test_client()
+    base = scoring_rows.iloc[0].to_dict()
+
+    response = client.post('/predict/scenarios', json={'base': base, 'vary': {'SALESYEAR': [2020, 2021, 2022]}})
+    assert response.status_code == 200
+    assert response.get_json()['shape'] == [3]
+
+    response = client.post('/predict/scenarios', json={'base': base, 'vary': {'STATE': ['IA', 2024]}})
+    assert response.status_code == 400
@@ -0,0 +1,70 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+from sklearn.base import clone
+
+from simple_nn_regressor import SimpleNNRegressor
+
+# Constructor parameters of the first SimpleNNRegressor, the only ones its pickles hold
+ORIGINAL_PARAMS = {'input_dim', 'hidden_dim', 'lr', 'epochs', 'batch_size'}
+
+
+@pytest.fixture(scope='module')
+def regression_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4)).astype(np.float32)
+    return X, (X[:, 0] * 3).astype(np.float32)
+
+
+def test_unpickles_models_saved_before_the_newer_parameters(regression_data, monkeypatch):
+    X, y = regression_data
+    regressor = SimpleNNRegressor(epochs=2, random_state=0).fit(X, y)
+    expected = regressor.predict(X)
+
+    # Pickle only the attributes an original SimpleNNRegressor had
+    def original_state(self):
+        return {key: value for key, value in self.__dict__.items() if key in ORIGINAL_PARAMS | {'model'}}
+    monkeypatch.setattr(SimpleNNRegressor, '__getstate__', original_state)
+    payload = pickle.dumps(regressor)
+    monkeypatch.undo()
+
+    old = pickle.loads(payload)
+    np.testing.assert_allclose(old.predict(X), expected)
+    assert old.get_params() == SimpleNNRegressor(epochs=2).get_params()
+    assert old.n_features_in_ == X.shape[1]
+    clone(old)
+
+
+def test_read_only_input_is_not_shared_with_torch(regression_data, recwarn):
+    X, _ = regression_data
+    frame = pd.DataFrame(X)
+    tensor = SimpleNNRegressor()._to_tensor(frame)
+
+    assert not [w for w in recwarn if 'not writable' in str(w.message)]
+    np.testing.assert_array_equal(tensor.numpy(), X)
+    writable = np.ascontiguousarray(X)
+    assert np.shares_memory(SimpleNNRegressor()._to_tensor(writable).numpy(), writable)
+
+
+def test_fit_restores_torch_threads(regression_data):
+    X, y = regression_data
+    previous = torch.get_num_threads()
+    torch.set_num_threads(3)
+    try:
+        SimpleNNRegressor(epochs=1, n_threads=1).fit(X, y)
+        assert torch.get_num_threads() == 3
+    finally:
+        torch.set_num_threads(previous)
+
+
+def test_warm_start_continues_the_same_network(regression_data):
+    X, y = regression_data
+    regressor = SimpleNNRegressor(epochs=1, random_state=0).fit(X, y)
+    network = regressor.model
+    regressor.set_params(warm_start=True).fit(X, y)
+    assert regressor.model is network
+    regressor.set_params(warm_start=False).fit(X, y)
+    assert regressor.model is not network
@@ -0,0 +1,97 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Ridge
+
+from conftest import train_pipeline
+from data_preprocessing import DataPreprocessing
+from feature_engineering import FeatureEngineering
+from get_best_model import GetBestModel
+from model_pipeline import ModelPipeline
+
+NEW_YEAR = 2025
+
+
+@pytest.fixture(scope='module')
+def new_rows(raw_data):
+    """Mask of the training features' rows from the newest sales year, which the previous model has not seen"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = DataPreprocessing(raw_data.copy()).preprocessing_fit()
+    return (df['SALESYEAR'] == NEW_YEAR).to_numpy()
+
+
+@pytest.fixture(scope='module')
+def previous_rf(training_features, new_rows):
+    feature_engineering, df = training_features
+    return train_pipeline((feature_engineering, df[~new_rows]), RandomForestRegressor(n_estimators=10, random_state=0))
+
+
+def warm_start(df, previous_model, new_rows):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return GetBestModel(df).warm_start_model(previous_model, new_rows)
+
+
+def test_forest_keeps_its_encoders_and_trees(training_features, previous_rf, new_rows):
+    _, df = training_features
+    model = warm_start(df, previous_rf, new_rows)
+
+    X = df.drop(columns=['UNITS'])
+    np.testing.assert_array_equal(model[:-1].transform(X), previous_rf[:-1].transform(X))
+    forest, previous_forest = model.named_steps['model'], previous_rf.named_steps['model']
+    assert forest.n_estimators > previous_forest.n_estimators == 10
+    for tree, previous_tree in zip(forest.estimators_, previous_forest.estimators_):
+        np.testing.assert_array_equal(tree.tree_.value, previous_tree.tree_.value)
+    # Only the warm start's own fit continues; the saved model does not keep warm_start on
+    assert forest.warm_start is False
+    assert model.training_metrics_['search_strategy'] == 'warm_start'
+    assert model.training_metrics_['best_params']['model__n_estimators'] == forest.n_estimators
+
+
+def test_unseen_lifecycle_refits_the_pipeline(training_features, previous_rf, new_rows):
+    _, df = training_features
+    df = df.copy()
+    df['LIFECYCLE'] = df['LIFECYCLE'].astype(object)
+    df.loc[new_rows, 'LIFECYCLE'] = 'RELAUNCH'
+
+    model = warm_start(df, previous_rf, new_rows)
+
+    assert model.training_metrics_['search_strategy'] == 'refit'
+    assert 'RELAUNCH' in model.named_steps['preprocessor'].named_transformers_['ordinal_enc'].categories_[0]
+    assert model.named_steps['model'].n_estimators == 10
+
+
+def test_validation_drift_needs_training_metrics_and_feature_stats(raw_data, training_features, previous_rf):
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_new = DataPreprocessing(raw_data[raw_data['SALESYEAR'] == NEW_YEAR].copy()).preprocessing_fit()
+        pipeline = ModelPipeline()
+        assert isinstance(pipeline.validation_drift(previous_rf, df_new), float)
+
+        for attribute in ('feature_stats_', 'training_metrics_'):
+            model = train_pipeline(training_features, Ridge())
+            delattr(model, attribute)
+            assert pipeline.validation_drift(model, df_new) is None
+
+
+@pytest.mark.parametrize('drift_threshold, retrain_mode', [(1e9, 'warm_start'), (-1e9, 'full_search')])
+def test_fit_incremental(raw_data, tmp_path, drift_threshold, retrain_mode):
+    old, new = raw_data[raw_data['SALESYEAR'] < NEW_YEAR], raw_data[raw_data['SALESYEAR'] == NEW_YEAR]
+    new.to_csv(tmp_path / 'new.csv', index=False)
+    pipeline = ModelPipeline(history_dir=str(tmp_path / 'history'), model_param_list=[(Ridge, {'model__alpha': [1.0]})])
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        history = DataPreprocessing(old.copy()).preprocessing_fit()
+        pipeline.write_history(history)
+        feature_engineering = FeatureEngineering()
+        previous_model = train_pipeline((feature_engineering, feature_engineering.fit(history).transform(history.copy())),
+                                        Ridge())
+        model = pipeline.fit_incremental(str(tmp_path / 'new.csv'), previous_model, drift_threshold=drift_threshold)
+
+    metrics = model.training_metrics_
+    assert metrics['retrain_mode'] == retrain_mode
+    assert metrics['rows_total'] == len(pd.read_pickle(pipeline.history_path()))
+    assert 0 < metrics['rows_new'] < metrics['rows_total']
+    assert model.feature_stats_ == pipeline.feature_engineering.state_stats